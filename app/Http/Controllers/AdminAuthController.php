@@ -3,6 +3,7 @@
 namespace App\Http\Controllers;
 
 use App\Models\Admin;
+use App\Models\StatistiqueEtablissement;
 use Illuminate\Http\Request;
 use Illuminate\Support\Facades\Hash;
 use Illuminate\Validation\ValidationException;
@@ -81,6 +82,11 @@ public function dashboard(Request $request)
                 'total_admins' => Admin::count(),
                 'regular_admins' => Admin::where('role', 'admin')->count(),
                 'super_admins' => Admin::where('role', 'superadmin')->count(),
+            ],
+            // Totaux nationaux et par région lus dans les agrégats de l'ETL
+            'etablissements' => [
+                'total' => StatistiqueEtablissement::regrouper([])->first(),
+                'par_region' => StatistiqueEtablissement::regrouper(['region']),
             ]
         ]);
     }
@@ -5,10 +5,13 @@
 namespace App\Http\Controllers;
 
 use App\Models\Etablissement;
+use App\Models\StatistiqueEtablissement;
 use Illuminate\Http\Request;
 use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\DB;
 use Illuminate\Support\Facades\Log;
 use Illuminate\Support\Facades\Validator;
+use Illuminate\Support\Str;
 
 class EtablissementController extends Controller
 {
@@ -65,6 +68,26 @@ public function search(Request $request)
 
         $query = Etablissement::query();
 
+        // Recherche plein texte (nom, village/quartier, canton, commune, préfecture) dans l'index de l'ETL
+        if ($request->filled('q')) {
+            $termes = array_filter(explode(' ', trim(preg_replace('/[^a-z0-9]+/', ' ', Str::lower(Str::ascii($request->q))))));
+            $correspondances = DB::table('recherche_etablissements')->select('etablissement_id');
+            $driver = DB::getDriverName();
+            if (empty($termes)) {
+                // Aucun terme exploitable (ponctuation seule) : aucun établissement ne correspond
+                $correspondances->whereRaw('0 = 1');
+            } elseif (in_array($driver, ['mysql', 'mariadb'])) {
+                $correspondances->whereFullText('texte', implode(' ', array_map(fn ($terme) => "+$terme*", $termes)), ['mode' => 'boolean']);
+            } elseif ($driver === 'pgsql') {
+                $correspondances->whereFullText('texte', implode(' ', $termes));
+            } else {
+                foreach ($termes as $terme) {
+                    $correspondances->where('texte', 'like', '%' . $terme . '%');
+                }
+            }
+            $query->whereIn('id', $correspondances);
+        }
+
         if ($request->has('nom_etablissement')) {
             $query->where('nom_etablissement', 'like', '%' . $request->nom_etablissement . '%');
         }
@@ -114,12 +137,52 @@ public function search(Request $request)
     }
 
     // Récupérer les établissements avec leurs coordonnées pour la carte
-    public function map()
+    // ?bbox=lngMin,latMin,lngMax,latMax limite à l'emprise affichée (index lat/lng) ;
+    // ?zoom=N renvoie des groupes par tuile précalculée au lieu des points
+    public function map(Request $request)
     {
-        $etablissements = Etablissement::select('id', 'nom_etablissement', 'latitude', 'longitude')->get();
+        $query = Etablissement::query();
+
+        if ($request->filled('bbox')) {
+            $bbox = array_map('floatval', explode(',', $request->query('bbox')));
+            if (count($bbox) !== 4) {
+                return response()->json(['error' => 'bbox attendu: lngMin,latMin,lngMax,latMax'], 422);
+            }
+            [$lngMin, $latMin, $lngMax, $latMax] = $bbox;
+            $query->whereBetween('lat', [$latMin, $latMax])->whereBetween('lng', [$lngMin, $lngMax]);
+        }
+
+        // En dessous du zoom précalculé le plus fin, groupes par tuile au lieu des points
+        $zoomDemande = (int) $request->query('zoom', 99);
+        if ($zoomDemande < max(Etablissement::ZOOMS_TUILES)) {
+            // Niveau précalculé le plus fin ne dépassant pas le zoom demandé
+            $zooms = array_filter(Etablissement::ZOOMS_TUILES, fn ($zoom) => $zoom <= $zoomDemande);
+            $zoom = empty($zooms) ? min(Etablissement::ZOOMS_TUILES) : max($zooms);
+            $groupes = $query->whereNotNull("tuile_z$zoom")
+                ->selectRaw("tuile_z$zoom as tuile, COUNT(*) as nombre, AVG(lat) as latitude, AVG(lng) as longitude")
+                ->groupBy("tuile_z$zoom")
+                ->get();
+            return response()->json(['zoom' => $zoom, 'groupes' => $groupes]);
+        }
+
+        $etablissements = $query->select('id', 'nom_etablissement', 'latitude', 'longitude')->get();
         return response()->json($etablissements);
     }
 
+    // Statistiques précalculées par l'ETL, regroupées par région (ou préfecture, milieu, statut, année)
+    public function statistiques(Request $request)
+    {
+        $dimensions = ['region', 'prefecture', 'milieu', 'statut', 'annee'];
+        $groupes = array_values(array_intersect($dimensions, explode(',', $request->query('par', 'region'))));
+        if (empty($groupes)) {
+            return response()->json(['error' => 'Paramètre par invalide (' . implode(', ', $dimensions) . ')'], 422);
+        }
+
+        $filtres = array_filter($request->only($dimensions), fn ($valeur) => $valeur !== null && $valeur !== '');
+
+        return response()->json(StatistiqueEtablissement::regrouper($groupes, $filtres));
+    }
+
     // Ajouter un établissement (avec authentification)
     public function store(Request $request)
     {
@@ -25,9 +25,87 @@ class Etablissement extends Model
 
     protected $casts = [
     	'latitude' => 'decimal:8',
-	'longitude' => 'decimal:8'
+	'longitude' => 'decimal:8',
+        'lat' => 'float',
+        'lng' => 'float'
     ];
 
+    // Niveaux de zoom des colonnes tuile_z* (identiques à TILE_ZOOMS dans l'ETL)
+    public const ZOOMS_TUILES = [8, 11, 14];
+
+    // Recalcule les clés spatiales quand les coordonnées changent (même calcul que l'ETL)
+    protected static function booted()
+    {
+        static::saving(function (Etablissement $etablissement) {
+            if ($etablissement->isDirty(['latitude', 'longitude'])) {
+                $etablissement->forceFill(self::clesSpatiales($etablissement->latitude, $etablissement->longitude));
+            }
+        });
+    }
+
+    public static function clesSpatiales($latitude, $longitude): array
+    {
+        $lat = is_numeric($latitude) ? (float) $latitude : null;
+        $lng = is_numeric($longitude) ? (float) $longitude : null;
+        $valide = $lat !== null && $lng !== null && abs($lat) <= 90 && abs($lng) <= 180 && $lat != 0 && $lng != 0;
+
+        $cles = ['lat' => null, 'lng' => null, 'geohash' => null];
+        foreach (self::ZOOMS_TUILES as $zoom) {
+            $cles["tuile_z$zoom"] = $valide ? self::cleTuile($lat, $lng, $zoom) : null;
+        }
+        if ($valide) {
+            $cles['lat'] = $lat;
+            $cles['lng'] = $lng;
+            $cles['geohash'] = self::geohash($lat, $lng);
+        }
+        return $cles;
+    }
+
+    // Clé de la tuile Web Mercator (x * 2^zoom + y)
+    public static function cleTuile(float $lat, float $lng, int $zoom): int
+    {
+        $tuiles = 2 ** $zoom;
+        $latRad = deg2rad(max(-85.05112878, min(85.05112878, $lat)));
+        $x = max(0, min($tuiles - 1, (int) floor(($lng + 180) / 360 * $tuiles)));
+        $y = max(0, min($tuiles - 1, (int) floor((1 - asinh(tan($latRad)) / M_PI) / 2 * $tuiles)));
+        return $x * $tuiles + $y;
+    }
+
+    public static function geohash(float $lat, float $lng, int $precision = 9): string
+    {
+        $alphabet = '0123456789bcdefghjkmnpqrstuvwxyz';
+        $latMin = -90.0; $latMax = 90.0; $lngMin = -180.0; $lngMax = 180.0;
+        $hash = '';
+        $bits = 0;
+        $valeur = 0;
+        for ($i = 0; strlen($hash) < $precision; $i++) {
+            if ($i % 2 === 0) {
+                $milieu = ($lngMin + $lngMax) / 2;
+                $bit = $lng >= $milieu ? 1 : 0;
+                if ($bit) {
+                    $lngMin = $milieu;
+                } else {
+                    $lngMax = $milieu;
+                }
+            } else {
+                $milieu = ($latMin + $latMax) / 2;
+                $bit = $lat >= $milieu ? 1 : 0;
+                if ($bit) {
+                    $latMin = $milieu;
+                } else {
+                    $latMax = $milieu;
+                }
+            }
+            $valeur = ($valeur << 1) | $bit;
+            if (++$bits === 5) {
+                $hash .= $alphabet[$valeur];
+                $bits = 0;
+                $valeur = 0;
+            }
+        }
+        return $hash;
+    }
+
     // Relations belongsTo
     public function localisation()
     {
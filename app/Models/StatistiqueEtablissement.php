@@ -0,0 +1,59 @@
+<?php
+
+namespace App\Models;
+
+use Illuminate\Database\Eloquent\Model;
+
+// Agrégats précalculés par l'ETL : lecture seule côté API
+class StatistiqueEtablissement extends Model
+{
+    protected $table = 'statistiques_etablissements';
+
+    protected $casts = [
+        'taux_electricite' => 'float',
+        'taux_latrine' => 'float',
+        'taux_latrine_fonct' => 'float',
+        'taux_acces_toute_saison' => 'float',
+        'taux_eau' => 'float'
+    ];
+
+    // Sommes à additionner quand on regroupe plusieurs lignes
+    public const TOTAUX = [
+        'nb_etablissements', 'effectif_total', 'effectif_garcons', 'effectif_filles',
+        'enseignants_total', 'enseignants_hommes', 'enseignants_femmes',
+        'salles_dur', 'salles_banco', 'salles_autre', 'salles_total', 'nb_equipements',
+        'nb_electricite', 'nb_latrine', 'nb_latrine_fonct', 'nb_acces_toute_saison', 'nb_eau'
+    ];
+
+    // Taux d'équipement et compteur correspondant
+    public const TAUX = [
+        'taux_electricite' => 'nb_electricite',
+        'taux_latrine' => 'nb_latrine',
+        'taux_latrine_fonct' => 'nb_latrine_fonct',
+        'taux_acces_toute_saison' => 'nb_acces_toute_saison',
+        'taux_eau' => 'nb_eau'
+    ];
+
+    // Additionne les agrégats par $dimensions et recalcule les taux sur les totaux
+    public static function regrouper(array $dimensions, array $filtres = [])
+    {
+        $sommes = array_map(fn ($colonne) => "SUM($colonne) as $colonne", self::TOTAUX);
+
+        $requete = self::query()
+            ->where($filtres)
+            ->selectRaw(implode(', ', array_merge($dimensions, $sommes)));
+        if (!empty($dimensions)) {
+            $requete->groupBy($dimensions)->orderBy($dimensions[0]);
+        }
+
+        return $requete->get()
+            ->map(function ($ligne) {
+                foreach (self::TAUX as $taux => $compteur) {
+                    $ligne->$taux = $ligne->nb_equipements > 0
+                        ? round($ligne->$compteur / $ligne->nb_equipements, 4)
+                        : null;
+                }
+                return $ligne;
+            });
+    }
+}
@@ -0,0 +1,66 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // Agrégats précalculés par l'ETL (etl/edumap-api_v01_data_extract.py, refresh_statistics)
+        Schema::create('statistiques_etablissements', function (Blueprint $table) {
+            $table->id();
+            $table->string('region');
+            $table->string('prefecture');
+            $table->string('milieu');
+            $table->string('statut');
+            $table->string('annee')->nullable();
+            $table->integer('nb_etablissements')->default(0);
+            $table->integer('effectif_total')->default(0);
+            $table->integer('effectif_garcons')->default(0);
+            $table->integer('effectif_filles')->default(0);
+            $table->integer('enseignants_total')->default(0);
+            $table->integer('enseignants_hommes')->default(0);
+            $table->integer('enseignants_femmes')->default(0);
+            $table->integer('salles_dur')->default(0);
+            $table->integer('salles_banco')->default(0);
+            $table->integer('salles_autre')->default(0);
+            $table->integer('salles_total')->default(0);
+            $table->integer('nb_equipements')->default(0);
+            $table->integer('nb_electricite')->default(0);
+            $table->integer('nb_latrine')->default(0);
+            $table->integer('nb_latrine_fonct')->default(0);
+            $table->integer('nb_acces_toute_saison')->default(0);
+            $table->integer('nb_eau')->default(0);
+            $table->decimal('taux_electricite', 5, 4)->nullable();
+            $table->decimal('taux_latrine', 5, 4)->nullable();
+            $table->decimal('taux_latrine_fonct', 5, 4)->nullable();
+            $table->decimal('taux_acces_toute_saison', 5, 4)->nullable();
+            $table->decimal('taux_eau', 5, 4)->nullable();
+            $table->timestamps();
+
+            $table->index(['region', 'prefecture']);
+        });
+
+        // Empreinte des agrégats de chaque région : seules les régions modifiées sont recalculées
+        Schema::create('statistiques_empreintes', function (Blueprint $table) {
+            $table->id();
+            $table->string('region')->unique();
+            $table->string('empreinte', 64);
+            $table->timestamps();
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('statistiques_empreintes');
+        Schema::dropIfExists('statistiques_etablissements');
+    }
+};
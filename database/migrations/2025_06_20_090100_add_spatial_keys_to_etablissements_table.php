@@ -0,0 +1,45 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // Coordonnées numériques et clés de tuiles calculées par l'ETL (spatial_keys) et par le modèle
+        Schema::table('etablissements', function (Blueprint $table) {
+            $table->double('lat')->nullable()->after('longitude');
+            $table->double('lng')->nullable()->after('lat');
+            $table->string('geohash', 9)->nullable()->after('lng');
+            $table->unsignedBigInteger('tuile_z8')->nullable()->after('geohash');
+            $table->unsignedBigInteger('tuile_z11')->nullable()->after('tuile_z8');
+            $table->unsignedBigInteger('tuile_z14')->nullable()->after('tuile_z11');
+
+            $table->index(['lat', 'lng']);
+            $table->index('geohash');
+            $table->index('tuile_z8');
+            $table->index('tuile_z11');
+            $table->index('tuile_z14');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::table('etablissements', function (Blueprint $table) {
+            $table->dropIndex(['lat', 'lng']);
+            $table->dropIndex(['geohash']);
+            $table->dropIndex(['tuile_z8']);
+            $table->dropIndex(['tuile_z11']);
+            $table->dropIndex(['tuile_z14']);
+            $table->dropColumn(['lat', 'lng', 'geohash', 'tuile_z8', 'tuile_z11', 'tuile_z14']);
+        });
+    }
+};
@@ -0,0 +1,38 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // Index de recherche alimenté par l'ETL (refresh_search_index) : texte sans accents ni casse
+        Schema::create('recherche_etablissements', function (Blueprint $table) {
+            $table->id();
+            $table->foreignId('etablissement_id')->unique()->constrained('etablissements')->onDelete('cascade');
+            $table->string('nom_normalise')->index();
+            $table->text('texte');
+            $table->string('empreinte', 20);
+            $table->timestamps();
+
+            // FULLTEXT n'existe pas en SQLite : la recherche y retombe sur LIKE
+            if (in_array(DB::getDriverName(), ['mysql', 'mariadb', 'pgsql'])) {
+                $table->fullText('texte');
+            }
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('recherche_etablissements');
+    }
+};
@@ -0,0 +1,366 @@
+import re
+import sqlite3
+from abc import ABC, abstractmethod
+
+import mysql.connector
+from mysql.connector import Error, errors
+
+try:
+    import psycopg2
+    import psycopg2.extras
+except ImportError:  # backend postgresql indisponible sans psycopg2
+    psycopg2 = None
+
+import numpy as np
+
+BACKENDS = ['mysql', 'postgresql', 'sqlite']
+
+# Tables Laravel avec une clé primaire `id` (RETURNING id pour lastrowid en PostgreSQL)
+ID_TABLES = {
+    'localisations', 'milieux', 'statuts', 'systemes', 'annees', 'etablissements',
+    'equipements_etablissement', 'effectifs', 'infrastructures',
+}
+
+# Schéma SQLite équivalent aux migrations Laravel (créé s'il manque)
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS localisations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, region TEXT NOT NULL, prefecture TEXT NOT NULL,
+    canton_village_autonome TEXT NOT NULL, ville_village_quartier TEXT NOT NULL,
+    commune_etab TEXT, created_at TEXT, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS milieux (id INTEGER PRIMARY KEY AUTOINCREMENT, libelle_type_milieu TEXT NOT NULL UNIQUE, created_at TEXT, updated_at TEXT);
+CREATE TABLE IF NOT EXISTS statuts (id INTEGER PRIMARY KEY AUTOINCREMENT, libelle_type_statut_etab TEXT NOT NULL UNIQUE, created_at TEXT, updated_at TEXT);
+CREATE TABLE IF NOT EXISTS systemes (id INTEGER PRIMARY KEY AUTOINCREMENT, libelle_type_systeme TEXT NOT NULL UNIQUE, created_at TEXT, updated_at TEXT);
+CREATE TABLE IF NOT EXISTS annees (id INTEGER PRIMARY KEY AUTOINCREMENT, libelle_type_annee TEXT UNIQUE, created_at TEXT, updated_at TEXT);
+CREATE TABLE IF NOT EXISTS etablissements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, code_etablissement TEXT NOT NULL, nom_etablissement TEXT NOT NULL,
+    latitude TEXT, longitude TEXT, localisation_id INTEGER NOT NULL REFERENCES localisations(id),
+    milieu_id INTEGER NOT NULL REFERENCES milieux(id), statut_id INTEGER NOT NULL REFERENCES statuts(id),
+    systeme_id INTEGER NOT NULL REFERENCES systemes(id), annee_id INTEGER REFERENCES annees(id),
+    lat REAL, lng REAL, geohash TEXT, tuile_z8 INTEGER, tuile_z11 INTEGER, tuile_z14 INTEGER,
+    created_at TEXT, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS equipements_etablissement (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    etablissement_id INTEGER NOT NULL REFERENCES etablissements(id) ON DELETE CASCADE,
+    existe_elect INTEGER NOT NULL DEFAULT 0, existe_latrine INTEGER NOT NULL DEFAULT 0,
+    existe_latrine_fonct INTEGER NOT NULL DEFAULT 0, acces_toute_saison INTEGER NOT NULL DEFAULT 0,
+    eau INTEGER NOT NULL DEFAULT 0, created_at TEXT, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS effectifs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    etablissement_id INTEGER NOT NULL REFERENCES etablissements(id) ON DELETE CASCADE,
+    sommedenb_eff_g INTEGER NOT NULL DEFAULT 0, sommedenb_eff_f INTEGER NOT NULL DEFAULT 0,
+    tot INTEGER NOT NULL DEFAULT 0, sommedenb_ens_h INTEGER NOT NULL DEFAULT 0,
+    sommedenb_ens_f INTEGER NOT NULL DEFAULT 0, total_ense INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS infrastructures (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    etablissement_id INTEGER NOT NULL REFERENCES etablissements(id) ON DELETE CASCADE,
+    sommedenb_salles_classes_dur INTEGER NOT NULL DEFAULT 0,
+    sommedenb_salles_classes_banco INTEGER NOT NULL DEFAULT 0,
+    sommedenb_salles_classes_autre INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT, updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS etablissements_code_index ON etablissements (code_etablissement);
+CREATE INDEX IF NOT EXISTS localisations_cle_index ON localisations (
+    region, prefecture, canton_village_autonome, ville_village_quartier, commune_etab
+);
+CREATE INDEX IF NOT EXISTS etablissements_lat_lng_index ON etablissements (lat, lng);
+CREATE INDEX IF NOT EXISTS etablissements_geohash_index ON etablissements (geohash);
+CREATE INDEX IF NOT EXISTS etablissements_tuile_z8_index ON etablissements (tuile_z8);
+CREATE INDEX IF NOT EXISTS etablissements_tuile_z11_index ON etablissements (tuile_z11);
+CREATE INDEX IF NOT EXISTS etablissements_tuile_z14_index ON etablissements (tuile_z14);
+CREATE TABLE IF NOT EXISTS recherche_etablissements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    etablissement_id INTEGER NOT NULL UNIQUE REFERENCES etablissements(id) ON DELETE CASCADE,
+    nom_normalise TEXT NOT NULL, texte TEXT NOT NULL, empreinte TEXT NOT NULL,
+    created_at TEXT, updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS recherche_etablissements_nom_normalise_index ON recherche_etablissements (nom_normalise);
+CREATE TABLE IF NOT EXISTS statistiques_etablissements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, region TEXT NOT NULL, prefecture TEXT NOT NULL,
+    milieu TEXT NOT NULL, statut TEXT NOT NULL, annee TEXT,
+    nb_etablissements INTEGER NOT NULL DEFAULT 0, effectif_total INTEGER NOT NULL DEFAULT 0,
+    effectif_garcons INTEGER NOT NULL DEFAULT 0, effectif_filles INTEGER NOT NULL DEFAULT 0,
+    enseignants_total INTEGER NOT NULL DEFAULT 0, enseignants_hommes INTEGER NOT NULL DEFAULT 0,
+    enseignants_femmes INTEGER NOT NULL DEFAULT 0, salles_dur INTEGER NOT NULL DEFAULT 0,
+    salles_banco INTEGER NOT NULL DEFAULT 0, salles_autre INTEGER NOT NULL DEFAULT 0,
+    salles_total INTEGER NOT NULL DEFAULT 0, nb_equipements INTEGER NOT NULL DEFAULT 0,
+    nb_electricite INTEGER NOT NULL DEFAULT 0, nb_latrine INTEGER NOT NULL DEFAULT 0,
+    nb_latrine_fonct INTEGER NOT NULL DEFAULT 0, nb_acces_toute_saison INTEGER NOT NULL DEFAULT 0,
+    nb_eau INTEGER NOT NULL DEFAULT 0, taux_electricite REAL, taux_latrine REAL,
+    taux_latrine_fonct REAL, taux_acces_toute_saison REAL, taux_eau REAL,
+    created_at TEXT, updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS statistiques_etablissements_region_prefecture_index
+    ON statistiques_etablissements (region, prefecture);
+CREATE TABLE IF NOT EXISTS statistiques_empreintes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, region TEXT NOT NULL UNIQUE, empreinte TEXT NOT NULL,
+    created_at TEXT, updated_at TEXT
+);
+"""
+
+# Requêtes propres à une session MySQL, sans équivalent à exécuter ailleurs
+MYSQL_SESSION_STATEMENT = re.compile(r'^\s*SET\s+(foreign_key_checks|unique_checks)\b', re.IGNORECASE)
+
+# LOAD DATA LOCAL INFILE %s INTO TABLE t ... (colonnes), tel qu'émis par load_data_infile
+LOAD_DATA_STATEMENT = re.compile(
+    r'^\s*LOAD\s+DATA\s+LOCAL\s+INFILE\s+%s\s+INTO\s+TABLE\s+(\w+).*\(([^()]*)\)\s*$',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Clause ON DUPLICATE KEY UPDATE (avec ou sans alias de ligne), telle qu'émise par build_upsert_sql
+UPSERT_CLAUSE = re.compile(r'(?:\s+AS\s+(\w+))?\s+ON\s+DUPLICATE\s+KEY\s+UPDATE\s+', re.IGNORECASE)
+
+TSV_ESCAPES = {'\\\\': '\\', '\\t': '\t', '\\n': '\n', '\\r': '\r', '\\0': '\0'}
+
+for numpy_type, python_type in [(np.int64, int), (np.int32, int), (np.bool_, bool), (np.float64, float)]:
+    sqlite3.register_adapter(numpy_type, python_type)
+
+def read_tsv_rows(path):
+    """Relit un fichier au format texte de LOAD DATA (\\N pour NULL) en tuples"""
+    def unescape(field):
+        if field == '\\N':
+            return None
+        return re.sub(r'\\[\\tnr0]', lambda match: TSV_ESCAPES[match.group(0)], field)
+    
+    with open(path, encoding='utf-8', newline='') as f:
+        return [tuple(unescape(field) for field in line.rstrip('\n').split('\t')) for line in f]
+
+def translate_upsert(sql):
+    """
+    ON DUPLICATE KEY UPDATE -> ON CONFLICT (id) DO UPDATE
+    
+    Les nouvelles valeurs, lues par l'alias de ligne (col = new.col) ou par
+    VALUES(col) selon le serveur MySQL visé, deviennent EXCLUDED.col.
+    """
+    upsert = UPSERT_CLAUSE.search(sql)
+    if not upsert:
+        return sql
+    updates = re.sub(r'\bVALUES\((\w+)\)', r'EXCLUDED.\1', sql[upsert.end():], flags=re.IGNORECASE)
+    if upsert.group(1):
+        updates = re.sub(rf'\b{upsert.group(1)}\.(\w+)', r'EXCLUDED.\1', updates)
+    return f"{sql[:upsert.start()]} ON CONFLICT (id) DO UPDATE SET {updates}"
+
+class AdaptedCursor(ABC):
+    """
+    Curseur exposant l'interface mysql.connector utilisée par l'ETL sur un autre pilote
+    
+    Les requêtes sont traduites dans le dialecte cible, LOAD DATA est remplacé
+    par la primitive de chargement en masse du backend (bulk_load, propre à
+    chaque adaptateur) et les erreurs du pilote sont relancées en
+    mysql.connector.Error pour que les `except Error` de l'ETL s'appliquent à
+    tous les backends. Les violations de contrainte et erreurs de valeur
+    restent des IntegrityError / DataError (lignes rejetées une à une par
+    batching.commit_or_bisect).
+    """
+    
+    driver_error = Exception
+    integrity_error = ()
+    data_error = ()
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+    
+    def translate(self, sql):
+        return sql
+    
+    def run(self, sql, params):
+        self._cursor.execute(sql, params)
+    
+    def run_many(self, sql, seq_params):
+        self._cursor.executemany(sql, seq_params)
+    
+    @abstractmethod
+    def bulk_load(self, table, columns, path):
+        """Charge le fichier `path` au format texte de LOAD DATA dans `table` (`columns`)"""
+    
+    def wrap_error(self, error):
+        """Erreur du pilote convertie en mysql.connector.Error de même nature"""
+        if isinstance(error, self.integrity_error):
+            return errors.IntegrityError(msg=str(error))
+        if isinstance(error, self.data_error):
+            return errors.DataError(msg=str(error))
+        return Error(msg=str(error))
+    
+    def execute(self, sql, params=()):
+        if MYSQL_SESSION_STATEMENT.match(sql):
+            return
+        load_data = LOAD_DATA_STATEMENT.match(sql)
+        try:
+            if load_data:
+                columns = [col.strip() for col in load_data.group(2).split(',')]
+                self.bulk_load(load_data.group(1), columns, params[0])
+            else:
+                self.run(self.translate(sql), tuple(params))
+        except self.driver_error as e:
+            raise self.wrap_error(e) from e
+    
+    def executemany(self, sql, seq_params):
+        try:
+            self.run_many(self.translate(sql), [tuple(params) for params in seq_params])
+        except self.driver_error as e:
+            raise self.wrap_error(e) from e
+    
+    def close(self):
+        self._cursor.close()
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class SQLiteCursor(AdaptedCursor):
+    """Curseur SQLite : paramètres `?`, INSERT OR IGNORE, LOAD DATA rejoué par executemany"""
+    
+    driver_error = sqlite3.Error
+    integrity_error = sqlite3.IntegrityError
+    data_error = sqlite3.DataError
+    
+    def translate(self, sql):
+        sql = sql.replace('%s', '?').replace('INSERT IGNORE', 'INSERT OR IGNORE')
+        sql = sql.replace('DROP TEMPORARY TABLE', 'DROP TABLE')
+        return translate_upsert(sql)
+    
+    def bulk_load(self, table, columns, path):
+        placeholders = ', '.join(['?'] * len(columns))
+        self._cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", read_tsv_rows(path)
+        )
+
+class PostgreSQLCursor(AdaptedCursor):
+    """Curseur PostgreSQL : ON CONFLICT, RETURNING id pour lastrowid, COPY pour LOAD DATA"""
+    
+    driver_error = psycopg2.Error if psycopg2 else Exception
+    integrity_error = psycopg2.IntegrityError if psycopg2 else ()
+    data_error = psycopg2.DataError if psycopg2 else ()
+    
+    def __init__(self, cursor):
+        super().__init__(cursor)
+        self.lastrowid = None
+    
+    def translate(self, sql):
+        if 'INSERT IGNORE' in sql:
+            sql = sql.replace('INSERT IGNORE', 'INSERT').rstrip() + ' ON CONFLICT DO NOTHING'
+        sql = sql.replace('DROP TEMPORARY TABLE', 'DROP TABLE')
+        return translate_upsert(sql)
+    
+    def run(self, sql, params):
+        insert = re.match(r'^\s*INSERT\s+INTO\s+(\w+)\s*\([^)]*\)\s*VALUES\b', sql, re.IGNORECASE)
+        if insert and insert.group(1) in ID_TABLES and 'ON CONFLICT' not in sql:
+            self._cursor.execute(sql.rstrip() + ' RETURNING id', params)
+            self.lastrowid = self._cursor.fetchone()[0]
+        else:
+            self._cursor.execute(sql, params)
+    
+    def run_many(self, sql, seq_params):
+        # INSERT multi-lignes en une requête (executemany de psycopg2 envoie une requête par ligne)
+        values = re.search(r'VALUES\s*\((\s*%s\s*,?)+\)', sql)
+        if values and seq_params:
+            psycopg2.extras.execute_values(
+                self._cursor, sql[:values.start()] + 'VALUES %s' + sql[values.end():], seq_params, page_size=1000
+            )
+        else:
+            self._cursor.executemany(sql, seq_params)
+    
+    def bulk_load(self, table, columns, path):
+        # Le format texte de COPY utilise les mêmes échappements que LOAD DATA (\N, \t, \\)
+        with open(path, encoding='utf-8') as f:
+            self._cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", f)
+
+class AdaptedConnection(ABC):
+    """Connexion en autocommit où start_transaction ouvre une transaction explicite"""
+    
+    cursor_class = None
+    begin_statement = None
+    
+    def __init__(self, connexion):
+        self._connexion = connexion
+        self._in_transaction = False
+    
+    def cursor(self, *args, **kwargs):
+        return self.cursor_class(self._connexion.cursor())
+    
+    def _run(self, statement):
+        cursor = self._connexion.cursor()
+        try:
+            cursor.execute(statement)
+        except self.cursor_class.driver_error as e:
+            raise Error(msg=str(e)) from e
+        finally:
+            cursor.close()
+    
+    def start_transaction(self):
+        self._run(self.begin_statement)
+        self._in_transaction = True
+    
+    def commit(self):
+        if self._in_transaction:
+            self._in_transaction = False
+            self._run('COMMIT')
+    
+    def rollback(self):
+        if self._in_transaction:
+            self._in_transaction = False
+            self._run('ROLLBACK')
+    
+    @abstractmethod
+    def is_connected(self):
+        """Vrai tant que la connexion du pilote est ouverte"""
+    
+    def close(self):
+        self._connexion.close()
+
+class SQLiteConnection(AdaptedConnection):
+    """Base SQLite (fichier ou ':memory:'), schéma Laravel créé s'il manque"""
+    
+    cursor_class = SQLiteCursor
+    # Verrou d'écriture pris dès le début : évite les interblocages entre connexions parallèles
+    begin_statement = 'BEGIN IMMEDIATE'
+    
+    def __init__(self, database=':memory:', timeout=30):
+        connexion = sqlite3.connect(database, isolation_level=None, timeout=timeout, check_same_thread=False)
+        connexion.execute('PRAGMA foreign_keys = ON')
+        connexion.executescript(SQLITE_SCHEMA)
+        super().__init__(connexion)
+    
+    def is_connected(self):
+        try:
+            self._connexion.execute('SELECT 1')
+        except sqlite3.Error:  # ProgrammingError une fois la connexion fermée
+            return False
+        return True
+
+class PostgreSQLConnection(AdaptedConnection):
+    """Base PostgreSQL via psycopg2 (schéma créé par les migrations Laravel)"""
+    
+    cursor_class = PostgreSQLCursor
+    begin_statement = 'BEGIN'
+    
+    def __init__(self, **params):
+        if psycopg2 is None:
+            raise Error(msg="psycopg2 n'est pas installé: backend postgresql indisponible")
+        try:
+            connexion = psycopg2.connect(**params)
+        except psycopg2.Error as e:
+            raise Error(msg=str(e)) from e
+        connexion.autocommit = True
+        super().__init__(connexion)
+    
+    def is_connected(self):
+        # closed vaut 0 tant que la connexion est ouverte (1 fermée, 2 rompue)
+        return self._connexion.closed == 0
+
+def connect(backend, params):
+    """
+    Ouvre une connexion au backend demandé
+    
+    MySQL renvoie la connexion mysql.connector d'origine ; PostgreSQL et SQLite
+    renvoient une connexion adaptée qui accepte les mêmes requêtes et lève les
+    mêmes exceptions.
+    """
+    if backend == 'postgresql':
+        return PostgreSQLConnection(**params)
+    if backend == 'sqlite':
+        return SQLiteConnection(**params)
+    return mysql.connector.connect(**params)
@@ -0,0 +1,188 @@
+import logging
+import time
+
+from mysql.connector import Error, errors
+
+# Marge laissée sous max_allowed_packet (en-têtes, échappement des chaînes)
+PACKET_MARGIN = 0.8
+
+# Erreurs MySQL dues aux valeurs d'une ligne (NULL interdit, doublon de clé,
+# valeur hors limites, tronquée ou incorrecte, clé étrangère), levées parfois
+# sans SQLSTATE (raise_on_warnings) et donc en DatabaseError
+ROW_ERRNOS = {1048, 1062, 1264, 1265, 1292, 1366, 1406, 1451, 1452}
+
+# Délai d'attente de verrou et interblocage : le même lot est retenté après une pause
+LOCK_ERRNOS = {1205, 1213}
+LOCK_RETRIES = 3
+LOCK_RETRY_SECONDS = 0.5
+
+def fetch_max_allowed_packet(cursor):
+    """Lit max_allowed_packet (octets) sur le serveur, None si indisponible"""
+    try:
+        cursor.execute("SELECT @@max_allowed_packet")
+        return int(cursor.fetchone()[0])
+    except Error as e:
+        logging.debug(f"max_allowed_packet indisponible: {e}")
+        return None
+
+def estimate_row_bytes(rows):
+    """Estime la taille moyenne d'une ligne de paramètres une fois rendue en SQL"""
+    rows = list(rows)
+    if not rows:
+        return None
+    # Valeur rendue + guillemets et séparateur
+    total = sum(len(str(value)) + 3 for row in rows for value in row)
+    return max(1, total // len(rows))
+
+class AdaptiveBatcher:
+    """
+    Choisit la taille des lots d'après la latence mesurée des commits
+    
+    La taille double tant qu'un lot est validé en moins de la moitié de
+    `target_seconds`, est divisée par deux au-delà de 1,5 fois cette cible ou
+    après un échec, et reste bornée par [min_size, max_size] ainsi que par le
+    nombre de lignes tenant dans max_allowed_packet. Avec adaptive=False la
+    taille reste fixe (comportement historique).
+    """
+    
+    def __init__(self, initial_size=1000, min_size=10, max_size=20000, target_seconds=0.5, adaptive=True):
+        self.min_size = min_size
+        self.max_size = max(max_size, initial_size)
+        self.target_seconds = target_seconds
+        self.adaptive = adaptive
+        self.size = initial_size
+        self.sizes = []
+    
+    def limit_to_packet(self, max_allowed_packet, row_bytes):
+        """Plafonne la taille des lots pour qu'un INSERT multi-lignes tienne dans un paquet"""
+        if not max_allowed_packet or not row_bytes:
+            return
+        packet_rows = max(1, int(max_allowed_packet * PACKET_MARGIN) // row_bytes)
+        if packet_rows < self.max_size:
+            logging.info(f"Taille de lot plafonnée à {packet_rows} lignes (max_allowed_packet={max_allowed_packet})")
+            self.max_size = packet_rows
+            self.min_size = min(self.min_size, packet_rows)
+            self.size = min(self.size, packet_rows)
+    
+    def next_size(self):
+        """Taille du prochain lot"""
+        self.sizes.append(self.size)
+        return self.size
+    
+    def record(self, rows, seconds):
+        """Ajuste la taille après un lot validé de `rows` lignes en `seconds` secondes"""
+        if not self.adaptive or rows < self.size:
+            return
+        if seconds < self.target_seconds / 2:
+            self.size = min(self.size * 2, self.max_size)
+        elif seconds > self.target_seconds * 1.5:
+            self.size = max(self.size // 2, self.min_size)
+    
+    def record_failure(self):
+        """Réduit la taille après un lot en erreur (verrou, paquet trop gros...)"""
+        if self.adaptive:
+            self.size = max(self.size // 2, self.min_size)
+    
+    def summary(self):
+        """Tailles de lot retenues au cours du chargement"""
+        if not self.sizes:
+            return {'lots': 0}
+        return {
+            'lots': len(self.sizes),
+            'taille_min': min(self.sizes),
+            'taille_max': max(self.sizes),
+            'taille_finale': self.sizes[-1],
+        }
+
+def is_row_error(error):
+    """Vrai si l'erreur tient aux données d'une ligne (IntegrityError, DataError ou ROW_ERRNOS)"""
+    return isinstance(error, (errors.IntegrityError, errors.DataError)) or error.errno in ROW_ERRNOS
+
+def commit_or_bisect(connexion, batch, write, label):
+    """
+    Écrit un lot dans une transaction ; en cas d'erreur de données, le coupe en deux et recommence
+    
+    Une ligne isolée qui échoue encore est rejetée seule au lieu de faire perdre
+    tout le lot. Les attentes de verrou et interblocages (LOCK_ERRNOS) sont
+    retentés sur le même lot avec une pause croissante ; les autres erreurs
+    (connexion perdue, serveur indisponible...) ne viennent pas d'une ligne et
+    sont relancées sans découpage.
+    
+    Returns:
+        tuple: (compteurs additionnés des sous-lots validés, liste des (index, erreur) rejetés)
+    """
+    for attempt in range(LOCK_RETRIES + 1):
+        try:
+            connexion.start_transaction()
+            counts = write(batch)
+            connexion.commit()
+            return counts, []
+        except Error as e:
+            connexion.rollback()
+            if e.errno in LOCK_ERRNOS and attempt < LOCK_RETRIES:
+                delay = LOCK_RETRY_SECONDS * 2 ** attempt
+                logging.warning(f"{label}: verrou indisponible ({e}), nouvel essai dans {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            if not is_row_error(e):
+                raise
+            if len(batch) == 1:
+                logging.error(f"{label}: ligne {batch.index[0]} rejetée: {e}")
+                return {}, [(batch.index[0], str(e))]
+            logging.warning(f"{label}: erreur sur {len(batch)} lignes, découpage du lot ({e})")
+            break
+    
+    middle = len(batch) // 2
+    counts, rejected = commit_or_bisect(connexion, batch.iloc[:middle], write, label)
+    other_counts, other_rejected = commit_or_bisect(connexion, batch.iloc[middle:], write, label)
+    for key, value in other_counts.items():
+        counts[key] = counts.get(key, 0) + value
+    return counts, rejected + other_rejected
+
+def write_adaptive_batches(connexion, frame, write, batcher, label="Lot", on_batch=None,
+                           start=0, first_number=1, on_commit=None):
+    """
+    Écrit `frame` par lots de taille adaptative
+    
+    `write(batch)` exécute les requêtes d'un lot (sans commit) et renvoie un
+    dict de compteurs ; ils ne sont comptés que pour les lots validés.
+    `on_batch(lignes, secondes)` est appelé après chaque lot validé sans erreur,
+    `on_commit(position, numéro)` après chaque lot traité (validé ou découpé),
+    avec la position de la première ligne restant à écrire. L'écriture commence
+    à la ligne `start` (reprise d'un chargement interrompu).
+    
+    Returns:
+        dict: compteurs cumulés, plus 'rejetees' (liste des (index, erreur))
+    """
+    totals = {'rejetees': []}
+    total_rows = len(frame)
+    position = start
+    number = first_number - 1
+    while position < total_rows:
+        number += 1
+        batch = frame.iloc[position:position + batcher.next_size()]
+        position += len(batch)
+        
+        start_time = time.perf_counter()
+        counts, rejected = commit_or_bisect(connexion, batch, write, f"{label} {number}")
+        elapsed = time.perf_counter() - start_time
+        
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+        if rejected:
+            totals['rejetees'] += rejected
+            batcher.record_failure()
+        else:
+            batcher.record(len(batch), elapsed)
+            if on_batch:
+                on_batch(len(batch), elapsed)
+        if on_commit:
+            on_commit(position, number)
+        
+        logging.info(
+            f"{label} {number} : {len(batch)} lignes en {elapsed:.2f}s "
+            f"({position / total_rows * 100:.1f}% terminé, prochain lot: {batcher.size})"
+        )
+    
+    logging.info(f"{label}: tailles de lot retenues {batcher.summary()}")
+    return totals
@@ -0,0 +1,166 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Politiques de conservation dans un groupe de doublons : première ou dernière
+# occurrence du fichier, ou ligne la plus complète (première en cas d'égalité)
+KEEP_POLICIES = ['premier', 'dernier', 'complet']
+
+# Colonnes ajoutées au nom normalisé dans la clé approchante
+FUZZY_LOCATION_COLUMNS = [
+    'region', 'prefecture', 'canton_village_autonome',
+    'ville_village_quartier', 'commune_etab'
+]
+
+def fold_text_series(series):
+    """
+    Ramène une colonne de texte à sa forme de recherche
+    
+    Sans accents ni casse, ponctuation remplacée par des espaces : « Lomé-Golfe »
+    devient « lome golfe », comme la requête repliée par l'API.
+    """
+    text = series.astype(object).where(series.notna(), '').astype(str).str.normalize('NFKD')
+    text = text.str.encode('ascii', errors='ignore').str.decode('ascii').str.lower()
+    return text.str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+
+def hash_rows(frame):
+    """Empreinte 64 bits de chaque ligne (valeurs ramenées au texte)"""
+    return pd.util.hash_pandas_object(frame.astype(str), index=False).to_numpy()
+
+def code_keys(df, column='code_etablissement'):
+    """Clé de hachage du code de chaque ligne"""
+    return pd.Series(hash_rows(df[[column]]), index=df.index)
+
+def fuzzy_keys(df, name_column='nom_etablissement'):
+    """
+    Clé approchante : nom et localisation normalisés (fold_text_series)
+    
+    Returns:
+        Series: clé de hachage par ligne, <NA> pour les lignes sans nom
+    """
+    columns = [name_column] + [col for col in FUZZY_LOCATION_COLUMNS if col in df.columns]
+    folded = pd.DataFrame({col: fold_text_series(df[col]) for col in columns})
+    keys = pd.Series(hash_rows(folded), index=df.index).astype('UInt64')
+    return keys.where(folded[name_column].ne(''))
+
+def completeness(df):
+    """Nombre de valeurs renseignées (ni manquantes ni vides) par ligne"""
+    filled = df.notna()
+    for col in df.columns:
+        filled[col] &= df[col].astype(str).str.strip().ne('')
+    return filled.sum(axis=1)
+
+def kept_rows(keys, keep, df=None):
+    """
+    Ligne conservée (étiquette d'index) pour chaque ligne, selon la politique `keep`
+    
+    Returns:
+        Series: étiquette de la ligne gardée dans le groupe de même clé
+    """
+    positions = pd.Series(keys.index, index=keys.index)
+    groups = positions.groupby(keys.to_numpy(), sort=False)
+    if keep == 'dernier':
+        return groups.transform('last')
+    if keep == 'complet':
+        scores = pd.Series(completeness(df.loc[keys.index]).to_numpy(), index=keys.index)
+        best = scores.groupby(keys.to_numpy(), sort=False).transform('max')
+        # Première ligne du groupe atteignant le meilleur score
+        winners = positions.where(scores.eq(best))
+        return winners.groupby(keys.to_numpy(), sort=False).transform('first')
+    return groups.transform('first')
+
+def find_duplicates(df, candidates=None, keep='premier', fuzzy=False, seen=None):
+    """
+    Repère les doublons du DataFrame, par code puis (si `fuzzy`) par clé approchante
+    
+    Seules les lignes de `candidates` (toutes par défaut) sont comparées. Dans
+    chaque groupe, une ligne est gardée selon `keep` (KEEP_POLICIES). Les clés
+    déjà rencontrées dans un bloc précédent sont lues dans `seen` (dict
+    complété ici) : ces lignes sont écartées quelle que soit la politique.
+    
+    Returns:
+        tuple: (dict {motif: masque des lignes écartées}, Series de la ligne
+                conservée pour chaque ligne écartée, rapport des conflits)
+    """
+    if keep not in KEEP_POLICIES:
+        raise ValueError(f"Politique de doublons inconnue: {keep} (choix: {', '.join(KEEP_POLICIES)})")
+    if candidates is None:
+        candidates = pd.Series(True, index=df.index)
+    seen = {} if seen is None else seen
+    
+    masks = {}
+    kept = pd.Series(np.nan, index=df.index, dtype=object)
+    report = {'politique': keep}
+    remaining = candidates.copy()
+    key_functions = [('code_duplique', 'codes', code_keys)]
+    if fuzzy:
+        key_functions.append(('doublon_approchant', 'approchants', fuzzy_keys))
+    
+    for motif, seen_name, key_function in key_functions:
+        keys = key_function(df[remaining]).dropna()
+        previous = seen.setdefault(seen_name, set())
+        earlier = keys.isin(previous)
+        
+        current = keys[~earlier]
+        keepers = kept_rows(current, keep, df)
+        dropped_here = keepers.ne(keepers.index.to_series())
+        
+        # Valeurs comparées (hachage des lignes entières) dans les seuls groupes de doublons
+        groups = current[current.duplicated(keep=False)]
+        row_hashes = pd.Series(hash_rows(df.loc[groups.index]), index=groups.index)
+        differing = row_hashes.groupby(groups.to_numpy()).nunique().gt(1)
+        report[motif] = {
+            'groupes': int(groups.nunique()),
+            'en_conflit': int(differing.sum()),
+            'lignes_ecartees': int(dropped_here.sum() + earlier.sum()),
+            'blocs_precedents': int(earlier.sum()),
+        }
+        
+        mask = pd.Series(False, index=df.index)
+        mask[keepers.index[dropped_here]] = True
+        mask[keys.index[earlier.to_numpy()]] = True
+        masks[motif] = mask
+        kept[keepers.index[dropped_here]] = keepers[dropped_here]
+        
+        previous.update(current.unique().tolist())
+        remaining &= ~mask
+    
+    return masks, kept, report
+
+def log_duplicate_report(report):
+    """Journalise les groupes de doublons, ceux aux valeurs divergentes et les lignes écartées"""
+    for motif in ['code_duplique', 'doublon_approchant']:
+        entry = report.get(motif)
+        if not entry or not entry['lignes_ecartees']:
+            continue
+        logging.warning(
+            f"Doublons ({motif}): {entry['groupes']} groupes dont {entry['en_conflit']} aux valeurs "
+            f"divergentes, {entry['lignes_ecartees']} lignes écartées "
+            f"(politique '{report['politique']}', {entry['blocs_precedents']} vues dans un bloc précédent)"
+        )
+
+def deduplicate_dataframe(df, keep='premier', fuzzy=False, candidates=None):
+    """
+    Retire les doublons du DataFrame et rapporte les conflits
+    
+    Seules les lignes de `candidates` (toutes par défaut) sont comparées ; les
+    autres sont gardées telles quelles.
+    
+    Returns:
+        tuple: (DataFrame sans doublons, lignes écartées avec les colonnes
+                'motif' et 'ligne_conservee')
+    """
+    masks, kept, report = find_duplicates(df, candidates, keep, fuzzy)
+    log_duplicate_report(report)
+    
+    dropped = pd.Series(False, index=df.index)
+    motifs = pd.Series('', index=df.index, dtype=object)
+    for motif, mask in masks.items():
+        dropped |= mask
+        motifs[mask] = motif
+    
+    duplicates = df[dropped].copy()
+    duplicates['motif'] = motifs[dropped]
+    duplicates['ligne_conservee'] = kept[dropped]
+    return df[~dropped], duplicates
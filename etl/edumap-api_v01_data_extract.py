@@ -1,16 +1,40 @@
 import pandas as pd
+import numpy as np
+import openpyxl
 import mysql.connector
 from mysql.connector import Error
 import logging
 import os
+import re
 import sys
+import functools
+import threading
+import queue
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from collections import deque
+import glob
 import traceback
 import time
+import hashlib
+import shutil
+import tempfile
+import unicodedata
 from decimal import Decimal, ROUND_HALF_UP
 
+from backends import BACKENDS, connect
+from batching import AdaptiveBatcher, estimate_row_bytes, fetch_max_allowed_packet, write_adaptive_batches
+from deduplication import KEEP_POLICIES, find_duplicates, fold_text_series, log_duplicate_report
+
+try:
+    import pyarrow as pa
+except ImportError:  # cache colonnaire désactivé sans pyarrow
+    pa = None
+
 # Configuration du logging avec affichage console en plus du fichier
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler('import_excel_normalized.log'),
@@ -27,83 +51,321 @@ config = {
     'raise_on_warnings': True
 }
 
-def map_columns(df):
-    """Mappe les noms de colonnes pour assurer la cohérence"""
-    # Mapping des colonnes avec différentes variantes possibles
-    column_mapping = {
-        # Coordonnées géographiques
-        'LATITUDE': 'latitude',
-        'Latitude': 'latitude', 
-        'LONGITUDE': 'longitude',
-        'Longitude': 'longitude',
-        
-        # Informations établissement
-        'CODE_ETABLISSEMENT': 'code_etablissement',
-        'Code_etablissement': 'code_etablissement',
-        'NOM_ETABLISSEMENT': 'nom_etablissement',
-        'Nom_etablissement': 'nom_etablissement',
-        
-        # Localisation
-        'REGION': 'region',
-        'Region': 'region',
-        'PREFECTURE': 'prefecture',
-        'Prefecture': 'prefecture',
-        'CANTON_VILLAGE_AUTONOME': 'canton_village_autonome',
-        'Canton_village_autonome': 'canton_village_autonome',
-        'VILLE_VILLAGE_QUARTIER': 'ville_village_quartier',
-        'Ville_village_quartier': 'ville_village_quartier',
-        'COMMUNE_ETAB': 'commune_etab',
-        'Commune_etab': 'commune_etab',
-        
-        # Types
-        'LIBELLE_TYPE_MILIEU': 'libelle_type_milieu',
-        'Libelle_type_milieu': 'libelle_type_milieu',
-        'LIBELLE_TYPE_STATUT_ETAB': 'libelle_type_statut_etab',
-        'Libelle_type_statut_etab': 'libelle_type_statut_etab',
-        'LIBELLE_TYPE_SYSTEME': 'libelle_type_systeme',
-        'Libelle_type_systeme': 'libelle_type_systeme',
-        'LIBELLE_TYPE_ANNEE': 'libelle_type_annee',
-        'Libelle_type_annee': 'libelle_type_annee',
-        
-        # Equipements
-        'EXISTE_ELECT': 'existe_elect',
-        'Existe_elect': 'existe_elect',
-        'EXISTE_LATRINE': 'existe_latrine',
-        'Existe_latrine': 'existe_latrine',
-        'EXISTE_LATRINE_FONCT': 'existe_latrine_fonct',
-        'Existe_latrine_fonct': 'existe_latrine_fonct',
-        'ACCES_TOUTE_SAISON': 'acces_toute_saison',
-        'Acces_toute_saison': 'acces_toute_saison',
-        'EAU': 'eau',
-        'Eau': 'eau',
-        
-        # Effectifs - CORRECTION: noms conformes à la migration
-        'SOMMEDENB_EFF_G': 'sommedenb_eff_g',
-        'Sommedenb_eff_g': 'sommedenb_eff_g',
-        'SOMMEDENB_EFF_F': 'sommedenb_eff_f',
-        'Sommedenb_eff_f': 'sommedenb_eff_f',
-        'TOT': 'tot',  # CORRIGÉ: 'tot' au lieu de 'Tot'
-        'TOTAL': 'tot',
-        'Total': 'tot',
-        'SOMMEDENB_ENS_H': 'sommedenb_ens_h',
-        'Sommedenb_ens_h': 'sommedenb_ens_h',
-        'SOMMEDENB_ENS_F': 'sommedenb_ens_f',
-        'Sommedenb_ens_f': 'sommedenb_ens_f',
-        'TOTAL_ENSE': 'total_ense',  # CORRIGÉ: 'total_ense' au lieu de 'Total ense'
-        'Total_ense': 'total_ense',
-        'TOTAL ENSE': 'total_ense',
-        
-        # Infrastructures
-        'SOMMEDENB_SALLES_CLASSES_DUR': 'sommedenb_salles_classes_dur',
-        'Sommedenb_salles_classes_dur': 'sommedenb_salles_classes_dur',
-        'SOMMEDENB_SALLES_CLASSES_BANCO': 'sommedenb_salles_classes_banco',
-        'Sommedenb_salles_classes_banco': 'sommedenb_salles_classes_banco',
-        'SOMMEDENB_SALLES_CLASSES_AUTRE': 'sommedenb_salles_classes_autre',
-        'Sommedenb_salles_classes_autre': 'sommedenb_salles_classes_autre',
+# Paramètres des autres backends (--backend postgresql / sqlite)
+postgresql_config = {
+    'user': 'postgres',
+    'password': '',
+    'host': '127.0.0.1',
+    'dbname': 'edumap_api_v01'
+}
+
+sqlite_config = {
+    'database': 'edumap_api_v01.sqlite'
+}
+
+# Bornes (secondes) de l'histogramme de latence des lots
+BATCH_LATENCY_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+# Métriques de l'exécution : durée par étape, requêtes par table, latence des lots
+metrics = {}
+metrics_lock = threading.Lock()
+
+def reset_metrics():
+    """Remet à zéro les métriques de l'exécution"""
+    with metrics_lock:
+        metrics.clear()
+        metrics.update({
+            'etapes': {},
+            'requetes': {},
+            'fichiers': [],
+            'lots': {
+                'nombre': 0,
+                'lignes': 0,
+                'secondes': 0.0,
+                'histogramme': [0] * (len(BATCH_LATENCY_BUCKETS) + 1),
+            },
+        })
+
+reset_metrics()
+
+def record_stage(stage, seconds, rows=0):
+    """Ajoute un appel d'une étape (durée et lignes traitées) aux métriques"""
+    with metrics_lock:
+        entry = metrics['etapes'].setdefault(stage, {'appels': 0, 'secondes': 0.0, 'lignes': 0})
+        entry['appels'] += 1
+        entry['secondes'] += seconds
+        entry['lignes'] += rows
+
+def timed_stage(stage):
+    """Décorateur mesurant la durée de chaque appel (et les lignes du DataFrame reçu)"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                frame = next((arg for arg in args if isinstance(arg, pd.DataFrame)), None)
+                record_stage(stage, time.perf_counter() - start_time, len(frame) if frame is not None else 0)
+        return wrapper
+    return decorator
+
+def query_kind(sql):
+    """Verbe SQL et table visée d'une requête (ex: ('INSERT', 'effectifs'))"""
+    verb = sql.split(None, 1)[0].upper() if sql.strip() else '?'
+    match = re.search(
+        r'\b(?:INTO(?:\s+TABLE)?|FROM|UPDATE|TABLE(?:\s+IF\s+(?:NOT\s+)?EXISTS)?)\s+`?(\w+)',
+        sql, re.IGNORECASE
+    )
+    return verb, match.group(1) if match else '-'
+
+def record_query(sql):
+    """Compte une requête dans les métriques"""
+    key = '{} {}'.format(*query_kind(sql))
+    with metrics_lock:
+        metrics['requetes'][key] = metrics['requetes'].get(key, 0) + 1
+
+def record_file(path, rows, read_seconds, load_seconds, loaded):
+    """Ajoute le bilan d'un fichier source (lecture en processus séparé, puis chargement)"""
+    with metrics_lock:
+        metrics['fichiers'].append({
+            'fichier': path,
+            'lignes': rows,
+            'lecture_secondes': round(read_seconds, 4),
+            'chargement_secondes': round(load_seconds, 4),
+            'lignes_par_seconde': round(rows / load_seconds) if rows and load_seconds else None,
+            'charge': loaded,
+        })
+
+def record_batch(rows, seconds):
+    """Ajoute la latence d'un lot validé à l'histogramme"""
+    bucket = next(
+        (i for i, bound in enumerate(BATCH_LATENCY_BUCKETS) if seconds <= bound), len(BATCH_LATENCY_BUCKETS)
+    )
+    with metrics_lock:
+        batches = metrics['lots']
+        batches['nombre'] += 1
+        batches['lignes'] += rows
+        batches['secondes'] += seconds
+        batches['histogramme'][bucket] += 1
+
+class InstrumentedCursor:
+    """Curseur comptant chaque execute/executemany par verbe et par table"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+    
+    def execute(self, sql, params=(), *args, **kwargs):
+        record_query(sql)
+        return self._cursor.execute(sql, params, *args, **kwargs)
+    
+    def executemany(self, sql, seq_params, *args, **kwargs):
+        record_query(sql)
+        return self._cursor.executemany(sql, seq_params, *args, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class InstrumentedConnection:
+    """Connexion dont les curseurs alimentent les métriques de requêtes"""
+    
+    def __init__(self, connexion):
+        self._connexion = connexion
+    
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connexion.cursor(*args, **kwargs))
+    
+    def __getattr__(self, name):
+        return getattr(self._connexion, name)
+
+def metrics_report():
+    """Rapport structuré des métriques (étapes avec débit, requêtes, lots)"""
+    with metrics_lock:
+        stages = {
+            stage: {
+                **entry,
+                'secondes': round(entry['secondes'], 4),
+                'lignes_par_seconde': round(entry['lignes'] / entry['secondes']) if entry['lignes'] and entry['secondes'] else None,
+            }
+            for stage, entry in metrics['etapes'].items()
+        }
+        batches = dict(metrics['lots'])
+        queries = dict(sorted(metrics['requetes'].items()))
+        files = list(metrics['fichiers'])
+    
+    bounds = [str(bound) for bound in BATCH_LATENCY_BUCKETS] + ['+Inf']
+    return {
+        'etapes': stages,
+        'requetes': queries,
+        'requetes_total': sum(queries.values()),
+        'lots': {
+            'nombre': batches['nombre'],
+            'lignes': batches['lignes'],
+            'secondes': round(batches['secondes'], 4),
+            'lignes_par_seconde': round(batches['lignes'] / batches['secondes']) if batches['secondes'] else None,
+            'histogramme_secondes': dict(zip(bounds, batches['histogramme'])),
+        },
+        'fichiers': files,
     }
+
+def log_metrics_report(report):
+    """Affiche le rapport de fin d'exécution"""
+    logging.info("Rapport d'exécution - étapes:")
+    for stage, entry in report['etapes'].items():
+        rate = f", {entry['lignes_par_seconde']} lignes/s" if entry['lignes_par_seconde'] else ''
+        logging.info(f"  {stage}: {entry['appels']} appel(s), {entry['secondes']:.2f}s{rate}")
+    logging.info(f"Rapport d'exécution - requêtes ({report['requetes_total']}):")
+    for key, count in report['requetes'].items():
+        logging.info(f"  {key}: {count}")
+    batches = report['lots']
+    if batches['nombre']:
+        logging.info(
+            f"Rapport d'exécution - lots: {batches['nombre']} lots, {batches['lignes']} lignes, "
+            f"{batches['lignes_par_seconde']} lignes/s, latence: {batches['histogramme_secondes']}"
+        )
+    if report['fichiers']:
+        logging.info("Rapport d'exécution - fichiers:")
+        for entry in report['fichiers']:
+            status = '' if entry['charge'] else ' (aucune ligne insérée)'
+            logging.info(
+                f"  {entry['fichier']}: {entry['lignes']} lignes, lecture {entry['lecture_secondes']:.2f}s, "
+                f"chargement {entry['chargement_secondes']:.2f}s ({entry['lignes_par_seconde']} lignes/s){status}"
+            )
+
+def write_prometheus_textfile(report, path):
+    """Écrit le rapport au format texte Prometheus (collecteur textfile de node_exporter)"""
+    lines = [
+        "# HELP edumap_etl_stage_seconds Durée cumulée de chaque étape de l'ETL",
+        "# TYPE edumap_etl_stage_seconds gauge",
+    ]
+    lines += [f'edumap_etl_stage_seconds{{stage="{stage}"}} {entry["secondes"]}' for stage, entry in report['etapes'].items()]
+    lines += [
+        "# HELP edumap_etl_stage_rows Lignes traitées par étape",
+        "# TYPE edumap_etl_stage_rows gauge",
+    ]
+    lines += [f'edumap_etl_stage_rows{{stage="{stage}"}} {entry["lignes"]}' for stage, entry in report['etapes'].items()]
+    lines += [
+        "# HELP edumap_etl_queries Requêtes envoyées par verbe et par table",
+        "# TYPE edumap_etl_queries gauge",
+    ]
+    for key, count in report['requetes'].items():
+        verb, table = key.split(' ', 1)
+        lines.append(f'edumap_etl_queries{{verb="{verb}",table="{table}"}} {count}')
+    
+    batches = report['lots']
+    lines += [
+        "# HELP edumap_etl_batch_seconds Latence des lots validés",
+        "# TYPE edumap_etl_batch_seconds histogram",
+    ]
+    cumulative = 0
+    for bound, count in batches['histogramme_secondes'].items():
+        cumulative += count
+        lines.append(f'edumap_etl_batch_seconds_bucket{{le="{bound}"}} {cumulative}')
+    lines += [
+        f"edumap_etl_batch_seconds_sum {batches['secondes']}",
+        f"edumap_etl_batch_seconds_count {batches['nombre']}",
+    ]
+    if report['fichiers']:
+        lines += [
+            "# HELP edumap_etl_file_rows_per_second Débit de chargement de chaque fichier source",
+            "# TYPE edumap_etl_file_rows_per_second gauge",
+        ]
+        lines += [
+            f'edumap_etl_file_rows_per_second{{file="{os.path.basename(entry["fichier"])}"}} '
+            f'{entry["lignes_par_seconde"] or 0}'
+            for entry in report['fichiers']
+        ]
+    
+    # Écriture atomique : le collecteur ne doit jamais lire un fichier partiel
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, path)
+
+# Schéma déclaratif des colonnes source : variantes de nom acceptées en plus du
+# nom canonique, type cible, valeurs manquantes admises (sinon remplacées par
+# `default`, ou ligne écartée s'il n'y en a pas) et bornes de validité
+SOURCE_SCHEMA = {
+    # Coordonnées géographiques
+    'latitude': {'dtype': 'float64', 'nullable': True, 'range': (-90, 90)},
+    'longitude': {'dtype': 'float64', 'nullable': True, 'range': (-180, 180)},
+    
+    # Informations établissement
+    'code_etablissement': {'dtype': 'str', 'nullable': False},
+    'nom_etablissement': {'dtype': 'str', 'nullable': True},
+    
+    # Localisation
+    'region': {'dtype': 'category', 'nullable': True},
+    'prefecture': {'dtype': 'category', 'nullable': True},
+    'canton_village_autonome': {'dtype': 'str', 'nullable': True},
+    'ville_village_quartier': {'dtype': 'str', 'nullable': True},
+    'commune_etab': {'dtype': 'str', 'nullable': True},
+    
+    # Types
+    'libelle_type_milieu': {'dtype': 'category', 'nullable': True},
+    'libelle_type_statut_etab': {'dtype': 'str', 'nullable': True},
+    'libelle_type_systeme': {'dtype': 'str', 'nullable': True},
+    'libelle_type_annee': {'dtype': 'str', 'nullable': True},
+    
+    # Equipements
+    'existe_elect': {'dtype': 'bool', 'nullable': False, 'default': False},
+    'existe_latrine': {'dtype': 'bool', 'nullable': False, 'default': False},
+    'existe_latrine_fonct': {'dtype': 'bool', 'nullable': False, 'default': False},
+    'acces_toute_saison': {'dtype': 'bool', 'nullable': False, 'default': False},
+    'eau': {'dtype': 'bool', 'nullable': False, 'default': False},
+    
+    # Effectifs (noms conformes à la migration)
+    'sommedenb_eff_g': {'dtype': 'int32', 'nullable': False, 'default': 0, 'range': (0, None)},
+    'sommedenb_eff_f': {'dtype': 'int32', 'nullable': False, 'default': 0, 'range': (0, None)},
+    'tot': {'aliases': ['total'], 'dtype': 'int32', 'nullable': False, 'default': 0, 'range': (0, None)},
+    'sommedenb_ens_h': {'dtype': 'int32', 'nullable': False, 'default': 0, 'range': (0, None)},
+    'sommedenb_ens_f': {'dtype': 'int32', 'nullable': False, 'default': 0, 'range': (0, None)},
+    'total_ense': {'dtype': 'int32', 'nullable': False, 'default': 0, 'range': (0, None)},
+    
+    # Infrastructures
+    'sommedenb_salles_classes_dur': {'dtype': 'int32', 'nullable': False, 'default': 0, 'range': (0, None)},
+    'sommedenb_salles_classes_banco': {'dtype': 'int32', 'nullable': False, 'default': 0, 'range': (0, None)},
+    'sommedenb_salles_classes_autre': {'dtype': 'int32', 'nullable': False, 'default': 0, 'range': (0, None)},
+}
+
+# Types imposés dès la lecture par pd.read_excel / pd.read_csv ; les colonnes
+# numériques et booléennes, souvent mal saisies, sont converties par clean_data
+READ_DTYPES = {'str': str, 'category': 'category'}
+
+def normalize_column_name(name):
+    """Forme de comparaison d'un nom de colonne : sans casse, espaces et '_' confondus"""
+    return re.sub(r'[\s_]+', '_', str(name).strip()).lower()
+
+# Nom normalisé (canonique ou variante) -> nom canonique
+COLUMN_ALIASES = {
+    normalize_column_name(name): column
+    for column, spec in SOURCE_SCHEMA.items()
+    for name in [column] + spec.get('aliases', [])
+}
+
+def canonical_column(name):
+    """Nom canonique d'une colonne source, ou son nom d'origine si elle est hors schéma"""
+    return COLUMN_ALIASES.get(normalize_column_name(name), name)
+
+def source_read_dtypes(columns):
+    """Argument dtype de pd.read_excel / pd.read_csv pour les colonnes d'en-tête `columns`"""
+    dtypes = {}
+    for name in columns:
+        spec = SOURCE_SCHEMA.get(canonical_column(name))
+        if spec and spec['dtype'] in READ_DTYPES:
+            dtypes[name] = READ_DTYPES[spec['dtype']]
+    return dtypes
+
+@timed_stage('map_columns')
+def map_columns(df):
+    """Mappe les noms de colonnes sur les noms canoniques de SOURCE_SCHEMA"""
+    df_mapped = df.rename(columns=canonical_column)
     
-    # Appliquer le mapping
-    df_mapped = df.rename(columns=column_mapping)
+    duplicated = df_mapped.columns.duplicated()
+    if duplicated.any():
+        logging.warning(f"Colonnes en double après mapping, première occurrence conservée: "
+                        f"{sorted(set(df_mapped.columns[duplicated]))}")
+        df_mapped = df_mapped.loc[:, ~duplicated]
     
     # Afficher les colonnes disponibles pour débogage
     logging.info(f"Colonnes disponibles après mapping: {list(df_mapped.columns)}")
@@ -121,16 +383,15 @@ def verify_database_tables(connexion):
         cursor = connexion.cursor()
         
         for table in required_tables:
-            cursor.execute(f"SHOW TABLES LIKE '{table}'")
-            table_exists = cursor.fetchone()
-            
-            if not table_exists:
+            # Requête vide valable sur tous les backends : échoue si la table n'existe pas
+            try:
+                cursor.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+                cursor.fetchall()
+            except Error:
                 logging.error(f"La table '{table}' n'existe pas dans la base de données.")
                 return False
             
-            cursor.execute(f"DESCRIBE {table}")
-            columns = cursor.fetchall()
-            logging.info(f"Structure de la table {table}: {[col[0] for col in columns]}")
+            logging.info(f"Structure de la table {table}: {[col[0] for col in cursor.description]}")
         
         return True
         
@@ -157,97 +418,402 @@ def print_dataframe_sample(df):
     if missing.sum() > 0:
         logging.debug(f"Valeurs manquantes par colonne:\n{missing[missing > 0]}")
 
+# Bornes de validité des coordonnées géographiques
+COORDINATE_LIMITS = {col: SOURCE_SCHEMA[col]['range'][1] for col in ['latitude', 'longitude']}
+
+def parse_coordinate_series(series, limit):
+    """
+    Convertit une colonne de coordonnées en nombres (virgules décimales acceptées)
+    
+    Returns:
+        tuple: (Series float64, masques des valeurs manquantes, non numériques et hors [-limit, limit])
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        missing = series.isna()
+        numeric = series.astype('float64')
+    else:
+        text = series.astype(str).str.strip().str.replace(',', '.', regex=False)
+        missing = series.isna() | text.isin(['', 'nan', 'None'])
+        numeric = pd.to_numeric(text.where(~missing), errors='coerce')
+    
+    non_numeric = numeric.isna() & ~missing
+    out_of_range = numeric.notna() & ~numeric.between(-limit, limit)
+    return numeric, missing, non_numeric, out_of_range
+
+def clean_coordinate_series(series, limit, precision=8):
+    """
+    Nettoie une colonne de coordonnées en une seule passe vectorisée
+    
+    Les virgules décimales sont remplacées, les valeurs converties en nombres,
+    filtrées sur [-limit, limit] et arrondies à `precision` décimales. Les
+    valeurs manquantes, nulles, non numériques ou hors limites deviennent NaN
+    (NULL en base).
+    
+    Returns:
+        tuple: (Series float64 nettoyée, dict du nombre de valeurs rejetées par motif)
+    """
+    numeric, missing, non_numeric, out_of_range = parse_coordinate_series(series, limit)
+    cleaned = numeric.where(~out_of_range).round(precision)
+    
+    rejected = {
+        'manquantes': int((missing | cleaned.eq(0)).sum()),
+        'non_numeriques': int(non_numeric.sum()),
+        'hors_limites': int(out_of_range.sum()),
+    }
+    return cleaned.where(cleaned != 0), rejected
+
+def integer_bounds(spec):
+    """Bornes [min, max] d'une colonne entière du schéma (limites d'int32 par défaut)"""
+    low, high = spec.get('range', (None, None))
+    low = np.iinfo('int32').min if low is None else low
+    high = np.iinfo('int32').max if high is None else high
+    return low, high
+
+def clean_integer_series(series, spec):
+    """
+    Convertit une colonne de comptage en entiers 32 bits selon son schéma
+    
+    Les valeurs manquantes prennent la valeur par défaut, les décimales sont
+    tronquées comme int(float(valeur)). Les valeurs non numériques ou hors
+    bornes deviennent <NA> (type Int32) : transform_dataframe écarte ces lignes.
+    
+    Returns:
+        tuple: (Series Int32, dict du nombre de valeurs rejetées par motif)
+    """
+    missing = series.isna()
+    numeric = pd.to_numeric(series, errors='coerce').astype('float64')
+    numeric = numeric.where(~missing, spec['default'])
+    
+    low, high = integer_bounds(spec)
+    non_numeric = ~np.isfinite(numeric)
+    out_of_range = ~non_numeric & ~numeric.between(low, high)
+    
+    values = np.trunc(numeric.where(~(non_numeric | out_of_range))).astype('Int32')
+    rejected = {
+        'non_numeriques': int(non_numeric.sum()),
+        'hors_limites': int(out_of_range.sum()),
+    }
+    return values, rejected
+
+def clean_category_series(series):
+    """Convertit une colonne de libellés en catégorie, valeurs manquantes en ''"""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.where(series.isna(), series.astype(str)).astype('category')
+    elif not all(isinstance(value, str) for value in series.cat.categories):
+        series = series.astype(object).where(series.isna(), series.astype(str)).astype('category')
+    if series.isna().any():
+        if '' not in series.cat.categories:
+            series = series.cat.add_categories('')
+        series = series.fillna('')
+    return series
+
+@timed_stage('clean_data')
 def clean_data(df):
-    """Nettoie et prépare les données"""
-    logging.info("Début du nettoyage des données...")
+    """
+    Nettoie et prépare les données selon SOURCE_SCHEMA
     
-    # Liste des colonnes numériques - CORRIGÉE selon la migration
-    colonnes_numeriques = [
-        'sommedenb_eff_g', 'sommedenb_eff_f', 'tot', 'sommedenb_ens_h', 
-        'sommedenb_ens_f', 'total_ense', 'sommedenb_salles_classes_dur', 
-        'sommedenb_salles_classes_banco', 'sommedenb_salles_classes_autre'
-    ]
+    Chaque colonne connue est convertie dans son type cible : entiers 32 bits
+    pour les effectifs et salles, booléens pour les équipements, catégories
+    pour les libellés répétitifs, float64 pour les coordonnées. Les colonnes
+    texte gardent '' pour les valeurs manquantes.
+    """
+    logging.info("Début du nettoyage des données...")
     
-    # Remplacer les valeurs NaN
-    existing_num_cols = [col for col in colonnes_numeriques if col in df.columns]
-    df[existing_num_cols] = df[existing_num_cols].fillna(0)
-    df = df.fillna('')
+    for col, spec in SOURCE_SCHEMA.items():
+        if col not in df.columns:
+            continue
+        
+        dtype = spec['dtype']
+        if not spec['nullable'] and 'default' not in spec:
+            missing = int(df[col].isna().sum())
+            if missing:
+                logging.warning(f"Colonne '{col}' obligatoire: {missing} valeurs manquantes")
+        
+        if dtype == 'float64':
+            # Coordonnées géographiques (colonne entière, arrondi à 8 décimales)
+            try:
+                df[col], rejected = clean_coordinate_series(df[col], spec['range'][1])
+                if rejected['non_numeriques'] or rejected['hors_limites']:
+                    logging.warning(
+                        f"Coordonnées '{col}' rejetées: {rejected['non_numeriques']} non numériques, "
+                        f"{rejected['hors_limites']} hors limites ({rejected['manquantes']} manquantes)"
+                    )
+            except Exception as e:
+                logging.error(f"Erreur lors du nettoyage des {col}s: {e}")
+        elif dtype == 'int32':
+            df[col], rejected = clean_integer_series(df[col], spec)
+            if rejected['non_numeriques'] or rejected['hors_limites']:
+                logging.warning(
+                    f"Colonne '{col}': {rejected['non_numeriques']} valeurs non numériques, "
+                    f"{rejected['hors_limites']} hors limites"
+                )
+        elif dtype == 'bool':
+            values = convert_to_boolean_series(df[col])
+            df[col] = values.where(df[col].notna(), spec['default']).astype(bool)
+        elif dtype == 'category':
+            df[col] = clean_category_series(df[col])
+        else:
+            df[col] = df[col].fillna('')
     
-    # Nettoyer les coordonnées géographiques avec précision Decimal
-    if 'latitude' in df.columns:
-        try:
-            df['latitude'] = df['latitude'].astype(str).str.replace(',', '.')
-            df['latitude'] = df['latitude'].replace('', '0').replace('nan', '0')
-            df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce').fillna(0)
-            df['latitude'] = df['latitude'].apply(lambda x: x if -90 <= x <= 90 else None)
-        except Exception as e:
-            logging.error(f"Erreur lors du nettoyage des latitudes: {e}")
-    
-    if 'longitude' in df.columns:
-        try:
-            df['longitude'] = df['longitude'].astype(str).str.replace(',', '.')
-            df['longitude'] = df['longitude'].replace('', '0').replace('nan', '0')
-            df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce').fillna(0)
-            df['longitude'] = df['longitude'].apply(lambda x: x if -180 <= x <= 180 else None)
-        except Exception as e:
-            logging.error(f"Erreur lors du nettoyage des longitudes: {e}")
+    # Colonnes hors schéma : valeurs manquantes remplacées comme auparavant
+    others = [col for col in df.columns if col not in SOURCE_SCHEMA]
+    if others:
+        df[others] = df[others].fillna('')
     
     logging.info("Nettoyage des données terminé")
     return df
 
-def get_or_create_lookup_id(cursor, table, column, value):
-    """Récupère ou crée un ID dans une table de lookup"""
+LOOKUP_TABLES = {
+    'milieux': 'libelle_type_milieu',
+    'statuts': 'libelle_type_statut_etab',
+    'systemes': 'libelle_type_systeme',
+    'annees': 'libelle_type_annee',
+}
+
+# Colonnes identifiant une localisation (conformément à la migration)
+LOCALISATION_COLUMNS = [
+    'region', 'prefecture', 'canton_village_autonome',
+    'ville_village_quartier', 'commune_etab'
+]
+
+# Index composite conseillé pour retrouver une localisation sans parcourir la
+# table (préfixes pour rester sous la limite de 3072 octets d'InnoDB en utf8mb4)
+LOCALISATION_INDEX_SQL = (
+    "CREATE UNIQUE INDEX localisations_cle_unique ON localisations "
+    "(region(64), prefecture(64), canton_village_autonome(128), ville_village_quartier(128), commune_etab(128))"
+)
+
+def factorize_localisations(df):
+    """
+    Code chaque ligne par sa localisation (cinq colonnes) en une passe groupby
+    
+    Les localisations ne sont ensuite résolues qu'une fois par tuple distinct,
+    et l'ID diffusé à toutes les lignes par indexation sur le code.
+    
+    Returns:
+        tuple: (tableau des codes par ligne, DataFrame des localisations distinctes
+                dont la ligne i correspond au code i)
+    """
+    localisations = df.reindex(columns=LOCALISATION_COLUMNS, fill_value='')
+    # Codes entiers par colonne d'abord : le regroupement sur des entiers est
+    # plus rapide que sur cinq colonnes de texte
+    column_codes = pd.DataFrame({
+        col: pd.factorize(localisations[col])[0] for col in LOCALISATION_COLUMNS
+    })
+    codes = column_codes.groupby(LOCALISATION_COLUMNS, sort=False).ngroup().to_numpy()
+    first_rows = np.unique(codes, return_index=True)[1]
+    return codes, localisations.iloc[first_rows].reset_index(drop=True)
+
+def suggest_localisation_index(cursor):
+    """
+    Conseille l'index composite sur localisations s'il manque (MySQL)
+    
+    Returns:
+        bool: True si un index commence déjà par les colonnes de LOCALISATION_COLUMNS
+    """
+    try:
+        cursor.execute("SHOW INDEX FROM localisations")
+        indexes = {}
+        for row in cursor.fetchall():
+            # Key_name, Seq_in_index, Column_name
+            indexes.setdefault(row[2], {})[row[3]] = row[4]
+    except Error as e:
+        logging.debug(f"Index de localisations non vérifiés: {e}")
+        return False
+    
+    for columns in indexes.values():
+        if [columns.get(position) for position in range(1, len(LOCALISATION_COLUMNS) + 1)] == LOCALISATION_COLUMNS:
+            return True
+    logging.info(
+        "Aucun index composite sur les colonnes de localisations : une localisation absente "
+        f"du cache coûte un parcours de table. Index conseillé : {LOCALISATION_INDEX_SQL}"
+    )
+    return False
+
+def cache_key(value):
+    """
+    Normalise une valeur pour l'utiliser comme clé du cache de lookup.
+    
+    MySQL compare les libellés sans tenir compte de la casse, des accents ni
+    des espaces de fin (collation *_ci) : la clé reproduit ce comportement pour
+    que le cache retrouve les mêmes lignes que le SELECT d'origine.
+    """
+    text = unicodedata.normalize('NFKD', str(value).strip())
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+
+def localisation_values(row):
+    """Extrait les valeurs de localisation d'une ligne (commune_etab à None si absente)"""
+    commune_etab = str(row.get('commune_etab', '')) if row.get('commune_etab') else None
+    return (
+        str(row.get('region', '')),
+        str(row.get('prefecture', '')),
+        str(row.get('canton_village_autonome', '')),
+        str(row.get('ville_village_quartier', '')),
+        commune_etab
+    )
+
+def localisation_key(values):
+    """Clé de cache d'une localisation à partir de ses cinq valeurs"""
+    return tuple(cache_key(value if value is not None else '') for value in values)
+
+def load_lookup_cache(cursor):
+    """
+    Précharge les tables de référence et les localisations en mémoire
+    
+    Returns:
+        dict: {table: {clé normalisée: id}} pour chaque table de LOOKUP_TABLES
+              et pour 'localisations'
+    """
+    cache = {}
+    
+    for table, column in LOOKUP_TABLES.items():
+        cursor.execute(f"SELECT id, {column} FROM {table}")
+        cache[table] = {
+            cache_key(value): lookup_id
+            for lookup_id, value in cursor.fetchall()
+            if value is not None
+        }
+    
+    cache['localisations'] = {}
+    cache_localisations(cursor, cache)
+    
+    logging.info("Cache de référence chargé: " + ", ".join(
+        f"{table}={len(values)}" for table, values in cache.items()
+    ))
+    return cache
+
+def cache_localisations(cursor, cache, min_id=0):
+    """Ajoute au cache les localisations dont l'id est supérieur à min_id"""
+    cursor.execute(f"""
+        SELECT id, {', '.join(LOCALISATION_COLUMNS)} FROM localisations
+        WHERE id > %s
+    """, (min_id,))
+    for localisation_id, *values in cursor.fetchall():
+        cache['localisations'].setdefault(localisation_key(values), localisation_id)
+
+@timed_stage('warm_lookup_cache')
+def warm_lookup_cache(cursor, cache, df):
+    """
+    Insère en masse les libellés et localisations du DataFrame absents du cache
+    
+    Une seule requête multi-lignes par table est envoyée pour les nouvelles
+    valeurs, puis le cache est rechargé pour récupérer leurs IDs.
+    
+    Returns:
+        dict: nombre de nouvelles valeurs insérées par table
+    """
+    inserted = {}
+    
+    for table, column in LOOKUP_TABLES.items():
+        if column not in df.columns:
+            continue
+        
+        nouvelles = {}
+        for value in df[column].dropna().unique():
+            if not value or str(value).strip() == '':
+                continue
+            key = cache_key(value)
+            if key not in cache[table]:
+                nouvelles.setdefault(key, str(value).strip())
+        
+        if not nouvelles:
+            continue
+        
+        cursor.executemany(
+            f"INSERT IGNORE INTO {table} ({column}) VALUES (%s)",
+            [(value,) for value in nouvelles.values()]
+        )
+        cursor.execute(f"SELECT id, {column} FROM {table}")
+        cache[table] = {
+            cache_key(value): lookup_id
+            for lookup_id, value in cursor.fetchall()
+            if value is not None
+        }
+        inserted[table] = len(nouvelles)
+    
+    _, distinct = factorize_localisations(df)
+    nouvelles = {}
+    for row in distinct.to_dict('records'):
+        values = localisation_values(row)
+        key = localisation_key(values)
+        if key not in cache['localisations']:
+            nouvelles.setdefault(key, values)
+    
+    if nouvelles:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM localisations")
+        max_id = cursor.fetchone()[0]
+        cursor.executemany("""
+            INSERT INTO localisations (region, prefecture, canton_village_autonome, 
+                                     ville_village_quartier, commune_etab)
+            VALUES (%s, %s, %s, %s, %s)
+        """, list(nouvelles.values()))
+        cache_localisations(cursor, cache, max_id)
+        inserted['localisations'] = len(nouvelles)
+    
+    if inserted:
+        logging.info(f"Nouvelles valeurs de référence insérées: {inserted}")
+    return inserted
+
+@timed_stage('get_or_create_lookup_id')
+def get_or_create_lookup_id(cursor, table, column, value, cache=None):
+    """Récupère ou crée un ID dans une table de lookup (via le cache s'il est fourni)"""
     if not value or str(value).strip() == '':
         return None
     
     value_str = str(value).strip()
     
+    if cache is not None:
+        lookup_id = cache[table].get(cache_key(value_str))
+        if lookup_id is not None:
+            return lookup_id
+    
     # Chercher si la valeur existe déjà
     cursor.execute(f"SELECT id FROM {table} WHERE {column} = %s", (value_str,))
     result = cursor.fetchone()
     
     if result:
-        return result[0]
+        lookup_id = result[0]
+    else:
+        # Insérer la nouvelle valeur
+        cursor.execute(f"INSERT INTO {table} ({column}) VALUES (%s)", (value_str,))
+        lookup_id = cursor.lastrowid
     
-    # Insérer la nouvelle valeur
-    cursor.execute(f"INSERT INTO {table} ({column}) VALUES (%s)", (value_str,))
-    return cursor.lastrowid
+    if cache is not None:
+        cache[table][cache_key(value_str)] = lookup_id
+    return lookup_id
 
-def insert_localisation(cursor, row):
+@timed_stage('insert_localisation')
+def insert_localisation(cursor, row, cache=None):
     """Insère une localisation et retourne son ID (SANS coordonnées comme spécifié dans la migration)"""
+    values = localisation_values(row)
+    
+    if cache is not None:
+        localisation_id = cache['localisations'].get(localisation_key(values))
+        if localisation_id is not None:
+            return localisation_id
+    
     # Vérifier si la localisation existe déjà
     cursor.execute("""
         SELECT id FROM localisations 
         WHERE region = %s AND prefecture = %s AND canton_village_autonome = %s 
         AND ville_village_quartier = %s AND COALESCE(commune_etab, '') = %s
-    """, (
-        str(row.get('region', '')),
-        str(row.get('prefecture', '')),
-        str(row.get('canton_village_autonome', '')),
-        str(row.get('ville_village_quartier', '')),
-        str(row.get('commune_etab', '')) if row.get('commune_etab') else ''
-    ))
+    """, values[:4] + (values[4] or '',))
     
     result = cursor.fetchone()
     if result:
-        return result[0]
-    
-    # Insérer la nouvelle localisation SANS coordonnées (conformément à la migration)
-    commune_etab = str(row.get('commune_etab', '')) if row.get('commune_etab') else None
-    
-    cursor.execute("""
-        INSERT INTO localisations (region, prefecture, canton_village_autonome, 
-                                 ville_village_quartier, commune_etab)
-        VALUES (%s, %s, %s, %s, %s)
-    """, (
-        str(row.get('region', '')),
-        str(row.get('prefecture', '')),
-        str(row.get('canton_village_autonome', '')),
-        str(row.get('ville_village_quartier', '')),
-        commune_etab
-    ))
+        localisation_id = result[0]
+    else:
+        # Insérer la nouvelle localisation SANS coordonnées (conformément à la migration)
+        cursor.execute("""
+            INSERT INTO localisations (region, prefecture, canton_village_autonome, 
+                                     ville_village_quartier, commune_etab)
+            VALUES (%s, %s, %s, %s, %s)
+        """, values)
+        localisation_id = cursor.lastrowid
     
-    return cursor.lastrowid
+    if cache is not None:
+        cache['localisations'][localisation_key(values)] = localisation_id
+    return localisation_id
 
 def convert_to_decimal(value, default=None, precision=8):
     """
@@ -289,22 +855,19 @@ def convert_to_decimal(value, default=None, precision=8):
         logging.warning(f"Impossible de convertir '{value}' en Decimal: {e}")
         return default
 
+# Libellés considérés comme vrais pour les colonnes d'équipement
+BOOLEAN_TRUE_VALUES = ['true', '1', 'yes', 'oui', 'vrai']
+
 def convert_to_boolean(value):
     """Convertit une valeur en booléen de manière sûre"""
     if isinstance(value, bool):
         return value
     if isinstance(value, str):
-        return value.lower() in ['true', '1', 'yes', 'oui', 'vrai']
+        return value.lower() in BOOLEAN_TRUE_VALUES
     if isinstance(value, (int, float)):
         return bool(value)
     return False
 
-def check_etablissement_exists(cursor, code_etablissement):
-    """Vérifie si un établissement existe déjà par son code"""
-    cursor.execute("SELECT id FROM etablissements WHERE code_etablissement = %s", (code_etablissement,))
-    result = cursor.fetchone()
-    return result[0] if result else None
-
 def validate_coordinates(latitude, longitude):
     """
     Valide les coordonnées géographiques
@@ -341,165 +904,486 @@ def validate_coordinates(latitude, longitude):
     
     return valid_lat, valid_lng
 
-def insert_etablissement_data(connexion, df, batch_size=100):
-    """Insère les données des établissements dans la structure normalisée"""
+# Colonnes des tables filles, dans l'ordre des migrations
+EQUIPEMENT_COLUMNS = [
+    'existe_elect', 'existe_latrine', 'existe_latrine_fonct',
+    'acces_toute_saison', 'eau'
+]
+
+EFFECTIF_COLUMNS = [
+    'sommedenb_eff_g', 'sommedenb_eff_f', 'tot',
+    'sommedenb_ens_h', 'sommedenb_ens_f', 'total_ense'
+]
+
+INFRASTRUCTURE_COLUMNS = [
+    'sommedenb_salles_classes_dur', 'sommedenb_salles_classes_banco',
+    'sommedenb_salles_classes_autre'
+]
+
+# Niveaux de zoom (tuiles Web Mercator) pré-calculés pour le regroupement sur la carte
+TILE_ZOOMS = [8, 11, 14]
+
+# Précision du geohash (9 caractères : cellule d'environ 5 m x 5 m)
+GEOHASH_PRECISION = 9
+
+# Colonnes numériques et clés spatiales indexées, dérivées de latitude/longitude
+SPATIAL_COLUMNS = ['lat', 'lng', 'geohash'] + [f'tuile_z{zoom}' for zoom in TILE_ZOOMS]
+
+ETABLISSEMENT_COLUMNS = [
+    'code_etablissement', 'nom_etablissement', 'localisation_id', 'milieu_id',
+    'statut_id', 'systeme_id', 'annee_id', 'latitude', 'longitude'
+] + SPATIAL_COLUMNS
+
+# Tables filles liées par etablissement_id et leurs colonnes de données
+CHILD_TABLES = {
+    'equipements_etablissement': EQUIPEMENT_COLUMNS,
+    'effectifs': EFFECTIF_COLUMNS,
+    'infrastructures': INFRASTRUCTURE_COLUMNS,
+}
+
+def build_insert_sql(table, columns):
+    """Construit une requête INSERT paramétrée pour executemany"""
+    placeholders = ', '.join(['%s'] * len(columns))
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+def insert_prepared_rows(cursor, rows):
+    """
+    Insère des établissements préparés absents de la base, avec leurs lignes filles
+    
+    Un seul INSERT multi-lignes par table ; les IDs des nouveaux établissements
+    sont retrouvés par code_etablissement (les codes doivent être uniques).
+    
+    Returns:
+        dict: {code_etablissement: etablissement_id}
+    """
+    cursor.executemany(
+        build_insert_sql('etablissements', ETABLISSEMENT_COLUMNS),
+        list(iter_parameter_tuples(rows, ETABLISSEMENT_COLUMNS))
+    )
+    ids = fetch_etablissement_ids(cursor, rows['code_etablissement'].tolist())
+    etablissement_ids = [(ids[code],) for code in rows['code_etablissement'].tolist()]
+    
+    for table, columns in CHILD_TABLES.items():
+        cursor.executemany(build_insert_sql(table, ['etablissement_id'] + columns), [
+            etablissement_id + values for etablissement_id, values
+            in zip(etablissement_ids, iter_parameter_tuples(rows, columns))
+        ])
+    return ids
+
+def fetch_etablissement_ids(cursor, codes, batch_size=1000):
+    """
+    Récupère les IDs des établissements existants par code
+    
+    Une requête par tranche de `batch_size` codes : un lot adaptatif (jusqu'à
+    20000 lignes) dépasserait sinon la limite de paramètres de SQLite.
+    """
+    codes = list(dict.fromkeys(codes))
+    ids = {}
+    for i in range(0, len(codes), batch_size):
+        batch = codes[i:i + batch_size]
+        placeholders = ', '.join(['%s'] * len(batch))
+        cursor.execute(f"""
+            SELECT code_etablissement, MAX(id) FROM etablissements
+            WHERE code_etablissement IN ({placeholders})
+            GROUP BY code_etablissement
+        """, tuple(batch))
+        ids.update(cursor.fetchall())
+    return ids
+
+def convert_to_boolean_series(series):
+    """Version vectorisée de convert_to_boolean pour une colonne entière"""
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype(bool)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.ne(0)
+    if isinstance(series.dtype, pd.StringDtype):
+        return series.fillna('').str.lower().isin(BOOLEAN_TRUE_VALUES)
+    
+    is_text = series.map(type).eq(str)
+    text_true = series.where(is_text, '').astype(str).str.lower().isin(BOOLEAN_TRUE_VALUES)
+    numeric = pd.to_numeric(series.where(~is_text), errors='coerce')
+    return text_true | numeric.fillna(0).ne(0)
+
+def convert_to_int_series(series):
+    """
+    Version vectorisée de int(float(valeur)) pour une colonne entière
+    
+    Returns:
+        tuple: (valeurs int64, masque des valeurs convertibles)
+    """
+    numeric = pd.to_numeric(series, errors='coerce')
+    valid = pd.Series(np.isfinite(numeric.to_numpy(dtype='float64')), index=series.index)
+    values = np.trunc(numeric.where(valid, 0).to_numpy(dtype='float64')).astype('int64')
+    return pd.Series(values, index=series.index), valid
+
+def quantize_coordinate_series(series, limit, precision=8):
+    """
+    Version vectorisée de validate_coordinates pour une colonne entière
+    
+    Les valeurs hors limites, nulles ou non numériques (NaN après
+    clean_coordinate_series) deviennent None ; les autres sont formatées avec
+    `precision` décimales, comme le Decimal quantifié envoyé à MySQL.
+    """
+    numeric = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64')
+    with np.errstate(invalid='ignore'):
+        valid = (numeric >= -limit) & (numeric <= limit) & (numeric != 0)
+    formatted = np.char.mod(f'%.{precision}f', np.round(np.where(valid, numeric, 0), precision))
+    return pd.Series(
+        np.where(valid, formatted.astype(object), None),
+        index=series.index, dtype=object
+    )
+
+GEOHASH_ALPHABET = np.array(list('0123456789bcdefghjkmnpqrstuvwxyz'))
+
+# Latitude maximale de la projection Web Mercator
+MERCATOR_MAX_LATITUDE = 85.05112878
+
+def geohash_series(lat, lng, precision=GEOHASH_PRECISION):
+    """
+    Geohash de chaque point, calculé pour toute la colonne à la fois
+    
+    Les coordonnées sont discrétisées sur 5 * precision bits entrelacés
+    (longitude sur les bits pairs), puis découpées en caractères base 32.
+    """
+    bits = 5 * precision
+    lng_bits, lat_bits = (bits + 1) // 2, bits // 2
+    lat_cells = np.clip(((lat + 90) / 180 * 2 ** lat_bits).astype('int64'), 0, 2 ** lat_bits - 1)
+    lng_cells = np.clip(((lng + 180) / 360 * 2 ** lng_bits).astype('int64'), 0, 2 ** lng_bits - 1)
+    
+    codes = np.zeros(len(lat), dtype='int64')
+    for bit in range(bits):
+        if bit % 2 == 0:
+            value = (lng_cells >> (lng_bits - 1 - bit // 2)) & 1
+        else:
+            value = (lat_cells >> (lat_bits - 1 - bit // 2)) & 1
+        codes = (codes << 1) | value
+    
+    characters = [GEOHASH_ALPHABET[(codes >> (5 * (precision - 1 - i))) & 31] for i in range(precision)]
+    return functools.reduce(np.char.add, characters)
+
+def tile_keys(lat, lng, zoom):
+    """Clé de la tuile Web Mercator (x * 2^zoom + y) contenant chaque point au niveau `zoom`"""
+    tiles = 2 ** zoom
+    lat_radians = np.radians(np.clip(lat, -MERCATOR_MAX_LATITUDE, MERCATOR_MAX_LATITUDE))
+    x = np.clip(((lng + 180) / 360 * tiles).astype('int64'), 0, tiles - 1)
+    y = np.clip(((1 - np.arcsinh(np.tan(lat_radians)) / np.pi) / 2 * tiles).astype('int64'), 0, tiles - 1)
+    return x * tiles + y
+
+def spatial_keys(latitude, longitude):
+    """
+    Colonnes SPATIAL_COLUMNS dérivées des coordonnées validées (quantize_coordinate_series)
+    
+    lat/lng sont les coordonnées en nombres (indexables pour les requêtes
+    par emprise), geohash et tuile_z* les clés de regroupement ; tout est
+    None quand l'une des deux coordonnées manque.
+    """
+    lat = pd.to_numeric(latitude, errors='coerce').to_numpy(dtype='float64')
+    lng = pd.to_numeric(longitude, errors='coerce').to_numpy(dtype='float64')
+    valid = ~np.isnan(lat) & ~np.isnan(lng)
+    lat, lng = np.where(valid, lat, 0), np.where(valid, lng, 0)
+    
+    def nullable(values):
+        return pd.Series(np.where(valid, values.astype(object), None), index=latitude.index, dtype=object)
+    
+    keys = pd.DataFrame({
+        'lat': nullable(lat),
+        'lng': nullable(lng),
+        'geohash': nullable(geohash_series(lat, lng)),
+    }, index=latitude.index)
+    for zoom in TILE_ZOOMS:
+        keys[f'tuile_z{zoom}'] = nullable(tile_keys(lat, lng, zoom))
+    return keys
+
+@timed_stage('transform_dataframe')
+def transform_dataframe(df):
+    """
+    Convertit le DataFrame nettoyé en colonnes typées, en une seule passe
+    
+    Remplace les conversions cellule par cellule (str, int(float(...)),
+    convert_to_boolean, validate_coordinates) des boucles iterrows : chaque
+    colonne est convertie en tableau NumPy, et les lignes non convertibles
+    sont écartées avec un décompte global.
+    
+    Returns:
+        DataFrame: colonnes de ETABLISSEMENT_COLUMNS (hors IDs de référence,
+                   avec les clés spatiales de spatial_keys), EQUIPEMENT_COLUMNS, EFFECTIF_COLUMNS et INFRASTRUCTURE_COLUMNS,
+                   indexé comme df
+    """
+    def column(name, default):
+        if name in df.columns:
+            return df[name]
+        return pd.Series(default, index=df.index)
+    
+    prepared = pd.DataFrame(index=df.index)
+    prepared['code_etablissement'] = column('code_etablissement', '').astype(str).astype(object)
+    prepared['nom_etablissement'] = column('nom_etablissement', '').astype(str).astype(object)
+    prepared['latitude'] = quantize_coordinate_series(column('latitude', None), COORDINATE_LIMITS['latitude'])
+    prepared['longitude'] = quantize_coordinate_series(column('longitude', None), COORDINATE_LIMITS['longitude'])
+    prepared[SPATIAL_COLUMNS] = spatial_keys(prepared['latitude'], prepared['longitude'])
+    
+    for col in EQUIPEMENT_COLUMNS:
+        prepared[col] = convert_to_boolean_series(column(col, False))
+    
+    valid = prepared['code_etablissement'] != ''
+    missing_codes = int((~valid).sum())
+    if missing_codes:
+        logging.warning(f"{missing_codes} lignes sans code établissement ignorées")
+    
+    invalid_numbers = 0
+    for col in EFFECTIF_COLUMNS + INFRASTRUCTURE_COLUMNS:
+        prepared[col], convertible = convert_to_int_series(column(col, 0))
+        invalid_numbers += int((valid & ~convertible).sum())
+        valid &= convertible
+    if invalid_numbers:
+        logging.warning(f"{invalid_numbers} valeurs numériques non convertibles, lignes ignorées")
+    
+    return prepared[valid]
+
+@timed_stage('resolve_reference_ids')
+def resolve_reference_ids(cursor, df, prepared, cache):
+    """
+    Ajoute à `prepared` les IDs de référence résolus depuis le cache
+    
+    Chaque valeur distincte n'est résolue qu'une fois, puis l'ID est diffusé à
+    toutes les lignes. Les lignes sans localisation, milieu, statut ou système
+    sont écartées.
+    """
+    source = df.loc[prepared.index]
+    prepared = prepared.copy()
+    
+    for table, column in LOOKUP_TABLES.items():
+        id_column = {
+            'milieux': 'milieu_id', 'statuts': 'statut_id',
+            'systemes': 'systeme_id', 'annees': 'annee_id'
+        }[table]
+        values = source[column] if column in source.columns else pd.Series(None, index=source.index)
+        ids = {
+            value: get_or_create_lookup_id(cursor, table, column, value, cache)
+            for value in values.unique()
+        }
+        prepared[id_column] = values.map(ids).astype('Int64').astype(object)
+    
+    codes, distinct = factorize_localisations(source)
+    localisation_ids = np.array(
+        [insert_localisation(cursor, row, cache) for row in distinct.to_dict('records')],
+        dtype=object
+    )
+    prepared['localisation_id'] = localisation_ids[codes]
+    logging.debug(f"{len(source)} lignes, {len(distinct)} localisations distinctes")
+    
+    prepared['annee_id'] = prepared['annee_id'].where(prepared['annee_id'].notna(), None)
+    required = prepared[['localisation_id', 'milieu_id', 'statut_id', 'systeme_id']]
+    complete = required.notna().all(axis=1)
+    if (~complete).any():
+        logging.warning(f"{int((~complete).sum())} lignes avec IDs de référence manquants ignorées")
+    return prepared[complete]
+
+def iter_parameter_tuples(prepared, columns):
+    """Produit les tuples de paramètres SQL (types Python natifs) colonne par colonne"""
+    return zip(*(prepared[col].tolist() for col in columns))
+
+def insert_etablissement_data(connexion, df, batch_size=100, cache=None, adaptive=True, checkpoint=None):
+    """
+    Insère les données des établissements dans la structure normalisée
+    
+    Les tables de référence et les localisations sont résolues depuis un cache
+    mémoire (chargé ici si non fourni) : les valeurs absentes sont insérées en
+    masse avant le premier lot, ce qui évite un SELECT par table et par ligne.
+    `batch_size` est la taille du premier lot, ajustée ensuite d'après la
+    latence des commits (sauf adaptive=False). Avec un `checkpoint`
+    (open_checkpoint), la progression est sauvegardée après chaque lot et un
+    chargement interrompu reprend à la première ligne non validée.
+    """
     try:
         cursor = connexion.cursor()
+        
+        if cache is None:
+            cache = checkpoint_cache(checkpoint) or load_lookup_cache(cursor)
+        warm_lookup_cache(cursor, cache, df)
+        
+        # Conversion de toutes les colonnes en une passe avant les INSERT
+        prepared = resolve_reference_ids(cursor, df, transform_dataframe(df), cache)
+        connexion.commit()
+        
         total_rows = len(df)
-        batches = (total_rows // batch_size) + (1 if total_rows % batch_size > 0 else 0)
+        batcher = create_batcher(cursor, prepared, batch_size, adaptive, max_size=5000)
         
-        logging.info(f"Début de l'insertion des données ({total_rows} lignes, {batches} lots)")
+        logging.info(f"Début de l'insertion des données ({total_rows} lignes, premier lot de {batcher.size})")
         start_time = time.time()
-        successful_inserts = 0
-        skipped_duplicates = 0
-        coordinate_errors = 0
-        
-        for i in range(batches):
-            start_idx = i * batch_size
-            end_idx = min((i + 1) * batch_size, total_rows)
-            batch = df.iloc[start_idx:end_idx]
-            
-            try:
-                connexion.start_transaction()
-                
-                for idx, row in batch.iterrows():
-                    try:
-                        # Vérifier l'unicité du code établissement
-                        code_etab = str(row.get('code_etablissement', ''))
-                        if not code_etab:
-                            logging.warning(f"Ligne {idx}: Code établissement manquant, ignorée")
-                            continue
-                        
-                        existing_id = check_etablissement_exists(cursor, code_etab)
-                        if existing_id:
-                            skipped_duplicates += 1
-                            logging.debug(f"Établissement {code_etab} déjà existant, ignoré")
-                            continue
-                        
-                        # 1. Insérer/récupérer les IDs des tables de référence
-                        milieu_id = get_or_create_lookup_id(
-                            cursor, 'milieux', 'libelle_type_milieu', 
-                            row.get('libelle_type_milieu')
-                        )
-                        
-                        statut_id = get_or_create_lookup_id(
-                            cursor, 'statuts', 'libelle_type_statut_etab', 
-                            row.get('libelle_type_statut_etab')
-                        )
-                        
-                        systeme_id = get_or_create_lookup_id(
-                            cursor, 'systemes', 'libelle_type_systeme', 
-                            row.get('libelle_type_systeme')
-                        )
-                        
-                        annee_id = get_or_create_lookup_id(
-                            cursor, 'annees', 'libelle_type_annee', 
-                            row.get('libelle_type_annee')
-                        )
-                        
-                        # 2. Insérer la localisation (sans coordonnées)
-                        localisation_id = insert_localisation(cursor, row)
-                        
-                        # 3. Valider et préparer les coordonnées pour l'établissement
-                        latitude, longitude = validate_coordinates(
-                            row.get('latitude'), 
-                            row.get('longitude')
-                        )
-                        
-                        if latitude is None and longitude is None:
-                            coordinate_errors += 1
-                            logging.debug(f"Ligne {idx}: Coordonnées invalides pour {code_etab}")
-                        
-                        # 4. Vérifier que les IDs obligatoires existent
-                        if not all([localisation_id, milieu_id, statut_id, systeme_id]):
-                            logging.warning(f"Ligne {idx}: IDs de référence manquants, ignorée")
-                            continue
-                        
-                        # 5. Insérer l'établissement AVEC coordonnées validées
-                        cursor.execute("""
-                            INSERT INTO etablissements (code_etablissement, nom_etablissement,
-                                                       localisation_id, milieu_id, statut_id, 
-                                                       systeme_id, annee_id, latitude, longitude)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """, (
-                            code_etab,
-                            str(row.get('nom_etablissement', '')),
-                            localisation_id,
-                            milieu_id,
-                            statut_id,
-                            systeme_id,
-                            annee_id,
-                            latitude,
-                            longitude
-                        ))
-                        
-                        etablissement_id = cursor.lastrowid
-                        
-                        # 6. Insérer les équipements avec conversion booléenne sûre
-                        cursor.execute("""
-                            INSERT INTO equipements_etablissement (etablissement_id, existe_elect,
-                                                                  existe_latrine, existe_latrine_fonct,
-                                                                  acces_toute_saison, eau)
-                            VALUES (%s, %s, %s, %s, %s, %s)
-                        """, (
-                            etablissement_id,
-                            convert_to_boolean(row.get('existe_elect', False)),
-                            convert_to_boolean(row.get('existe_latrine', False)),
-                            convert_to_boolean(row.get('existe_latrine_fonct', False)),
-                            convert_to_boolean(row.get('acces_toute_saison', False)),
-                            convert_to_boolean(row.get('eau', False))
-                        ))
-                        
-                        # 7. Insérer les effectifs avec noms de colonnes corrigés
-                        cursor.execute("""
-                            INSERT INTO effectifs (etablissement_id, sommedenb_eff_g, sommedenb_eff_f,
-                                                 tot, sommedenb_ens_h, sommedenb_ens_f, total_ense)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        """, (
-                            etablissement_id,
-                            int(float(row.get('sommedenb_eff_g', 0))),
-                            int(float(row.get('sommedenb_eff_f', 0))),
-                            int(float(row.get('tot', 0))),
-                            int(float(row.get('sommedenb_ens_h', 0))),
-                            int(float(row.get('sommedenb_ens_f', 0))),
-                            int(float(row.get('total_ense', 0)))
-                        ))
-                        
-                        # 8. Insérer les infrastructures
-                        cursor.execute("""
-                            INSERT INTO infrastructures (etablissement_id, sommedenb_salles_classes_dur,
-                                                       sommedenb_salles_classes_banco, sommedenb_salles_classes_autre)
-                            VALUES (%s, %s, %s, %s)
-                        """, (
-                            etablissement_id,
-                            int(float(row.get('sommedenb_salles_classes_dur', 0))),
-                            int(float(row.get('sommedenb_salles_classes_banco', 0))),
-                            int(float(row.get('sommedenb_salles_classes_autre', 0)))
-                        ))
-                        
-                        successful_inserts += 1
-                        
-                    except Exception as e:
-                        logging.error(f"Erreur avec la ligne {idx} (code: {code_etab}): {e}")
+        coordinate_errors = int((prepared['latitude'].isna() & prepared['longitude'].isna()).sum())
+        
+        def write_rows(batch):
+            counts = {'inseres': 0, 'doublons': 0}
+            # Codes déjà en base lus en une requête pour tout le lot
+            existing = set(fetch_etablissement_ids(cursor, batch['code_etablissement'].unique().tolist()))
+            rows = zip(
+                batch.index,
+                iter_parameter_tuples(batch, ETABLISSEMENT_COLUMNS),
+                iter_parameter_tuples(batch, EQUIPEMENT_COLUMNS),
+                iter_parameter_tuples(batch, EFFECTIF_COLUMNS),
+                iter_parameter_tuples(batch, INFRASTRUCTURE_COLUMNS)
+            )
+            for idx, etablissement, equipements, effectifs, infrastructures in rows:
+                code_etab = etablissement[0]
+                try:
+                    # Vérifier l'unicité du code établissement
+                    if code_etab in existing:
+                        counts['doublons'] += 1
+                        logging.debug(f"Établissement {code_etab} déjà existant, ignoré")
                         continue
-                
-                connexion.commit()
-                batch_time = time.time() - start_time
-                percent_complete = (end_idx / total_rows) * 100
-                logging.info(f"Lot {i+1}/{batches} : {len(batch)} lignes traitées en {batch_time:.2f}s ({percent_complete:.1f}% terminé)")
-                
-            except Error as e:
-                connexion.rollback()
-                logging.error(f"Erreur lors de l'insertion du lot {i+1}: {e}")
-                continue
+                    
+                    # Insérer l'établissement AVEC coordonnées validées et clés spatiales
+                    cursor.execute(build_insert_sql('etablissements', ETABLISSEMENT_COLUMNS), etablissement)
+                    
+                    etablissement_id = cursor.lastrowid
+                    
+                    # Insérer les équipements
+                    cursor.execute("""
+                        INSERT INTO equipements_etablissement (etablissement_id, existe_elect,
+                                                              existe_latrine, existe_latrine_fonct,
+                                                              acces_toute_saison, eau)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                    """, (etablissement_id,) + equipements)
+                    
+                    # Insérer les effectifs avec noms de colonnes corrigés
+                    cursor.execute("""
+                        INSERT INTO effectifs (etablissement_id, sommedenb_eff_g, sommedenb_eff_f,
+                                             tot, sommedenb_ens_h, sommedenb_ens_f, total_ense)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """, (etablissement_id,) + effectifs)
+                    
+                    # Insérer les infrastructures
+                    cursor.execute("""
+                        INSERT INTO infrastructures (etablissement_id, sommedenb_salles_classes_dur,
+                                                   sommedenb_salles_classes_banco, sommedenb_salles_classes_autre)
+                        VALUES (%s, %s, %s, %s)
+                    """, (etablissement_id,) + infrastructures)
+                    
+                    existing.add(code_etab)
+                    counts['inseres'] += 1
+                    
+                except Exception as e:
+                    logging.error(f"Erreur avec la ligne {idx} (code: {code_etab}): {e}")
+                    continue
+            return counts
+        
+        stats = write_adaptive_batches(
+            connexion, prepared, write_rows, batcher, on_batch=record_batch,
+            **checkpoint_arguments(checkpoint, cache)
+        )
+        clear_checkpoint(checkpoint)
         
         total_time = time.time() - start_time
         logging.info(f"Insertion terminée en {total_time:.2f} secondes.")
-        logging.info(f"Lignes insérées avec succès: {successful_inserts}/{total_rows}")
-        logging.info(f"Doublons ignorés: {skipped_duplicates}")
+        logging.info(f"Lignes insérées avec succès: {stats.get('inseres', 0)}/{total_rows}")
+        logging.info(f"Doublons ignorés: {stats.get('doublons', 0)}")
+        logging.info(f"Lignes rejetées: {len(stats['rejetees'])}")
+        logging.info(f"Erreurs de coordonnées: {coordinate_errors}")
+        
+        return stats.get('inseres', 0) > 0
+        
+    except Error as e:
+        connexion.rollback()
+        logging.error(f"Erreur lors de l'insertion des données: {e}")
+        return False
+    finally:
+        cursor.close()
+
+def checkpoint_cache(checkpoint):
+    """Cache de référence sauvegardé dans le point de reprise (None si absent)"""
+    return checkpoint['cache'] if checkpoint else None
+
+def checkpoint_arguments(checkpoint, cache):
+    """Options de write_adaptive_batches pour reprendre et sauvegarder la progression"""
+    if not checkpoint:
+        return {}
+    return {
+        'start': checkpoint['lignes_validees'],
+        'first_number': checkpoint['lots_valides'] + 1,
+        'on_commit': lambda position, number: save_checkpoint(checkpoint, position, number, cache),
+    }
+
+def create_batcher(cursor, prepared, batch_size, adaptive=True, max_size=20000):
+    """Crée le batcher d'un chargement, plafonné par le max_allowed_packet du serveur"""
+    batcher = AdaptiveBatcher(batch_size, max_size=max_size, adaptive=adaptive)
+    row_bytes = estimate_row_bytes(iter_parameter_tuples(prepared.head(1000), ETABLISSEMENT_COLUMNS))
+    batcher.limit_to_packet(fetch_max_allowed_packet(cursor), row_bytes)
+    return batcher
+
+def write_prepared_batches(connexion, cursor, prepared, batcher, label="Lot", **batch_options):
+    """
+    Écrit des lignes préparées par lots, une transaction par lot
+    
+    Dans chaque lot, les codes en double sont ramenés à une ligne, les codes
+    déjà en base sont écartés par une seule requête IN, puis chaque table est
+    écrite par un INSERT multi-lignes (insert_prepared_rows). La taille des
+    lots suit `batcher` ; un lot en erreur est coupé en deux jusqu'à isoler
+    les lignes fautives.
+    
+    Returns:
+        dict: nombre de lignes insérées, de doublons ignorés et de lignes rejetées
+    """
+    def write_batch(batch):
+        # 1. Un seul établissement par code dans le lot
+        unique_batch = batch.drop_duplicates('code_etablissement')
+        
+        # 2. Écarter en une requête les établissements déjà présents
+        existing = fetch_etablissement_ids(cursor, unique_batch['code_etablissement'].tolist())
+        new_rows = unique_batch[~unique_batch['code_etablissement'].isin(list(existing))]
+        
+        if len(new_rows):
+            # 3. Un INSERT multi-lignes par table
+            insert_prepared_rows(cursor, new_rows)
+        return {'inseres': len(new_rows), 'doublons': len(batch) - len(new_rows)}
+    
+    stats = write_adaptive_batches(
+        connexion, prepared, write_batch, batcher, label, on_batch=record_batch, **batch_options
+    )
+    return {
+        'inseres': stats.get('inseres', 0),
+        'doublons': stats.get('doublons', 0),
+        'rejetees': len(stats['rejetees']),
+    }
+
+def insert_etablissement_data_bulk(connexion, df, batch_size=1000, cache=None, adaptive=True, checkpoint=None):
+    """
+    Insère les établissements par lots ensembliste
+    
+    Pour chaque lot, toutes les lignes filles sont calculées à l'avance et chaque
+    table est écrite par un seul executemany (INSERT multi-lignes). Les IDs des
+    nouveaux établissements sont retrouvés par code_etablissement au lieu de
+    cursor.lastrowid. `batch_size` est la taille du premier lot (voir
+    AdaptiveBatcher) ; `checkpoint` permet la reprise comme en mode ligne.
+    """
+    try:
+        cursor = connexion.cursor()
+        
+        if cache is None:
+            cache = checkpoint_cache(checkpoint) or load_lookup_cache(cursor)
+        warm_lookup_cache(cursor, cache, df)
+        
+        prepared = resolve_reference_ids(cursor, df, transform_dataframe(df), cache)
+        connexion.commit()
+        
+        total_rows = len(df)
+        batcher = create_batcher(cursor, prepared, batch_size, adaptive)
+        logging.info(f"Début de l'insertion en masse ({total_rows} lignes, premier lot de {batcher.size})")
+        start_time = time.time()
+        coordinate_errors = int((prepared['latitude'].isna() & prepared['longitude'].isna()).sum())
+        
+        stats = write_prepared_batches(
+            connexion, cursor, prepared, batcher, **checkpoint_arguments(checkpoint, cache)
+        )
+        clear_checkpoint(checkpoint)
+        
+        total_time = time.time() - start_time
+        logging.info(f"Insertion en masse terminée en {total_time:.2f} secondes.")
+        logging.info(f"Lignes insérées avec succès: {stats['inseres']}/{total_rows}")
+        logging.info(f"Doublons ignorés: {stats['doublons']}")
+        logging.info(f"Lignes rejetées: {stats['rejetees']}")
         logging.info(f"Erreurs de coordonnées: {coordinate_errors}")
         
-        return successful_inserts > 0
+        return stats['inseres'] > 0
         
     except Error as e:
         connexion.rollback()
@@ -508,8 +1392,1704 @@ def insert_etablissement_data(connexion, df, batch_size=100):
     finally:
         cursor.close()
 
-def test_database_connection():
+def partition_prepared_rows(prepared, keys, workers):
+    """
+    Répartit les lignes en `workers` partitions équilibrées sans couper une clé
+    
+    Les groupes de `keys` (ex: région) sont affectés du plus gros au plus petit
+    à la partition la moins chargée.
+    """
+    sizes = keys.value_counts(dropna=False)
+    partitions = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for key, size in sizes.items():
+        target = loads.index(min(loads))
+        partitions[target].append(key)
+        loads[target] += size
+    
+    return [prepared[keys.isin(partition).to_numpy()] for partition in partitions if partition]
+
+def load_partition(connection_factory, worker_number, rows, batcher):
+    """Charge une partition sur sa propre connexion (et son propre batcher) et mesure son débit"""
+    start_time = time.time()
+    connexion = connection_factory()
+    try:
+        cursor = connexion.cursor()
+        try:
+            stats = write_prepared_batches(
+                connexion, cursor, rows, batcher, label=f"Worker {worker_number} lot"
+            )
+        finally:
+            cursor.close()
+    finally:
+        connexion.close()
+    
+    stats['worker'] = worker_number
+    stats['lignes'] = len(rows)
+    stats['secondes'] = time.time() - start_time
+    stats['lignes_par_seconde'] = len(rows) / stats['secondes'] if stats['secondes'] else 0
+    return stats
+
+def insert_etablissement_data_parallel(connexion, df, workers=4, batch_size=1000, cache=None,
+                                       partition_column='region', connection_factory=None, adaptive=True):
+    """
+    Charge les établissements en parallèle sur plusieurs connexions
+    
+    Les IDs de référence sont résolus une seule fois sur `connexion` (et les
+    nouvelles valeurs validées) avant de répartir les lignes par
+    `partition_column` entre `workers` threads, chacun avec sa connexion.
+    Les codes en double sont éliminés au préalable pour que les partitions
+    n'écrivent jamais le même établissement.
+    """
+    if connection_factory is None:
+        connection_factory = lambda: InstrumentedConnection(mysql.connector.connect(**config))
+    
+    cursor = connexion.cursor()
+    try:
+        if cache is None:
+            cache = load_lookup_cache(cursor)
+        warm_lookup_cache(cursor, cache, df)
+        prepared = resolve_reference_ids(cursor, df, transform_dataframe(df), cache)
+        connexion.commit()
+        max_size = create_batcher(cursor, prepared, batch_size, adaptive).max_size
+    except Error as e:
+        connexion.rollback()
+        logging.error(f"Erreur lors de la résolution des références: {e}")
+        return False
+    finally:
+        cursor.close()
+    
+    unique = prepared.drop_duplicates('code_etablissement')
+    duplicates = len(prepared) - len(unique)
+    if partition_column in df.columns:
+        keys = df.loc[unique.index, partition_column].astype(str)
+    else:
+        keys = pd.Series(np.arange(len(unique)) % workers, index=unique.index)
+    partitions = partition_prepared_rows(unique, keys, workers)
+    
+    logging.info(f"Chargement parallèle: {len(unique)} lignes réparties en {len(partitions)} partitions par '{partition_column}'")
+    start_time = time.time()
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                load_partition, connection_factory, number, rows,
+                AdaptiveBatcher(batch_size, max_size=max_size, adaptive=adaptive)
+            )
+            for number, rows in enumerate(partitions, start=1)
+        ]
+        for future in as_completed(futures):
+            try:
+                stats = future.result()
+            except Error as e:
+                logging.error(f"Erreur d'un worker de chargement: {e}")
+                continue
+            results.append(stats)
+            logging.info(
+                f"Worker {stats['worker']}: {stats['inseres']}/{stats['lignes']} lignes insérées "
+                f"en {stats['secondes']:.2f}s ({stats['lignes_par_seconde']:.0f} lignes/s)"
+            )
+    
+    total_time = time.time() - start_time
+    inserted = sum(stats['inseres'] for stats in results)
+    logging.info(f"Chargement parallèle terminé en {total_time:.2f} secondes "
+                 f"({inserted / total_time if total_time else 0:.0f} lignes/s au total).")
+    logging.info(f"Lignes insérées avec succès: {inserted}/{len(df)}")
+    logging.info(f"Doublons ignorés: {duplicates + sum(stats['doublons'] for stats in results)}")
+    
+    return inserted > 0 and len(results) == len(partitions)
+
+# Codes d'erreur MySQL quand le serveur ou le client refuse LOAD DATA LOCAL INFILE
+LOCAL_INFILE_REFUSED = {1148, 2068, 3948, 3950}
+
+def tsv_column(series):
+    """Convertit une colonne au format texte de LOAD DATA (échappements, \\N pour NULL)"""
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype(int).astype(str)
+    text = (
+        series.astype(str)
+        .str.replace('\\', '\\\\', regex=False)
+        .str.replace('\t', '\\t', regex=False)
+        .str.replace('\n', '\\n', regex=False)
+        .str.replace('\r', '\\r', regex=False)
+    )
+    return text.where(series.notna(), '\\N')
+
+def load_data_infile(cursor, directory, table, rows, columns):
+    """Écrit `columns` de `rows` dans un TSV temporaire et le charge avec LOAD DATA LOCAL INFILE"""
+    path = os.path.join(directory, f"{table}.tsv")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.writelines(
+            '\t'.join(values) + '\n'
+            for values in zip(*(tsv_column(rows[col]).tolist() for col in columns))
+        )
+    
+    cursor.execute(f"""
+        LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+        ({', '.join(columns)})
+    """, (path,))
+    logging.info(f"LOAD DATA {table}: {len(rows)} lignes")
+
+def set_constraint_checks(cursor, enabled):
+    """Active ou désactive les contrôles de clés étrangères et d'unicité de la session"""
+    value = 1 if enabled else 0
+    cursor.execute(f"SET foreign_key_checks = {value}")
+    cursor.execute(f"SET unique_checks = {value}")
+
+def insert_etablissement_data_infile(connexion, df, batch_size=1000, cache=None, adaptive=True):
+    """
+    Chemin rapide de rechargement complet par LOAD DATA LOCAL INFILE
+    
+    Chaque table (etablissements puis tables filles) est écrite dans un TSV
+    temporaire et chargée par le chargeur natif de MySQL, dans une seule
+    transaction avec les contrôles de clés désactivés. Si le serveur refuse
+    local_infile, le chargement repasse par insert_etablissement_data_bulk.
+    
+    La connexion doit être ouverte avec allow_local_infile=True.
+    """
+    cursor = connexion.cursor()
+    directory = tempfile.mkdtemp(prefix='edumap_infile_')
+    refused = False
+    checks_disabled = False
+    try:
+        if cache is None:
+            cache = load_lookup_cache(cursor)
+        warm_lookup_cache(cursor, cache, df)
+        prepared = resolve_reference_ids(cursor, df, transform_dataframe(df), cache)
+        
+        unique = prepared.drop_duplicates('code_etablissement')
+        cursor.execute("SELECT DISTINCT code_etablissement FROM etablissements")
+        existing = {code for (code,) in cursor.fetchall()}
+        new_rows = unique[~unique['code_etablissement'].isin(existing)]
+        skipped_duplicates = len(prepared) - len(new_rows)
+        
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM etablissements")
+        max_id = cursor.fetchone()[0]
+        connexion.commit()
+        
+        if not len(new_rows):
+            logging.info(f"Aucun nouvel établissement à charger ({skipped_duplicates} doublons ignorés)")
+            return False
+        
+        start_time = time.time()
+        set_constraint_checks(cursor, False)
+        checks_disabled = True
+        connexion.start_transaction()
+        
+        load_data_infile(cursor, directory, 'etablissements', new_rows, ETABLISSEMENT_COLUMNS)
+        
+        cursor.execute(
+            "SELECT code_etablissement, id FROM etablissements WHERE id > %s", (max_id,)
+        )
+        ids = dict(cursor.fetchall())
+        rows = new_rows.assign(etablissement_id=new_rows['code_etablissement'].map(ids).to_numpy())
+        
+        for table, columns in CHILD_TABLES.items():
+            load_data_infile(cursor, directory, table, rows, ['etablissement_id'] + columns)
+        
+        connexion.commit()
+        total_time = time.time() - start_time
+        logging.info(f"Chargement LOAD DATA terminé en {total_time:.2f} secondes.")
+        logging.info(f"Lignes insérées avec succès: {len(new_rows)}/{len(df)}")
+        logging.info(f"Doublons ignorés: {skipped_duplicates}")
+        return True
+        
+    except Error as e:
+        connexion.rollback()
+        if e.errno in LOCAL_INFILE_REFUSED:
+            refused = True
+            logging.warning(f"LOAD DATA LOCAL INFILE refusé ({e}), repli sur les INSERT par lots")
+        else:
+            logging.error(f"Erreur lors du chargement LOAD DATA: {e}")
+            return False
+    finally:
+        if checks_disabled:
+            try:
+                set_constraint_checks(cursor, True)
+            except Error as e:
+                logging.error(f"Impossible de réactiver les contrôles de clés: {e}")
+        cursor.close()
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    if refused:
+        return insert_etablissement_data_bulk(connexion, df, batch_size=batch_size, cache=cache, adaptive=adaptive)
+
+# Table de transit (temporaire, propre à la session) du mode staging
+STAGING_TABLE = 'etl_staging_etablissements'
+
+STAGING_COLUMNS = (
+    ['code_etablissement', 'nom_etablissement', 'latitude', 'longitude'] + SPATIAL_COLUMNS
+    + LOCALISATION_COLUMNS + list(LOOKUP_TABLES.values())
+    + EQUIPEMENT_COLUMNS + EFFECTIF_COLUMNS + INFRASTRUCTURE_COLUMNS
+)
+
+def build_staging_frame(df):
+    """
+    Construit le DataFrame plat chargé dans la table de transit
+    
+    Colonnes typées de transform_dataframe, libellés nettoyés comme dans
+    get_or_create_lookup_id (vides -> NULL) et localisation comme dans
+    localisation_values ; un seul établissement par code.
+    """
+    prepared = transform_dataframe(df).drop_duplicates('code_etablissement')
+    source = df.loc[prepared.index]
+    
+    def text_column(name, strip=False):
+        values = source[name] if name in source.columns else pd.Series(None, index=source.index, dtype=object)
+        text = values.astype(str)
+        if strip:
+            text = text.str.strip()
+        empty = values.isna() | values.isin([0]) | text.eq('')
+        return text.astype(object).where(~empty, None)
+    
+    staging = prepared[['code_etablissement', 'nom_etablissement', 'latitude', 'longitude'] + SPATIAL_COLUMNS].copy()
+    for col in LOCALISATION_COLUMNS[:4]:
+        staging[col] = source[col].astype(str).astype(object) if col in source.columns else ''
+    staging['commune_etab'] = text_column('commune_etab')
+    for col in LOOKUP_TABLES.values():
+        staging[col] = text_column(col, strip=True)
+    for col in EQUIPEMENT_COLUMNS + EFFECTIF_COLUMNS + INFRASTRUCTURE_COLUMNS:
+        staging[col] = prepared[col]
+    return staging[STAGING_COLUMNS]
+
+def staging_normalization_statements():
+    """
+    Requêtes ensemblistes qui alimentent les tables normalisées depuis la table de transit
+    
+    Returns:
+        list: (libellé, requête SQL) dans l'ordre d'exécution
+    """
+    statements = []
+    for table, column in LOOKUP_TABLES.items():
+        statements.append((table, f"""
+            INSERT INTO {table} ({column})
+            SELECT DISTINCT s.{column} FROM {STAGING_TABLE} s
+            WHERE s.{column} IS NOT NULL
+            AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.{column} = s.{column})
+        """))
+    
+    localisation_match = """
+        l.region = s.region AND l.prefecture = s.prefecture
+        AND l.canton_village_autonome = s.canton_village_autonome
+        AND l.ville_village_quartier = s.ville_village_quartier
+        AND COALESCE(l.commune_etab, '') = COALESCE(s.commune_etab, '')
+    """
+    statements.append(('localisations', f"""
+        INSERT INTO localisations (region, prefecture, canton_village_autonome,
+                                   ville_village_quartier, commune_etab)
+        SELECT DISTINCT s.region, s.prefecture, s.canton_village_autonome,
+                        s.ville_village_quartier, s.commune_etab
+        FROM {STAGING_TABLE} s
+        WHERE NOT EXISTS (SELECT 1 FROM localisations l WHERE {localisation_match})
+    """))
+    
+    statements.append(('etablissements', f"""
+        INSERT INTO etablissements ({', '.join(ETABLISSEMENT_COLUMNS)})
+        SELECT s.code_etablissement, s.nom_etablissement,
+               (SELECT MIN(l.id) FROM localisations l WHERE {localisation_match}),
+               m.id, st.id, sy.id, a.id, s.latitude, s.longitude,
+               {', '.join('s.' + col for col in SPATIAL_COLUMNS)}
+        FROM {STAGING_TABLE} s
+        JOIN milieux m ON m.libelle_type_milieu = s.libelle_type_milieu
+        JOIN statuts st ON st.libelle_type_statut_etab = s.libelle_type_statut_etab
+        JOIN systemes sy ON sy.libelle_type_systeme = s.libelle_type_systeme
+        LEFT JOIN annees a ON a.libelle_type_annee = s.libelle_type_annee
+        WHERE NOT EXISTS (
+            SELECT 1 FROM etablissements e WHERE e.code_etablissement = s.code_etablissement
+        )
+    """))
+    
+    for table, columns in CHILD_TABLES.items():
+        statements.append((table, f"""
+            INSERT INTO {table} (etablissement_id, {', '.join(columns)})
+            SELECT e.id, {', '.join('s.' + col for col in columns)}
+            FROM {STAGING_TABLE} s
+            JOIN etablissements e ON e.code_etablissement = s.code_etablissement
+            WHERE e.id > %s
+        """))
+    return statements
+
+def insert_etablissement_data_staging(connexion, df, batch_size=5000):
+    """
+    Charge le DataFrame plat dans une table de transit puis normalise côté serveur
+    
+    Les tables de référence, les localisations, les établissements et les
+    tables filles sont alimentés par une poignée d'INSERT ... SELECT DISTINCT /
+    jointures : le nombre d'allers-retours ne dépend plus du nombre de lignes
+    (hors remplissage de la table de transit, par lots multi-lignes).
+    """
+    cursor = connexion.cursor()
+    staging_created = False
+    try:
+        start_time = time.time()
+        staging = build_staging_frame(df)
+        
+        text_columns = ['code_etablissement', 'nom_etablissement'] + LOCALISATION_COLUMNS + list(LOOKUP_TABLES.values())
+        definitions = (
+            [f"{col} VARCHAR(255) NULL" for col in text_columns]
+            + ["latitude VARCHAR(32) NULL", "longitude VARCHAR(32) NULL"]
+            + ["lat DOUBLE NULL", "lng DOUBLE NULL", f"geohash VARCHAR({GEOHASH_PRECISION}) NULL"]
+            + [f"tuile_z{zoom} BIGINT NULL" for zoom in TILE_ZOOMS]
+            + [f"{col} BOOLEAN NOT NULL" for col in EQUIPEMENT_COLUMNS]
+            + [f"{col} INT NOT NULL" for col in EFFECTIF_COLUMNS + INFRASTRUCTURE_COLUMNS]
+        )
+        cursor.execute(f"CREATE TEMPORARY TABLE {STAGING_TABLE} ({', '.join(definitions)})")
+        staging_created = True
+        
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM etablissements")
+        max_id = cursor.fetchone()[0]
+        connexion.commit()
+        
+        connexion.start_transaction()
+        sql_staging = build_insert_sql(STAGING_TABLE, STAGING_COLUMNS)
+        for i in range(0, len(staging), batch_size):
+            cursor.executemany(
+                sql_staging, list(iter_parameter_tuples(staging.iloc[i:i + batch_size], STAGING_COLUMNS))
+            )
+        logging.info(f"Table de transit chargée: {len(staging)} lignes en {time.time() - start_time:.2f}s")
+        
+        counts = {}
+        for label, statement in staging_normalization_statements():
+            if '%s' in statement:
+                cursor.execute(statement, (max_id,))
+            else:
+                cursor.execute(statement)
+            counts[label] = cursor.rowcount
+        connexion.commit()
+        
+        logging.info(f"Normalisation côté serveur terminée en {time.time() - start_time:.2f} secondes: {counts}")
+        logging.info(f"Lignes insérées avec succès: {counts['etablissements']}/{len(df)}")
+        logging.info(f"Doublons ignorés: {len(staging) - counts['etablissements']}")
+        return counts['etablissements'] > 0
+        
+    except Error as e:
+        connexion.rollback()
+        logging.error(f"Erreur lors du chargement par table de transit: {e}")
+        return False
+    finally:
+        if staging_created:
+            try:
+                cursor.execute(f"DROP TEMPORARY TABLE {STAGING_TABLE}")
+            except Error as e:
+                logging.warning(f"Impossible de supprimer la table de transit: {e}")
+        cursor.close()
+
+# Colonnes comparées pour détecter un établissement modifié
+SYNC_COLUMNS = ETABLISSEMENT_COLUMNS + EQUIPEMENT_COLUMNS + EFFECTIF_COLUMNS + INFRASTRUCTURE_COLUMNS
+
+def row_fingerprints(frame):
+    """
+    Calcule une empreinte par ligne sur SYNC_COLUMNS
+    
+    Les valeurs sont ramenées à leur représentation texte (booléens en 0/1)
+    pour que les lignes préparées et les lignes relues de MySQL soient
+    comparables.
+    """
+    values = frame[SYNC_COLUMNS].copy()
+    for col in EQUIPEMENT_COLUMNS:
+        values[col] = values[col].map({True: 1, False: 0})
+    return pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy()
+
+def fetch_stored_etablissements(cursor, codes=None, batch_size=1000):
+    """
+    Relit les établissements stockés et leurs lignes filles
+    
+    Tous en une requête si `codes` est None, sinon seulement ceux de `codes`,
+    par requêtes de `batch_size` codes : un bloc du mode --flux ne relit que
+    ses propres établissements.
+    
+    Returns:
+        DataFrame: SYNC_COLUMNS plus les IDs (id, equipement_id, effectif_id,
+                   infrastructure_id), une ligne par code_etablissement
+    """
+    id_columns = {
+        'equipements_etablissement': 'equipement_id',
+        'effectifs': 'effectif_id',
+        'infrastructures': 'infrastructure_id',
+    }
+    aliases = {'equipements_etablissement': 'q', 'effectifs': 'f', 'infrastructures': 'i'}
+    
+    select = ['e.id'] + [f"e.{col}" for col in ETABLISSEMENT_COLUMNS]
+    joins = []
+    for table, columns in CHILD_TABLES.items():
+        alias = aliases[table]
+        select.append(f"{alias}.id")
+        select += [f"{alias}.{col}" for col in columns]
+        joins.append(f"LEFT JOIN {table} {alias} ON {alias}.etablissement_id = e.id")
+    
+    query = f"SELECT {', '.join(select)} FROM etablissements e {' '.join(joins)}"
+    
+    rows = []
+    if codes is None:
+        cursor.execute(f"{query} ORDER BY e.id")
+        rows = cursor.fetchall()
+    else:
+        codes = list(dict.fromkeys(codes))
+        for i in range(0, len(codes), batch_size):
+            batch = codes[i:i + batch_size]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"{query} WHERE e.code_etablissement IN ({placeholders}) ORDER BY e.id", tuple(batch))
+            rows += cursor.fetchall()
+    
+    columns = ['id'] + ETABLISSEMENT_COLUMNS
+    for table, child_columns in CHILD_TABLES.items():
+        columns += [id_columns[table]] + child_columns
+    stored = pd.DataFrame(rows, columns=columns, dtype=object)
+    
+    # Garder l'établissement (et les lignes filles) les plus récents par code
+    return stored.drop_duplicates('code_etablissement', keep='last').set_index('code_etablissement', drop=False)
+
+def supports_row_alias(connexion):
+    """
+    Vrai si le serveur accepte l'alias de ligne d'INSERT (MySQL 8.0.19+)
+    
+    MariaDB et MySQL 5.7 le refusent ; la version est celle annoncée à la
+    connexion (server_info, sans requête). Les backends adaptés (PostgreSQL,
+    SQLite) traduisent l'une et l'autre forme.
+    """
+    if not hasattr(connexion, 'get_server_info'):
+        return True
+    server_info = getattr(connexion, 'server_info', None) or connexion.get_server_info() or ''
+    version = re.match(r'(\d+)\.(\d+)\.(\d+)', server_info)
+    if 'mariadb' in server_info.lower() or not version:
+        return False
+    return tuple(int(part) for part in version.groups()) >= (8, 0, 19)
+
+def build_upsert_sql(table, columns, row_alias=True):
+    """
+    Construit un INSERT ... ON DUPLICATE KEY UPDATE sur la clé primaire id
+    
+    Avec `row_alias`, les nouvelles valeurs sont lues par l'alias de ligne `new`
+    (MySQL 8.0.19+, VALUES(col) y étant déprécié depuis 8.0.20) ; sinon par
+    VALUES(col), seule forme acceptée par MariaDB et MySQL 5.7.
+    """
+    if row_alias:
+        updates = ', '.join(f"{col} = new.{col}" for col in columns)
+        return build_insert_sql(table, ['id'] + columns) + f" AS new ON DUPLICATE KEY UPDATE {updates}"
+    updates = ', '.join(f"{col} = VALUES({col})" for col in columns)
+    return build_insert_sql(table, ['id'] + columns) + f" ON DUPLICATE KEY UPDATE {updates}"
+
+def upsert_changed_rows(cursor, rows, row_alias=True):
+    """
+    Met à jour des établissements existants et leurs lignes filles
+    
+    `rows` porte les IDs stockés (id, equipement_id, ...) ; une ligne fille
+    absente (ID nul) est créée par un INSERT sans colonne id, un id NULL
+    explicite étant refusé par PostgreSQL. `row_alias` choisit la syntaxe de
+    build_upsert_sql (supports_row_alias).
+    """
+    cursor.executemany(
+        build_upsert_sql('etablissements', ETABLISSEMENT_COLUMNS, row_alias),
+        list(iter_parameter_tuples(rows, ['id'] + ETABLISSEMENT_COLUMNS))
+    )
+    for table, id_column in [
+        ('equipements_etablissement', 'equipement_id'),
+        ('effectifs', 'effectif_id'),
+        ('infrastructures', 'infrastructure_id'),
+    ]:
+        columns = CHILD_TABLES[table]
+        missing = rows[id_column].isna()
+        if (~missing).any():
+            cursor.executemany(
+                build_upsert_sql(table, ['etablissement_id'] + columns, row_alias),
+                list(iter_parameter_tuples(rows[~missing], [id_column, 'id'] + columns))
+            )
+        if missing.any():
+            cursor.executemany(
+                build_insert_sql(table, ['etablissement_id'] + columns),
+                list(iter_parameter_tuples(rows[missing], ['id'] + columns))
+            )
+
+def fetch_localisation_regions(cursor, localisation_ids, batch_size=1000):
+    """Régions des localisations `localisation_ids` (IDs nuls ignorés)"""
+    ids = sorted({int(value) for value in localisation_ids if not pd.isna(value)})
+    regions = set()
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i:i + batch_size]
+        placeholders = ', '.join(['%s'] * len(batch))
+        cursor.execute(f"SELECT DISTINCT region FROM localisations WHERE id IN ({placeholders})", tuple(batch))
+        regions.update(region for (region,) in cursor.fetchall() if region is not None)
+    return regions
+
+def sync_etablissement_data(connexion, df, batch_size=1000, cache=None, delete_missing=False, regions=None):
+    """
+    Synchronise la base avec le fichier au lieu d'ignorer les codes existants
+    
+    Une empreinte par ligne est comparée à celle des données stockées (relues
+    pour les seuls codes de `df`, ou toutes si `delete_missing`) : seuls les
+    établissements nouveaux sont insérés, les modifiés mis à jour par
+    INSERT ... ON DUPLICATE KEY UPDATE et, si `delete_missing`, les absents du
+    fichier supprimés (cascade sur les tables filles).
+    
+    Si `regions` (set) est fourni, il est complété des régions stockées des
+    établissements mis à jour ou supprimés, lues avant l'écriture : un
+    établissement qui change de région ou disparaît modifie aussi les
+    statistiques de son ancienne région.
+    
+    Returns:
+        dict: nombre d'établissements insérés, mis à jour, supprimés et inchangés
+    """
+    summary = {'inseres': 0, 'mis_a_jour': 0, 'supprimes': 0, 'inchanges': 0, 'erreurs': 0}
+    cursor = connexion.cursor()
+    try:
+        if cache is None:
+            cache = load_lookup_cache(cursor)
+        warm_lookup_cache(cursor, cache, df)
+        
+        prepared = resolve_reference_ids(cursor, df, transform_dataframe(df), cache)
+        prepared = prepared.drop_duplicates('code_etablissement')
+        # Sans suppression des absents, seuls les codes du fichier (ou du bloc) sont relus
+        codes = None if delete_missing else prepared['code_etablissement'].tolist()
+        stored = fetch_stored_etablissements(cursor, codes)
+        connexion.commit()
+        
+        start_time = time.time()
+        known = prepared['code_etablissement'].isin(stored.index)
+        new_rows = prepared[~known]
+        
+        existing = prepared[known].copy()
+        matching = stored.loc[existing['code_etablissement']]
+        for col in ['id', 'equipement_id', 'effectif_id', 'infrastructure_id']:
+            existing[col] = matching[col].to_numpy()
+        changed = row_fingerprints(existing) != row_fingerprints(matching)
+        changed_rows = existing[changed]
+        summary['inchanges'] = int((~changed).sum())
+        
+        missing_ids = []
+        if delete_missing:
+            missing_ids = stored.loc[~stored.index.isin(prepared['code_etablissement']), 'id'].tolist()
+        
+        if regions is not None:
+            previous = pd.concat([matching.loc[changed, 'localisation_id'],
+                                  stored.loc[stored['id'].isin(missing_ids), 'localisation_id']])
+            regions.update(fetch_localisation_regions(cursor, previous, batch_size))
+            connexion.commit()
+        
+        logging.info(
+            f"Synchronisation: {len(new_rows)} nouveaux, {len(changed_rows)} modifiés, "
+            f"{len(missing_ids)} à supprimer, {summary['inchanges']} inchangés"
+        )
+        
+        upsert = functools.partial(upsert_changed_rows, row_alias=supports_row_alias(connexion))
+        operations = (
+            [('inseres', insert_prepared_rows, new_rows.iloc[i:i + batch_size])
+             for i in range(0, len(new_rows), batch_size)]
+            + [('mis_a_jour', upsert, changed_rows.iloc[i:i + batch_size])
+               for i in range(0, len(changed_rows), batch_size)]
+        )
+        for label, operation, rows in operations:
+            try:
+                batch_start_time = time.time()
+                connexion.start_transaction()
+                operation(cursor, rows)
+                connexion.commit()
+                record_batch(len(rows), time.time() - batch_start_time)
+                summary[label] += len(rows)
+            except Error as e:
+                connexion.rollback()
+                summary['erreurs'] += len(rows)
+                logging.error(f"Erreur lors de la synchronisation ({label}, {len(rows)} lignes): {e}")
+        
+        for i in range(0, len(missing_ids), batch_size):
+            ids = missing_ids[i:i + batch_size]
+            try:
+                connexion.start_transaction()
+                placeholders = ', '.join(['%s'] * len(ids))
+                cursor.execute(f"DELETE FROM etablissements WHERE id IN ({placeholders})", tuple(ids))
+                connexion.commit()
+                summary['supprimes'] += len(ids)
+            except Error as e:
+                connexion.rollback()
+                summary['erreurs'] += len(ids)
+                logging.error(f"Erreur lors de la suppression de {len(ids)} établissements: {e}")
+        
+        logging.info(f"Synchronisation terminée en {time.time() - start_time:.2f} secondes: {summary}")
+        return summary
+        
+    except Error as e:
+        connexion.rollback()
+        logging.error(f"Erreur lors de la synchronisation des données: {e}")
+        return None
+    finally:
+        cursor.close()
+
+# Règles de validation appliquées avant tout accès à la base : motif -> gravité.
+# Une ligne avec au moins un motif 'rejet' n'est pas chargée ; les
+# avertissements sont signalés mais la ligne est chargée (coordonnées à NULL)
+VALIDATION_RULES = {
+    'code_manquant': 'rejet',
+    'code_duplique': 'rejet',
+    'doublon_approchant': 'rejet',
+    'valeur_non_numerique': 'rejet',
+    'valeur_hors_limites': 'rejet',
+    'reference_manquante': 'rejet',
+    'coordonnees_non_numeriques': 'avertissement',
+    'coordonnees_hors_limites': 'avertissement',
+    'total_incoherent': 'avertissement',
+}
+
+# Libellés sans lesquels resolve_reference_ids écarte la ligne
+REQUIRED_LOOKUP_COLUMNS = ['libelle_type_milieu', 'libelle_type_statut_etab', 'libelle_type_systeme']
+
+# Colonnes ajoutées aux lignes du fichier des anomalies
+ANOMALY_COLUMNS = ['ligne_source', 'statut', 'motifs', 'ligne_conservee']
+
+def validation_masks(df):
+    """
+    Évalue les règles de VALIDATION_RULES hors doublons, colonne entière par colonne entière
+    
+    Returns:
+        dict: {motif (suffixé de la colonne concernée): masque booléen des lignes en anomalie}
+    """
+    masks = {}
+    codes = df['code_etablissement'] if 'code_etablissement' in df.columns else pd.Series(None, index=df.index)
+    masks['code_manquant'] = codes.isna() | codes.astype(str).eq('')
+    
+    numbers = {}
+    for col, spec in SOURCE_SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if spec['dtype'] == 'int32':
+            numeric = pd.to_numeric(df[col], errors='coerce').astype('float64')
+            low, high = integer_bounds(spec)
+            masks[f'valeur_non_numerique:{col}'] = df[col].notna() & ~np.isfinite(numeric)
+            masks[f'valeur_hors_limites:{col}'] = np.isfinite(numeric) & ~numeric.between(low, high)
+            numbers[col] = numeric.where(df[col].notna(), spec['default'])
+        elif spec['dtype'] == 'float64':
+            _, _, non_numeric, out_of_range = parse_coordinate_series(df[col], spec['range'][1])
+            masks[f'coordonnees_non_numeriques:{col}'] = non_numeric
+            masks[f'coordonnees_hors_limites:{col}'] = out_of_range
+    
+    for col in REQUIRED_LOOKUP_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series(None, index=df.index)
+        masks[f'reference_manquante:{col}'] = values.isna() | values.astype(str).str.strip().eq('')
+    
+    if {'tot', 'sommedenb_eff_g', 'sommedenb_eff_f'} <= numbers.keys():
+        counts = pd.DataFrame({col: numbers[col] for col in ['tot', 'sommedenb_eff_g', 'sommedenb_eff_f']})
+        masks['total_incoherent'] = counts.notna().all(axis=1) & counts['tot'].ne(
+            counts['sommedenb_eff_g'] + counts['sommedenb_eff_f']
+        )
+    return {label: mask.fillna(False).astype(bool) for label, mask in masks.items()}
+
+@timed_stage('validation')
+def validate_dataframe(df, seen=None, keep='premier', fuzzy=False):
+    """
+    Sépare le DataFrame mappé (avant clean_data) en lignes chargeables et anomalies
+    
+    Chaque règle est évaluée sur la colonne entière. Parmi les lignes sans autre
+    motif de rejet, les doublons de code (et, si `fuzzy`, de nom + localisation)
+    sont repérés par hachage (find_duplicates) : une ligne par groupe est chargée
+    selon la politique `keep`, les autres sont rejetées avec le numéro de la
+    ligne conservée. Les clés vues dans un bloc précédent sont lues dans `seen`
+    (complété ici).
+    
+    Returns:
+        tuple: (lignes chargeables, DataFrame des anomalies avec les valeurs source
+                et les colonnes ANOMALY_COLUMNS)
+    """
+    masks = validation_masks(df)
+    
+    rejected = pd.Series(False, index=df.index)
+    for label, mask in masks.items():
+        if VALIDATION_RULES[label.split(':')[0]] == 'rejet':
+            rejected |= mask
+    
+    kept = pd.Series(np.nan, index=df.index, dtype=object)
+    if 'code_etablissement' in df.columns:
+        duplicates, kept, report = find_duplicates(df, ~rejected, keep, fuzzy, seen)
+        log_duplicate_report(report)
+        for label, mask in duplicates.items():
+            masks[label] = mask
+            rejected |= mask
+    
+    motifs = pd.Series('', index=df.index, dtype=object)
+    for label, mask in masks.items():
+        if mask.any():
+            motifs = motifs.where(~mask, motifs + label + ';')
+    flagged = motifs.ne('')
+    
+    anomalies = df[flagged].copy()
+    anomalies['ligne_source'] = anomalies.index + 2  # ligne d'en-tête + numérotation à partir de 1
+    anomalies['statut'] = np.where(rejected[flagged], 'rejet', 'avertissement')
+    anomalies['motifs'] = motifs[flagged].str.rstrip(';')
+    anomalies['ligne_conservee'] = (kept[flagged] + 2).astype('Int64')
+    return df[~rejected], anomalies[ANOMALY_COLUMNS + list(df.columns)]
+
+def log_validation_summary(anomalies, total_rows):
+    """Journalise le nombre de lignes rejetées et d'anomalies par motif"""
+    if anomalies.empty:
+        logging.info(f"Validation: {total_rows} lignes, aucune anomalie")
+        return
+    counts = anomalies['motifs'].str.split(';').explode().value_counts()
+    rejected = int(anomalies['statut'].eq('rejet').sum())
+    logging.warning(
+        f"Validation: {rejected}/{total_rows} lignes rejetées, "
+        f"{len(anomalies) - rejected} avertissements, motifs: {counts.to_dict()}"
+    )
+
+def rejects_path_for(rejects_path, file_path):
+    """Fichier des anomalies propre à un fichier source quand plusieurs sont chargés"""
+    base, extension = os.path.splitext(rejects_path)
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return f"{base}-{stem}{extension}"
+
+def write_rejects(anomalies, rejects_path):
+    """
+    Écrit les anomalies en CSV, ou en Parquet si le chemin se termine par .parquet
+    
+    Returns:
+        str: chemin écrit (repli CSV si pyarrow n'est pas installé)
+    """
+    if os.path.splitext(rejects_path)[1].lower() == '.parquet' and pa is None:
+        logging.warning("pyarrow n'est pas installé: anomalies écrites en CSV")
+        rejects_path = os.path.splitext(rejects_path)[0] + '.csv'
+    
+    os.makedirs(os.path.dirname(rejects_path) or '.', exist_ok=True)
+    tmp_path = rejects_path + '.tmp'
+    if rejects_path.lower().endswith('.parquet'):
+        # Valeurs source de types mélangés : écrites en texte
+        anomalies.astype(object).where(anomalies.notna(), None).astype('string').to_parquet(tmp_path, index=False)
+    else:
+        anomalies.to_csv(tmp_path, index=False, encoding='utf-8')
+    os.replace(tmp_path, rejects_path)
+    logging.info(f"{len(anomalies)} anomalies écrites dans {rejects_path}")
+    return rejects_path
+
+def finish_validation(anomaly_frames, total_rows, rejects_path=None):
+    """Regroupe les anomalies des blocs, les journalise et les écrit si `rejects_path`"""
+    frames = [frame for frame in anomaly_frames if not frame.empty]
+    anomalies = pd.concat(frames) if frames else pd.DataFrame(columns=ANOMALY_COLUMNS)
+    log_validation_summary(anomalies, total_rows)
+    if rejects_path:
+        write_rejects(anomalies, rejects_path)
+    return anomalies
+
+# Chaînes lues comme valeurs manquantes par pd.read_excel / pd.read_csv
+NA_STRINGS = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+def read_source_header(file_path):
+    """Lit uniquement la ligne d'en-tête du fichier source"""
+    if os.path.splitext(file_path)[1].lower() == '.csv':
+        return list(pd.read_csv(file_path, nrows=0).columns)
+    return list(pd.read_excel(file_path, nrows=0).columns)
+
+def worksheet_chunk(rows, columns, index, dtypes=None):
+    """Construit un bloc DataFrame à partir de lignes openpyxl, comme pd.read_excel"""
+    chunk = pd.DataFrame(rows, columns=columns, index=index)
+    chunk = chunk.mask(chunk.isin(NA_STRINGS))
+    for col, dtype in (dtypes or {}).items():
+        chunk[col] = chunk[col].where(chunk[col].isna(), chunk[col].astype(str)).astype(dtype)
+    return chunk
+
+def iter_source_chunks(file_path, chunk_size=5000):
+    """
+    Lit le fichier source par blocs de `chunk_size` lignes
+    
+    Les fichiers Excel sont parcourus avec l'itérateur de lignes d'openpyxl en
+    lecture seule et les CSV avec le lecteur par blocs de pandas : seul le bloc
+    courant est gardé en mémoire. Les lignes vides sont sautées mais l'index
+    des blocs reste le numéro de ligne du fichier moins 2 (en-tête, numérotation
+    à partir de 1), repris par le fichier des anomalies (ligne_source).
+    """
+    if os.path.splitext(file_path)[1].lower() == '.csv':
+        dtypes = source_read_dtypes(read_source_header(file_path))
+        for chunk in pd.read_csv(file_path, chunksize=chunk_size, dtype=dtypes, skip_blank_lines=False):
+            chunk = chunk.dropna(how='all')
+            if len(chunk):
+                yield chunk
+        return
+    
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [
+            str(name) if name is not None else f"Unnamed: {position}"
+            for position, name in enumerate(header)
+        ]
+        dtypes = source_read_dtypes(columns)
+        
+        buffer, positions = [], []
+        # Position sous l'en-tête, lignes vides comprises (itérateur en lecture seule sans trou)
+        for position, values in enumerate(rows):
+            if all(value is None for value in values):
+                continue
+            buffer.append(values[:len(columns)])
+            positions.append(position)
+            if len(buffer) >= chunk_size:
+                yield worksheet_chunk(buffer, columns, positions, dtypes)
+                buffer, positions = [], []
+        
+        if buffer:
+            yield worksheet_chunk(buffer, columns, positions, dtypes)
+    finally:
+        workbook.close()
+
+def warn_streaming_keep(keep):
+    """Signale qu'en flux seule la politique 'premier' vaut d'un bloc à l'autre"""
+    if keep != 'premier':
+        logging.warning(
+            f"Politique de doublons '{keep}' appliquée dans chaque bloc ; "
+            f"d'un bloc à l'autre, la première occurrence (déjà chargée) est conservée"
+        )
+
+def iter_cleaned_chunks(file_path, chunk_size=5000, anomalies=None, keep='premier', fuzzy=False):
+    """
+    Enchaîne lecture, mapping, validation et nettoyage bloc par bloc (générateur)
+    
+    Les doublons sont détectés d'un bloc à l'autre (voir warn_streaming_keep) ;
+    les anomalies de chaque bloc sont ajoutées à la liste `anomalies` si elle
+    est fournie.
+    """
+    warn_streaming_keep(keep)
+    seen = {}
+    for chunk in iter_source_chunks(file_path, chunk_size):
+        valid, chunk_anomalies = validate_dataframe(map_columns(chunk), seen, keep, fuzzy)
+        if anomalies is not None:
+            anomalies.append(chunk_anomalies)
+        yield clean_data(valid)
+
+# À incrémenter quand la lecture, map_columns ou clean_data changent : invalide les caches existants
+COLUMNAR_CACHE_VERSION = 5
+
+def file_sha256(file_path):
+    """Calcule l'empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def columnar_cache_path(cache_dir, file_path, source_hash, keep='premier', fuzzy=False):
+    """Chemin du cache Arrow IPC d'un fichier source pour une empreinte et un dédoublonnage donnés"""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    variant = keep + ('-approchant' if fuzzy else '')
+    return os.path.join(cache_dir, f"{stem}-v{COLUMNAR_CACHE_VERSION}-{variant}-{source_hash[:16]}.arrow")
+
+def to_columnar_frame(df):
+    """
+    Rend un DataFrame nettoyé sérialisable en Arrow
+    
+    Les colonnes d'équipement sont converties en booléens et les autres colonnes
+    texte de types mélangés (ex: codes tantôt numériques, tantôt texte) en chaînes,
+    ce qui ne change pas le résultat de transform_dataframe.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        if col in EQUIPEMENT_COLUMNS:
+            df[col] = convert_to_boolean_series(df[col])
+        elif pd.api.types.infer_dtype(df[col], skipna=True) not in ('string', 'empty'):
+            df[col] = df[col].astype(str)
+    return df
+
+def write_columnar_cache(df, cache_path):
+    """Écrit le DataFrame nettoyé au format Arrow IPC (écriture atomique)"""
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    table = pa.Table.from_pandas(to_columnar_frame(df), preserve_index=False)
+    tmp_path = cache_path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, cache_path)
+
+def read_columnar_cache(cache_path):
+    """Relit un cache Arrow IPC en mémoire mappée"""
+    with pa.memory_map(cache_path, 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+def anomalies_cache_path(cache_path):
+    """Chemin du cache des anomalies de validation associé à un cache colonnaire"""
+    return cache_path[:-len('.arrow')] + '-anomalies.arrow'
+
+def load_cleaned_dataframe(file_path, cache_dir=None, rejects_path=None, keep='premier', fuzzy=False):
+    """
+    Lit, mappe, valide et nettoie le fichier source
+    
+    Les lignes en anomalie (validate_dataframe, doublons selon `keep` et
+    `fuzzy`) sont journalisées, écrites dans `rejects_path` s'il est fourni,
+    et les lignes rejetées retirées.
+    Si `cache_dir` est fourni, le DataFrame nettoyé est mis en cache au format
+    Arrow IPC sous une clé dérivée du contenu du fichier : une nouvelle exécution
+    sur un fichier inchangé relit ce cache (et les anomalies) au lieu de
+    réanalyser l'Excel.
+    """
+    cache_path = None
+    if cache_dir:
+        if pa is None:
+            logging.warning("pyarrow n'est pas installé: cache colonnaire désactivé")
+        else:
+            cache_path = columnar_cache_path(cache_dir, file_path, file_sha256(file_path), keep, fuzzy)
+            if os.path.exists(cache_path):
+                start_time = time.time()
+                df = read_columnar_cache(cache_path)
+                logging.info(f"Cache colonnaire {cache_path} relu en {time.time() - start_time:.2f}s ({len(df)} lignes)")
+                anomalies = []
+                if os.path.exists(anomalies_cache_path(cache_path)):
+                    anomalies = [read_columnar_cache(anomalies_cache_path(cache_path))]
+                rejected = sum(int(frame['statut'].eq('rejet').sum()) for frame in anomalies)
+                finish_validation(anomalies, len(df) + rejected, rejects_path)
+                return df
+    
+    logging.info(f"Chargement du fichier {file_path}")
+    start_time = time.time()
+    # Types du schéma imposés dès la lecture (en-tête lu au préalable pour les retrouver)
+    dtypes = source_read_dtypes(read_source_header(file_path))
+    if os.path.splitext(file_path)[1].lower() == '.csv':
+        df = pd.read_csv(file_path, dtype=dtypes, skip_blank_lines=False)
+    else:
+        df = pd.read_excel(file_path, dtype=dtypes)
+    # Lignes vides retirées comme en lecture par blocs : l'index garde le numéro de ligne (ligne_source)
+    df = df.dropna(how='all')
+    record_stage('lecture_source', time.time() - start_time, len(df))
+    logging.info(f"Fichier chargé avec succès. {len(df)} lignes trouvées.")
+    
+    # Afficher les colonnes originales
+    logging.info(f"Colonnes originales: {list(df.columns)}")
+    
+    # Mapper les colonnes
+    df = map_columns(df)
+    
+    # Valider avant tout accès à la base (lignes rejetées retirées)
+    total_rows = len(df)
+    df, anomalies = validate_dataframe(df, keep=keep, fuzzy=fuzzy)
+    finish_validation([anomalies], total_rows, rejects_path)
+    
+    # Afficher un échantillon pour débogage
+    print_dataframe_sample(df)
+    
+    # Nettoyer les données
+    df = clean_data(df)
+    
+    if cache_path:
+        try:
+            write_columnar_cache(df, cache_path)
+            if not anomalies.empty:
+                write_columnar_cache(anomalies, anomalies_cache_path(cache_path))
+            logging.info(f"Cache colonnaire écrit: {cache_path}")
+        except (pa.ArrowException, OSError) as e:
+            logging.warning(f"Impossible d'écrire le cache colonnaire {cache_path}: {e}")
+    
+    return df
+
+# À incrémenter quand le format du point de reprise change
+CHECKPOINT_VERSION = 1
+
+# Modes séquentiels pour lesquels un point de reprise a un sens
+CHECKPOINT_MODES = ['ligne', 'bulk']
+
+def serialize_cache(cache):
+    """Rend le cache de référence sérialisable en JSON (clés de localisation en listes)"""
+    serialized = {table: ids for table, ids in cache.items() if table != 'localisations'}
+    serialized['localisations'] = [[list(key), localisation_id] for key, localisation_id in cache['localisations'].items()]
+    return serialized
+
+def deserialize_cache(serialized):
+    """Reconstruit le cache de référence d'un point de reprise"""
+    cache = {table: ids for table, ids in serialized.items() if table != 'localisations'}
+    cache['localisations'] = {tuple(key): localisation_id for key, localisation_id in serialized['localisations']}
+    return cache
+
+def open_checkpoint(path, source_hash, mode):
+    """
+    Ouvre le point de reprise d'un chargement
+    
+    Si `path` contient un point de reprise du même fichier source (même
+    empreinte) et du même mode, le chargement repartira de la première ligne
+    non validée avec le cache de référence sauvegardé ; sinon il repart de zéro.
+    
+    Returns:
+        dict: état du point de reprise (chemin, source, mode, lignes et lots validés, cache)
+    """
+    checkpoint = {
+        'chemin': path,
+        'version': CHECKPOINT_VERSION,
+        'source': source_hash,
+        'mode': mode,
+        'lignes_validees': 0,
+        'lots_valides': 0,
+        'cache': None,
+    }
+    if not os.path.exists(path):
+        return checkpoint
+    
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Point de reprise {path} illisible, chargement complet: {e}")
+        return checkpoint
+    
+    if (saved.get('version'), saved.get('source'), saved.get('mode')) != (CHECKPOINT_VERSION, source_hash, mode):
+        logging.warning(f"Point de reprise {path} d'un autre fichier ou d'un autre mode, chargement complet")
+        return checkpoint
+    
+    checkpoint.update(
+        lignes_validees=saved['lignes_validees'],
+        lots_valides=saved['lots_valides'],
+        cache=deserialize_cache(saved['cache']),
+    )
+    logging.info(
+        f"Reprise du chargement après {checkpoint['lots_valides']} lots "
+        f"({checkpoint['lignes_validees']} lignes déjà traitées)"
+    )
+    return checkpoint
+
+def save_checkpoint(checkpoint, position, number, cache):
+    """Écrit le point de reprise après un lot validé (écriture atomique)"""
+    if 'cache_serialise' not in checkpoint:
+        # Le cache ne change plus pendant l'écriture des lots : converti une seule fois
+        checkpoint['cache_serialise'] = serialize_cache(cache)
+    checkpoint['lignes_validees'] = position
+    checkpoint['lots_valides'] = number
+    
+    state = {key: checkpoint[key] for key in ['version', 'source', 'mode', 'lignes_validees', 'lots_valides']}
+    state['cache'] = checkpoint['cache_serialise']
+    tmp_path = f"{checkpoint['chemin']}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, checkpoint['chemin'])
+
+def clear_checkpoint(checkpoint):
+    """Supprime le point de reprise d'un chargement terminé"""
+    if checkpoint and os.path.exists(checkpoint['chemin']):
+        os.remove(checkpoint['chemin'])
+        logging.info(f"Chargement terminé, point de reprise {checkpoint['chemin']} supprimé")
+
+@timed_stage('chargement')
+def load_dataframe(connexion, df, mode, batch_size=None, cache=None, delete_missing=False, workers=4,
+                   adaptive=True, checkpoint=None, connection_factory=None, regions=None):
+    """
+    Charge un DataFrame nettoyé avec le mode d'insertion demandé
+    
+    En modes ligne, bulk, parallele et infile (repli bulk), `batch_size` est la
+    taille du premier lot, adaptée ensuite à la latence des commits sauf si
+    adaptive=False. `checkpoint` n'est utilisé qu'en modes ligne et bulk
+    (CHECKPOINT_MODES) ; `connection_factory` ouvre les connexions des workers
+    du mode parallele (MySQL avec `config` par défaut). En mode sync, `regions`
+    (set) reçoit les anciennes régions des établissements mis à jour ou supprimés.
+    """
+    if mode == 'sync':
+        summary = sync_etablissement_data(
+            connexion, df, batch_size=batch_size or 1000, cache=cache,
+            delete_missing=delete_missing, regions=regions
+        )
+        return summary is not None and not summary['erreurs']
+    if mode == 'parallele':
+        return insert_etablissement_data_parallel(
+            connexion, df, workers=workers, batch_size=batch_size or 1000, cache=cache, adaptive=adaptive,
+            connection_factory=connection_factory
+        )
+    if mode == 'staging':
+        return insert_etablissement_data_staging(connexion, df, batch_size=batch_size or 5000)
+    if mode == 'infile':
+        return insert_etablissement_data_infile(
+            connexion, df, batch_size=batch_size or 1000, cache=cache, adaptive=adaptive
+        )
+    if mode == 'bulk':
+        return insert_etablissement_data_bulk(
+            connexion, df, batch_size=batch_size or 1000, cache=cache, adaptive=adaptive,
+            checkpoint=checkpoint
+        )
+    return insert_etablissement_data(
+        connexion, df, batch_size=batch_size or 100, cache=cache, adaptive=adaptive,
+        checkpoint=checkpoint
+    )
+
+def load_streaming(connexion, file_path, mode, chunk_size=5000, batch_size=None, workers=4, adaptive=True,
+                   connection_factory=None, rejects_path=None, keep='premier', fuzzy=False):
+    """
+    Charge le fichier bloc par bloc sans jamais le lire en entier
+    
+    Le cache de référence est partagé entre les blocs : seules les valeurs
+    nouvelles de chaque bloc déclenchent des INSERT. Les anomalies de
+    validation sont regroupées et écrites dans `rejects_path` à la fin.
+    """
+    cursor = connexion.cursor()
+    try:
+        cache = load_lookup_cache(cursor)
+        connexion.commit()
+    finally:
+        cursor.close()
+    
+    start_time = time.time()
+    total_rows = 0
+    inserted = False
+    anomalies = []
+    chunks = iter_cleaned_chunks(file_path, chunk_size, anomalies, keep, fuzzy)
+    for chunk_number, chunk in enumerate(chunks, start=1):
+        total_rows += len(chunk)
+        logging.info(f"Bloc {chunk_number}: {len(chunk)} lignes ({total_rows} lues au total)")
+        inserted = load_dataframe(connexion, chunk, mode, batch_size, cache, workers=workers,
+                                  adaptive=adaptive, connection_factory=connection_factory) or inserted
+    
+    logging.info(f"Chargement en flux terminé: {total_rows} lignes en {time.time() - start_time:.2f} secondes.")
+    rejected = sum(int(frame['statut'].eq('rejet').sum()) for frame in anomalies)
+    finish_validation(anomalies, total_rows + rejected, rejects_path)
+    return inserted
+
+# Marqueur de fin de flux entre deux étapes du pipeline
+PIPELINE_DONE = object()
+
+def put_or_stop(target, item, stop):
+    """Dépose un élément dans une file bornée en attendant une place, sauf arrêt demandé"""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def queue_items(source, stop):
+    """Itère sur une file jusqu'au marqueur de fin (relance l'erreur d'une étape amont)"""
+    while not stop.is_set():
+        try:
+            item = source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is PIPELINE_DONE:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+def run_pipeline_stage(items, function, target, stop):
+    """Corps d'un thread du pipeline : applique `function` à chaque élément et le transmet"""
+    try:
+        for item in items:
+            if not put_or_stop(target, function(item), stop):
+                return
+    except Exception as e:
+        # L'erreur suit le flux jusqu'au thread de chargement qui la relance
+        put_or_stop(target, e, stop)
+        return
+    put_or_stop(target, PIPELINE_DONE, stop)
+
+def transform_chunk(chunk, seen=None, anomalies=None, keep='premier', fuzzy=False):
+    """Étape de transformation du pipeline : mapping, validation, nettoyage et conversion des types"""
+    valid, chunk_anomalies = validate_dataframe(map_columns(chunk), seen, keep, fuzzy)
+    if anomalies is not None:
+        anomalies.append(chunk_anomalies)
+    cleaned = clean_data(valid)
+    return cleaned, transform_dataframe(cleaned)
+
+def load_pipelined(connexion, file_path, chunk_size=5000, batch_size=1000, adaptive=True, queue_size=2,
+                   rejects_path=None, keep='premier', fuzzy=False):
+    """
+    Charge le fichier en pipeline : lecture, transformation et écriture se recouvrent
+    
+    Un thread lit les blocs du fichier, un second les mappe, nettoie et
+    convertit, pendant que le thread appelant résout les références et écrit
+    le bloc précédent (en mode bulk). Les files entre étapes sont bornées à
+    `queue_size` blocs : une étape trop rapide attend la suivante et la
+    mémoire reste limitée à quelques blocs.
+    """
+    warn_streaming_keep(keep)
+    stop = threading.Event()
+    anomalies = []
+    raw_chunks = queue.Queue(maxsize=queue_size)
+    transformed_chunks = queue.Queue(maxsize=queue_size)
+    threads = [
+        threading.Thread(
+            target=run_pipeline_stage, name='pipeline-lecture', daemon=True,
+            args=(iter_source_chunks(file_path, chunk_size), lambda chunk: chunk, raw_chunks, stop)
+        ),
+        threading.Thread(
+            target=run_pipeline_stage, name='pipeline-transformation', daemon=True,
+            args=(queue_items(raw_chunks, stop),
+                  functools.partial(transform_chunk, seen={}, anomalies=anomalies, keep=keep, fuzzy=fuzzy),
+                  transformed_chunks, stop)
+        ),
+    ]
+    
+    cursor = connexion.cursor()
+    start_time = time.time()
+    totals = {'lignes': 0, 'inseres': 0, 'doublons': 0, 'rejetees': 0}
+    try:
+        cache = load_lookup_cache(cursor)
+        connexion.commit()
+        for thread in threads:
+            thread.start()
+        
+        batcher = None
+        chunks = queue_items(transformed_chunks, stop)
+        chunk_number = 0
+        while True:
+            wait_start = time.perf_counter()
+            item = next(chunks, None)
+            # Temps où l'écriture attend la lecture/transformation : goulot en amont s'il domine
+            record_stage('attente_pipeline', time.perf_counter() - wait_start)
+            if item is None:
+                break
+            cleaned, prepared = item
+            chunk_number += 1
+            
+            warm_lookup_cache(cursor, cache, cleaned)
+            prepared = resolve_reference_ids(cursor, cleaned, prepared, cache)
+            connexion.commit()
+            if batcher is None:
+                batcher = create_batcher(cursor, prepared, batch_size, adaptive)
+            
+            stats = write_prepared_batches(connexion, cursor, prepared, batcher, label=f"Bloc {chunk_number} lot")
+            totals['lignes'] += len(cleaned)
+            for key in ['inseres', 'doublons', 'rejetees']:
+                totals[key] += stats[key]
+            logging.info(
+                f"Bloc {chunk_number}: {stats['inseres']}/{len(cleaned)} lignes insérées "
+                f"({totals['lignes']} lues au total)"
+            )
+        
+        total_time = time.time() - start_time
+        logging.info(
+            f"Chargement en pipeline terminé: {totals['lignes']} lignes en {total_time:.2f} secondes "
+            f"({totals['lignes'] / total_time if total_time else 0:.0f} lignes/s)."
+        )
+        logging.info(f"Lignes insérées avec succès: {totals['inseres']}/{totals['lignes']}")
+        logging.info(f"Doublons ignorés: {totals['doublons']}")
+        logging.info(f"Lignes rejetées: {totals['rejetees']}")
+        rejected = sum(int(frame['statut'].eq('rejet').sum()) for frame in anomalies)
+        finish_validation(anomalies, totals['lignes'] + rejected, rejects_path)
+        return totals['inseres'] > 0
+        
+    except Error as e:
+        connexion.rollback()
+        logging.error(f"Erreur lors du chargement en pipeline: {e}")
+        return False
+    finally:
+        stop.set()
+        for thread in threads:
+            if thread.ident is not None:
+                thread.join()
+        cursor.close()
+
+# Extensions des fichiers sources reconnues dans un répertoire (--fichiers)
+SOURCE_EXTENSIONS = ['.xlsx', '.xls', '.csv']
+
+def expand_source_files(patterns):
+    """Liste triée des fichiers sources désignés par des chemins, répertoires ou motifs glob"""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern) or [pattern]
+        paths.update(
+            path for path in candidates
+            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in SOURCE_EXTENSIONS
+        )
+    return sorted(paths)
+
+def annee_from_path(file_path):
+    """
+    Libellé d'année scolaire déduit du nom de fichier, None s'il n'en contient pas
+    
+    « Base_2023-2024.xlsx » donne « 2023-2024 » ; une année seule
+    (« Base_2024.xlsx ») désigne l'année scolaire qui se termine cette
+    année-là, au format des libellés existants.
+    """
+    name = os.path.basename(file_path)
+    pair = re.search(r'(?<!\d)((?:19|20)\d{2})\s*[-_]\s*((?:19|20)\d{2})(?!\d)', name)
+    if pair:
+        return f"{pair.group(1)}-{pair.group(2)}"
+    years = re.findall(r'(?<!\d)(?:19|20)\d{2}(?!\d)', name)
+    if years:
+        return f"{int(years[-1]) - 1}-{years[-1]}"
+    return None
+
+def prepare_source_file(file_path, cache_dir=None, rejects_path=None, keep='premier', fuzzy=False):
+    """
+    Lit, mappe et nettoie un fichier source dans un processus de la réserve
+    
+    Les lignes sans année reçoivent l'année du nom de fichier. Les durées des
+    étapes mesurées dans le processus sont renvoyées pour être ajoutées aux
+    métriques du processus principal.
+    
+    Returns:
+        tuple: (DataFrame nettoyé, durée de lecture en secondes, étapes mesurées)
+    """
+    reset_metrics()
+    start_time = time.perf_counter()
+    df = load_cleaned_dataframe(file_path, cache_dir, rejects_path, keep, fuzzy)
+    
+    annee = annee_from_path(file_path)
+    if annee:
+        if 'libelle_type_annee' not in df.columns:
+            df['libelle_type_annee'] = annee
+        else:
+            labels = df['libelle_type_annee'].astype(object)
+            missing = labels.isna() | labels.astype(str).str.strip().isin(['', '0', 'nan'])
+            if (~missing & (labels.astype(str).str.strip() != annee)).any():
+                logging.warning(f"{file_path}: années du fichier différentes de {annee}, conservées")
+            df['libelle_type_annee'] = labels.where(~missing, annee)
+    else:
+        logging.warning(f"{file_path}: aucune année dans le nom du fichier, colonne libelle_type_annee conservée")
+    
+    return df, time.perf_counter() - start_time, metrics_report()['etapes']
+
+def iter_prepared_files(paths, processes, cache_dir=None, rejects_path=None, keep='premier', fuzzy=False):
+    """
+    Prépare les fichiers dans une réserve de processus, restitués dans l'ordre de `paths`
+    
+    Au plus `processes` fichiers sont lus en avance : la mémoire reste bornée
+    à quelques DataFrames pendant que le processus principal charge le
+    précédent.
+    
+    Yields:
+        tuple: (chemin, DataFrame nettoyé ou None si la lecture a échoué, durée de lecture)
+    """
+    def submit(executor, path):
+        file_rejects = rejects_path_for(rejects_path, path) if rejects_path else None
+        return executor.submit(prepare_source_file, path, cache_dir, file_rejects, keep, fuzzy)
+    
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        remaining = iter(paths)
+        for path in remaining:
+            pending.append((path, submit(executor, path)))
+            if len(pending) >= processes:
+                break
+        while pending:
+            path, future = pending.popleft()
+            next_path = next(remaining, None)
+            if next_path is not None:
+                pending.append((next_path, submit(executor, next_path)))
+            try:
+                df, seconds, stages = future.result()
+            except Exception as e:
+                logging.error(f"Lecture de {path} impossible: {e}")
+                yield path, None, 0.0
+                continue
+            for stage, entry in stages.items():
+                record_stage(stage, entry['secondes'], entry['lignes'])
+            yield path, df, seconds
+
+def load_source_files(connexion, paths, mode, processes=2, cache_dir=None, batch_size=None, workers=4,
+                      adaptive=True, connection_factory=None, rejects_path=None, keep='premier', fuzzy=False):
+    """
+    Charge plusieurs fichiers (un par année) : lecture et nettoyage en parallèle, chargement coordonné
+    
+    Les fichiers sont traités par ordre d'année puis de nom : avec le mode sync,
+    un établissement présent dans plusieurs fichiers garde les valeurs de
+    l'année la plus récente. Le cache de référence est partagé entre les
+    fichiers et le chargement reste séquentiel sur `connexion`. Avec
+    `rejects_path`, chaque fichier a son fichier d'anomalies (rejects_path_for).
+    
+    Returns:
+        tuple: (True si chaque fichier a été lu et a inséré des lignes, régions
+                rencontrées dans les fichiers ou quittées par un établissement en mode sync)
+    """
+    paths = sorted(paths, key=lambda path: (annee_from_path(path) or '', path))
+    cursor = connexion.cursor()
+    try:
+        cache = load_lookup_cache(cursor)
+        connexion.commit()
+    finally:
+        cursor.close()
+    
+    succeeded = True
+    regions = set()
+    prepared_files = iter_prepared_files(paths, processes, cache_dir, rejects_path, keep, fuzzy)
+    for number, (path, df, read_seconds) in enumerate(prepared_files, start=1):
+        if df is None:
+            record_file(path, 0, read_seconds, 0.0, False)
+            succeeded = False
+            continue
+        logging.info(f"Fichier {number}/{len(paths)}: {path} ({len(df)} lignes, lu en {read_seconds:.2f}s)")
+        start_time = time.perf_counter()
+        loaded = bool(load_dataframe(connexion, df, mode, batch_size, cache, workers=workers,
+                                     adaptive=adaptive, connection_factory=connection_factory,
+                                     regions=regions))
+        record_file(path, len(df), read_seconds, time.perf_counter() - start_time, loaded)
+        if 'region' in df.columns:
+            regions.update(df['region'].dropna().astype(str).unique())
+        succeeded &= loaded
+    return succeeded, sorted(regions)
+
+@timed_stage('cles_spatiales')
+def fill_spatial_keys(connexion, batch_size=5000):
+    """
+    Calcule les clés spatiales des établissements qui n'en ont pas encore
+    
+    Rattrape les lignes écrites sans elles (ancien script, saisie par l'API,
+    chargements antérieurs à la migration) ; les coordonnées sont revalidées
+    comme dans transform_dataframe.
+    
+    Returns:
+        int: nombre d'établissements mis à jour
+    """
+    cursor = connexion.cursor()
+    try:
+        cursor.execute("""
+            SELECT id, latitude, longitude FROM etablissements
+            WHERE geohash IS NULL AND latitude IS NOT NULL AND longitude IS NOT NULL
+        """)
+        stored = pd.DataFrame(cursor.fetchall(), columns=['id', 'latitude', 'longitude'], dtype=object)
+        if stored.empty:
+            return 0
+        
+        latitude = quantize_coordinate_series(stored['latitude'], COORDINATE_LIMITS['latitude'])
+        longitude = quantize_coordinate_series(stored['longitude'], COORDINATE_LIMITS['longitude'])
+        keys = spatial_keys(latitude, longitude).assign(id=stored['id'])
+        keys = keys[keys['geohash'].notna()]
+        
+        update = (
+            f"UPDATE etablissements SET {', '.join(f'{col} = %s' for col in SPATIAL_COLUMNS)} WHERE id = %s"
+        )
+        for start in range(0, len(keys), batch_size):
+            batch = keys.iloc[start:start + batch_size]
+            connexion.start_transaction()
+            cursor.executemany(update, list(iter_parameter_tuples(batch, SPATIAL_COLUMNS + ['id'])))
+            connexion.commit()
+        
+        logging.info(
+            f"Clés spatiales calculées pour {len(keys)} établissements "
+            f"({len(stored) - len(keys)} coordonnées invalides ignorées)"
+        )
+        return len(keys)
+    except Error as e:
+        logging.warning(f"Clés spatiales non calculées (migration non appliquée ?): {e}")
+        connexion.rollback()
+        return 0
+    finally:
+        cursor.close()
+
+# Index de recherche plein texte lu par /etablissements/search (index FULLTEXT sur texte)
+SEARCH_TABLE = 'recherche_etablissements'
+
+# Champs indexés, dans l'ordre de concaténation du texte de recherche
+SEARCH_FIELDS = {
+    'nom_etablissement': 'e.nom_etablissement',
+    'ville_village_quartier': 'l.ville_village_quartier',
+    'canton_village_autonome': 'l.canton_village_autonome',
+    'commune_etab': 'l.commune_etab',
+    'prefecture': 'l.prefecture',
+}
+
+@timed_stage('index_recherche')
+def refresh_search_index(connexion, batch_size=5000):
+    """
+    Met à jour l'index de recherche pour les établissements nouveaux ou modifiés
+    
+    Une empreinte des champs indexés est gardée avec chaque ligne de l'index :
+    seules les lignes dont l'empreinte a changé sont réécrites. Les lignes des
+    établissements supprimés disparaissent par la clé étrangère (cascade).
+    
+    Returns:
+        int: nombre de lignes de l'index réécrites
+    """
+    cursor = connexion.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT e.id, {', '.join(SEARCH_FIELDS.values())}, r.empreinte
+            FROM etablissements e
+            JOIN localisations l ON l.id = e.localisation_id
+            LEFT JOIN {SEARCH_TABLE} r ON r.etablissement_id = e.id
+        """)
+        rows = pd.DataFrame(
+            cursor.fetchall(), columns=['etablissement_id'] + list(SEARCH_FIELDS) + ['empreinte_stockee'], dtype=object
+        )
+        
+        fields = rows[list(SEARCH_FIELDS)].fillna('').astype(str)
+        rows['empreinte'] = pd.util.hash_pandas_object(fields, index=False).astype(str).to_numpy()
+        changed = rows[rows['empreinte'] != rows['empreinte_stockee']].copy()
+        if changed.empty:
+            logging.info("Index de recherche déjà à jour")
+            return 0
+        
+        changed['nom_normalise'] = fold_text_series(changed['nom_etablissement'])
+        folded = [fold_text_series(changed[field]) for field in SEARCH_FIELDS]
+        changed['texte'] = functools.reduce(lambda left, right: left + ' ' + right, folded)
+        changed['texte'] = changed['texte'].str.replace(r'\s+', ' ', regex=True).str.strip()
+        changed = changed.astype({'nom_normalise': object, 'texte': object})
+        
+        columns = ['etablissement_id', 'nom_normalise', 'texte', 'empreinte']
+        for start in range(0, len(changed), batch_size):
+            batch = changed.iloc[start:start + batch_size]
+            ids = batch['etablissement_id'].tolist()
+            connexion.start_transaction()
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE etablissement_id IN ({', '.join(['%s'] * len(ids))})", tuple(ids)
+            )
+            cursor.executemany(build_insert_sql(SEARCH_TABLE, columns), list(iter_parameter_tuples(batch, columns)))
+            connexion.commit()
+        
+        logging.info(f"Index de recherche: {len(changed)} établissements indexés, {len(rows) - len(changed)} inchangés")
+        return len(changed)
+    except Error as e:
+        logging.warning(f"Index de recherche non mis à jour (migration non appliquée ?): {e}")
+        connexion.rollback()
+        return 0
+    finally:
+        cursor.close()
+
+# Tables de synthèse lues par l'API (migration create_statistiques_etablissements_table)
+STATISTICS_TABLE = 'statistiques_etablissements'
+STATISTICS_FINGERPRINT_TABLE = 'statistiques_empreintes'
+
+# Dimensions du regroupement, dans l'ordre du GROUP BY
+STATISTICS_DIMENSIONS = ['region', 'prefecture', 'milieu', 'statut', 'annee']
+
+# Colonnes d'équipement et colonne de comptage / de taux associées
+STATISTICS_EQUIPMENTS = {
+    'existe_elect': 'electricite',
+    'existe_latrine': 'latrine',
+    'existe_latrine_fonct': 'latrine_fonct',
+    'acces_toute_saison': 'acces_toute_saison',
+    'eau': 'eau',
+}
+
+STATISTICS_COUNTS = [
+    'nb_etablissements', 'effectif_total', 'effectif_garcons', 'effectif_filles',
+    'enseignants_total', 'enseignants_hommes', 'enseignants_femmes',
+    'salles_dur', 'salles_banco', 'salles_autre', 'nb_equipements',
+] + [f'nb_{name}' for name in STATISTICS_EQUIPMENTS.values()]
+
+STATISTICS_RATES = [f'taux_{name}' for name in STATISTICS_EQUIPMENTS.values()]
+
+STATISTICS_COLUMNS = STATISTICS_DIMENSIONS + STATISTICS_COUNTS + ['salles_total'] + STATISTICS_RATES
+
+def statistics_query(regions=None):
+    """
+    Construit le SELECT qui agrège les tables normalisées par région, préfecture,
+    milieu, statut et année (SQL commun à MySQL, PostgreSQL et SQLite)
+    """
+    equipments = ''.join(
+        f", SUM(CASE WHEN q.{col} THEN 1 ELSE 0 END)" for col in STATISTICS_EQUIPMENTS
+    )
+    where = f"WHERE l.region IN ({', '.join(['%s'] * len(regions))})" if regions else ''
+    return f"""
+        SELECT l.region, l.prefecture, m.libelle_type_milieu, st.libelle_type_statut_etab,
+               a.libelle_type_annee,
+               COUNT(*), SUM(ef.tot), SUM(ef.sommedenb_eff_g), SUM(ef.sommedenb_eff_f),
+               SUM(ef.total_ense), SUM(ef.sommedenb_ens_h), SUM(ef.sommedenb_ens_f),
+               SUM(i.sommedenb_salles_classes_dur), SUM(i.sommedenb_salles_classes_banco),
+               SUM(i.sommedenb_salles_classes_autre), COUNT(q.id){equipments}
+        FROM etablissements e
+        JOIN localisations l ON l.id = e.localisation_id
+        JOIN milieux m ON m.id = e.milieu_id
+        JOIN statuts st ON st.id = e.statut_id
+        LEFT JOIN annees a ON a.id = e.annee_id
+        LEFT JOIN effectifs ef ON ef.etablissement_id = e.id
+        LEFT JOIN infrastructures i ON i.etablissement_id = e.id
+        LEFT JOIN equipements_etablissement q ON q.etablissement_id = e.id
+        {where}
+        GROUP BY l.region, l.prefecture, m.libelle_type_milieu, st.libelle_type_statut_etab,
+                 a.libelle_type_annee
+    """
+
+def compute_statistics(cursor, regions=None):
+    """
+    Calcule les lignes de synthèse (une par combinaison de dimensions)
+    
+    Les sommes sont ramenées en entiers (0 sans ligne fille) et les taux
+    d'équipement rapportés au nombre d'établissements ayant une ligne
+    d'équipement (None s'il n'y en a aucune).
+    """
+    cursor.execute(statistics_query(regions), tuple(regions or ()))
+    stats = pd.DataFrame(cursor.fetchall(), columns=STATISTICS_DIMENSIONS + STATISTICS_COUNTS)
+    stats[STATISTICS_COUNTS] = stats[STATISTICS_COUNTS].fillna(0).astype('int64')
+    stats['salles_total'] = stats['salles_dur'] + stats['salles_banco'] + stats['salles_autre']
+    for name in STATISTICS_EQUIPMENTS.values():
+        rate = (stats[f'nb_{name}'] / stats['nb_equipements'].where(stats['nb_equipements'] > 0)).round(4)
+        stats[f'taux_{name}'] = rate.astype(object).where(rate.notna(), None)
+    stats['annee'] = stats['annee'].astype(object).where(stats['annee'].notna(), None)
+    return stats.sort_values(STATISTICS_DIMENSIONS, na_position='first', ignore_index=True)
+
+def region_fingerprints(stats):
+    """Empreinte (sha256) des lignes de synthèse de chaque région"""
+    fingerprints = {}
+    for region, rows in stats.groupby('region', sort=False):
+        hashes = pd.util.hash_pandas_object(rows[STATISTICS_COLUMNS].astype(str), index=False)
+        fingerprints[region] = hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+    return fingerprints
+
+@timed_stage('statistiques')
+def refresh_statistics(connexion, regions=None):
+    """
+    Met à jour les tables de synthèse après un chargement
+    
+    Les agrégats sont recalculés pour `regions` (toutes si None) et comparés,
+    région par région, à l'empreinte enregistrée lors du rafraîchissement
+    précédent : seules les régions modifiées sont réécrites, et les régions
+    qui n'ont plus d'établissement sont supprimées.
+    
+    Returns:
+        bool: True si les tables de synthèse sont à jour
+    """
+    cursor = connexion.cursor()
+    try:
+        try:
+            cursor.execute(f"SELECT region, empreinte FROM {STATISTICS_FINGERPRINT_TABLE}")
+            stored = dict(cursor.fetchall())
+        except Error as e:
+            logging.warning(f"Tables de synthèse indisponibles (migration non appliquée ?): {e}")
+            return False
+        
+        stats = compute_statistics(cursor, regions)
+        fingerprints = region_fingerprints(stats)
+        scope = set(regions) if regions else set(stored)
+        removed = sorted(region for region in scope & set(stored) if region not in fingerprints)
+        changed = sorted(region for region, value in fingerprints.items() if stored.get(region) != value)
+        if not changed and not removed:
+            logging.info("Tables de synthèse déjà à jour")
+            return True
+        
+        refreshed = changed + removed
+        placeholders = ', '.join(['%s'] * len(refreshed))
+        connexion.start_transaction()
+        cursor.execute(f"DELETE FROM {STATISTICS_TABLE} WHERE region IN ({placeholders})", tuple(refreshed))
+        cursor.execute(f"DELETE FROM {STATISTICS_FINGERPRINT_TABLE} WHERE region IN ({placeholders})",
+                       tuple(refreshed))
+        rows = stats[stats['region'].isin(changed)]
+        if len(rows):
+            cursor.executemany(
+                build_insert_sql(STATISTICS_TABLE, STATISTICS_COLUMNS),
+                list(iter_parameter_tuples(rows, STATISTICS_COLUMNS))
+            )
+        if changed:
+            cursor.executemany(
+                build_insert_sql(STATISTICS_FINGERPRINT_TABLE, ['region', 'empreinte']),
+                [(region, fingerprints[region]) for region in changed]
+            )
+        connexion.commit()
+        logging.info(
+            f"Tables de synthèse: {len(changed)} région(s) recalculée(s) ({len(rows)} lignes), "
+            f"{len(removed)} supprimée(s), {len(fingerprints) - len(changed)} inchangée(s)"
+        )
+        return True
+    except Error as e:
+        logging.error(f"Erreur lors de la mise à jour des tables de synthèse: {e}")
+        connexion.rollback()
+        return False
+    finally:
+        cursor.close()
+
+def test_database_connection(backend='mysql'):
     """Teste la connexion à la base de données"""
+    if backend != 'mysql':
+        try:
+            connexion = open_connection(backend, 'ligne')
+            cursor = connexion.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            connexion.close()
+            logging.info(f"Test de connexion {backend} réussi")
+            return True
+        except Error as e:
+            logging.error(f"Erreur lors du test de connexion {backend}: {e}")
+            return False
+    
     try:
         connexion = mysql.connector.connect(**config)
         if connexion.is_connected():
@@ -520,6 +3100,7 @@ def test_database_connection():
             cursor.execute("SELECT DATABASE();")
             db_name = cursor.fetchone()[0]
             logging.info(f"Base de données actuelle: {db_name}")
+            suggest_localisation_index(cursor)
             
             cursor.close()
             connexion.close()
@@ -532,42 +3113,235 @@ def test_database_connection():
         logging.error(f"Erreur lors du test de connexion à MySQL: {e}")
         return False
 
-def main():
+def connection_config(mode, backend='mysql'):
+    """Paramètres de connexion du backend pour le mode de chargement demandé"""
+    if backend == 'postgresql':
+        return postgresql_config
+    if backend == 'sqlite':
+        return sqlite_config
+    if mode == 'infile':
+        return {**config, 'allow_local_infile': True}
+    return config
+
+def open_connection(backend, mode):
+    """Ouvre une connexion instrumentée au backend (voir backends.connect)"""
+    return InstrumentedConnection(connect(backend, connection_config(mode, backend)))
+
+def parse_arguments(argv=None):
+    """Analyse les options de la ligne de commande"""
+    parser = argparse.ArgumentParser(
+        description="Import des établissements dans la base normalisée edumap"
+    )
+    parser.add_argument(
+        '--fichier',
+        default='C:/Users/_Salim_mevtr_/project-lab/edumap-api_v0.1/etl/Base_2024.xlsx',
+        help="Chemin du fichier Excel source"
+    )
+    parser.add_argument(
+        '--fichiers', nargs='+', metavar='CHEMIN', default=None,
+        help="Plusieurs fichiers sources (chemins, répertoires ou motifs glob, ex: 'recensements/Base_*.xlsx'), "
+             "chargés par ordre d'année ; remplace --fichier"
+    )
+    parser.add_argument(
+        '--processus', type=int, default=min(4, os.cpu_count() or 1),
+        help="Nombre de processus de lecture et de nettoyage avec --fichiers"
+    )
+    parser.add_argument(
+        '--mode', choices=['ligne', 'bulk', 'sync', 'parallele', 'infile', 'staging'], default='ligne',
+        help="ligne: INSERT ligne par ligne ; bulk: INSERT multi-lignes par lot ; "
+             "sync: insère les nouveaux établissements et met à jour les modifiés ; "
+             "parallele: mode bulk réparti par région sur plusieurs connexions ; "
+             "infile: LOAD DATA LOCAL INFILE (repli sur bulk si refusé) ; "
+             "staging: table de transit puis normalisation en SQL côté serveur"
+    )
+    parser.add_argument(
+        '--backend', choices=BACKENDS, default='mysql',
+        help="Base cible : mysql (LOAD DATA), postgresql (COPY, psycopg2 requis) ou sqlite "
+             "(fichier local, schéma créé s'il manque)"
+    )
+    parser.add_argument(
+        '--base-sqlite', metavar='FICHIER', default=None,
+        help="Fichier de la base SQLite (par défaut sqlite_config['database'])"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=4,
+        help="Nombre de connexions de chargement en mode parallele"
+    )
+    parser.add_argument(
+        '--supprimer-absents', action='store_true',
+        help="En mode sync, supprime les établissements absents du fichier (hors mode --flux)"
+    )
+    parser.add_argument(
+        '--taille-lot', type=int, default=None,
+        help="Nombre de lignes du premier lot (100 en mode ligne, 1000 en mode bulk), ajusté ensuite "
+             "à la latence des commits"
+    )
+    parser.add_argument(
+        '--lots-fixes', action='store_true',
+        help="Garde la taille de lot constante au lieu de l'adapter à la latence des commits"
+    )
+    parser.add_argument(
+        '--reprise', metavar='FICHIER', default=None,
+        help="Point de reprise (modes ligne et bulk) : sauvegardé après chaque lot, "
+             "un chargement interrompu du même fichier reprend là où il s'est arrêté"
+    )
+    parser.add_argument(
+        '--flux', action='store_true',
+        help="Lit et charge le fichier (Excel ou CSV) par blocs, à mémoire constante"
+    )
+    parser.add_argument(
+        '--cache-colonnes', metavar='REPERTOIRE', default=None,
+        help="Répertoire du cache Arrow du fichier nettoyé, réutilisé si le fichier est inchangé"
+    )
+    parser.add_argument(
+        '--taille-bloc', type=int, default=5000,
+        help="Nombre de lignes lues par bloc en mode --flux ou --pipeline"
+    )
+    parser.add_argument(
+        '--pipeline', action='store_true',
+        help="Lit, transforme et écrit (en mode bulk) des blocs différents en parallèle"
+    )
+    parser.add_argument(
+        '--profondeur-pipeline', type=int, default=2,
+        help="Nombre de blocs en attente entre deux étapes du pipeline (borne la mémoire)"
+    )
+    parser.add_argument(
+        '--rejets', metavar='FICHIER', default=None,
+        help="Écrit les lignes rejetées ou signalées par la validation (motifs, valeurs source) "
+             "en CSV, ou en Parquet si le nom se termine par .parquet ; un fichier par source avec --fichiers"
+    )
+    parser.add_argument(
+        '--doublons', choices=KEEP_POLICIES, default='premier',
+        help="Ligne gardée parmi les doublons du fichier : première, dernière ou la plus complète "
+             "(les autres sont rejetées avec le numéro de la ligne conservée)"
+    )
+    parser.add_argument(
+        '--doublons-approchants', action='store_true',
+        help="Traite aussi comme doublons les lignes de codes différents au même nom et à la même "
+             "localisation (sans accents, casse ni ponctuation)"
+    )
+    parser.add_argument(
+        '--sans-statistiques', action='store_true',
+        help="Ne met pas à jour les tables de synthèse (statistiques_etablissements) après le chargement"
+    )
+    parser.add_argument(
+        '--niveau-log', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+        help="Niveau de journalisation (DEBUG affiche le détail par ligne)"
+    )
+    parser.add_argument(
+        '--metriques-json', metavar='FICHIER', default=None,
+        help="Écrit le rapport de fin d'exécution (étapes, requêtes, lots) en JSON"
+    )
+    parser.add_argument(
+        '--metriques-prometheus', metavar='FICHIER', default=None,
+        help="Écrit les métriques au format texte Prometheus (collecteur textfile)"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    logging.getLogger().setLevel(args.niveau_log)
+    reset_metrics()
+    if args.base_sqlite:
+        sqlite_config['database'] = args.base_sqlite
+    connection_factory = lambda: open_connection(args.backend, args.mode)
+    
     # Chemin du fichier Excel
-    fichier_excel = 'C:/Users/_Salim_mevtr_/project-lab/edumap-api_v0.1/etl/Base_2024.xlsx'
+    fichier_excel = args.fichier
     
     # Test de la connexion à la base de données
     logging.info("Test de la connexion à la base de données...")
-    if not test_database_connection():
+    if not test_database_connection(args.backend):
         logging.error("Impossible de se connecter à la base de données. Vérifiez les paramètres de connexion.")
         return
     
     # Vérifier l'existence du fichier
-    if not verify_excel_file(fichier_excel):
+    if not args.fichiers and not verify_excel_file(fichier_excel):
         logging.error(f"Le fichier {fichier_excel} n'existe pas.")
         return
     
     try:
-        # Charger le fichier Excel
-        logging.info(f"Chargement du fichier {fichier_excel}")
-        df = pd.read_excel(fichier_excel)
-        logging.info(f"Fichier chargé avec succès. {len(df)} lignes trouvées.")
-        
-        # Afficher les colonnes originales
-        logging.info(f"Colonnes originales: {list(df.columns)}")
-        
-        # Mapper les colonnes
-        df = map_columns(df)
+        if args.fichiers:
+            paths = expand_source_files(args.fichiers)
+            if not paths:
+                logging.error(f"Aucun fichier source trouvé pour {' '.join(args.fichiers)}")
+                return
+            
+            logging.info("Connexion à la base de données...")
+            connexion = connection_factory()
+            
+            if not verify_database_tables(connexion):
+                logging.error("Problème avec la structure des tables.")
+                return
+            
+            for option, name in [(args.flux, '--flux'), (args.pipeline, '--pipeline'), (args.reprise, '--reprise'),
+                                 (args.supprimer_absents, '--supprimer-absents')]:
+                if option:
+                    logging.warning(f"{name} est ignoré avec --fichiers")
+            if len(paths) > 1 and args.mode != 'sync':
+                logging.warning(
+                    f"Mode {args.mode}: un établissement déjà chargé par un fichier précédent est ignoré "
+                    "(--mode sync garde les valeurs de l'année la plus récente)"
+                )
+            
+            logging.info(f"Chargement de {len(paths)} fichiers avec {args.processus} processus de lecture")
+            succeeded, regions = load_source_files(
+                connexion, paths, args.mode, args.processus, args.cache_colonnes, args.taille_lot,
+                args.workers, adaptive=not args.lots_fixes, connection_factory=connection_factory,
+                rejects_path=args.rejets, keep=args.doublons, fuzzy=args.doublons_approchants
+            )
+            if succeeded:
+                logging.info("Toutes les données ont été insérées avec succès!")
+            else:
+                logging.error("Au moins un fichier n'a pas été lu ou n'a inséré aucune ligne (voir le rapport par fichier).")
+            run_post_load_stages(connexion, args, regions)
+            return
         
-        # Afficher un échantillon pour débogage
-        print_dataframe_sample(df)
+        if args.flux or args.pipeline:
+            logging.info("Connexion à la base de données...")
+            connexion = connection_factory()
+            
+            if not verify_database_tables(connexion):
+                logging.error("Problème avec la structure des tables.")
+                return
+            
+            if args.supprimer_absents:
+                logging.warning("--supprimer-absents est ignoré par bloc (chaque bloc ne voit qu'une partie du fichier)")
+            if args.reprise:
+                logging.warning("--reprise est ignoré en mode --flux ou --pipeline")
+            
+            if args.pipeline:
+                if args.mode != 'bulk':
+                    logging.warning(f"--pipeline écrit en mode bulk (--mode {args.mode} ignoré)")
+                logging.info(f"Chargement en pipeline du fichier {fichier_excel} (blocs de {args.taille_bloc} lignes)")
+                if load_pipelined(connexion, fichier_excel, args.taille_bloc, args.taille_lot or 1000,
+                                  adaptive=not args.lots_fixes, queue_size=args.profondeur_pipeline,
+                                  rejects_path=args.rejets, keep=args.doublons,
+                                  fuzzy=args.doublons_approchants):
+                    logging.info("Toutes les données ont été insérées avec succès!")
+                    run_post_load_stages(connexion, args)
+                else:
+                    logging.error("L'insertion des données a échoué.")
+                return
+            
+            logging.info(f"Chargement en flux du fichier {fichier_excel} (blocs de {args.taille_bloc} lignes)")
+            if load_streaming(connexion, fichier_excel, args.mode, args.taille_bloc,
+                              args.taille_lot, args.workers, adaptive=not args.lots_fixes,
+                              connection_factory=connection_factory, rejects_path=args.rejets,
+                              keep=args.doublons, fuzzy=args.doublons_approchants):
+                logging.info("Toutes les données ont été insérées avec succès!")
+                run_post_load_stages(connexion, args)
+            else:
+                logging.error("L'insertion des données a échoué.")
+            return
         
-        # Nettoyer les données
-        df = clean_data(df)
+        # Charger, mapper et nettoyer le fichier (ou relire le cache colonnaire)
+        df = load_cleaned_dataframe(fichier_excel, args.cache_colonnes, args.rejets,
+                                    args.doublons, args.doublons_approchants)
         
         # Établir une connexion à la base de données
         logging.info("Connexion à la base de données...")
-        connexion = mysql.connector.connect(**config)
+        connexion = connection_factory()
         
         if connexion.is_connected():
             logging.info("Connexion établie avec succès!")
@@ -577,9 +3351,24 @@ def main():
                 logging.error("Problème avec la structure des tables.")
                 return
             
+            checkpoint = None
+            if args.reprise:
+                if args.mode in CHECKPOINT_MODES:
+                    checkpoint = open_checkpoint(args.reprise, file_sha256(fichier_excel), args.mode)
+                else:
+                    logging.warning(f"--reprise est ignoré en mode {args.mode} (modes: {', '.join(CHECKPOINT_MODES)})")
+            
             # Insérer les données
-            if insert_etablissement_data(connexion, df):
+            previous_regions = set()
+            if load_dataframe(connexion, df, args.mode, args.taille_lot,
+                              delete_missing=args.supprimer_absents, workers=args.workers,
+                              adaptive=not args.lots_fixes, checkpoint=checkpoint,
+                              connection_factory=connection_factory, regions=previous_regions):
                 logging.info("Toutes les données ont été insérées avec succès!")
+                # Seules les régions du fichier et celles quittées par un établissement
+                # (mode sync) peuvent avoir changé
+                regions = sorted(set(df['region'].dropna().astype(str).unique()) | previous_regions)
+                run_post_load_stages(connexion, args, regions)
             else:
                 logging.error("L'insertion des données a échoué.")
                 
@@ -597,6 +3386,27 @@ def main():
         if 'connexion' in locals() and connexion.is_connected():
             connexion.close()
             logging.info("Connexion à la base de données fermée.")
+        write_metrics(args)
+
+def run_post_load_stages(connexion, args, regions=None):
+    """Étapes exécutées après un chargement réussi : clés spatiales, index de recherche, tables de synthèse"""
+    fill_spatial_keys(connexion)
+    refresh_search_index(connexion)
+    if not args.sans_statistiques:
+        refresh_statistics(connexion, regions)
+
+def write_metrics(args):
+    """Affiche le rapport de fin d'exécution et l'écrit dans les fichiers demandés"""
+    report = metrics_report()
+    log_metrics_report(report)
+    try:
+        if args.metriques_json:
+            with open(args.metriques_json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        if args.metriques_prometheus:
+            write_prometheus_textfile(report, args.metriques_prometheus)
+    except OSError as e:
+        logging.error(f"Impossible d'écrire les métriques: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,6 +7,9 @@ import sys
 import traceback
 import time
 
+from batching import AdaptiveBatcher, estimate_row_bytes, fetch_max_allowed_packet, write_adaptive_batches
+from deduplication import deduplicate_dataframe
+
 # Configuration du logging avec affichage console en plus du fichier
 logging.basicConfig(
     level=logging.DEBUG,  # Niveau DEBUG pour plus de détails
@@ -221,16 +224,65 @@ def insert_single_row_test(connexion, df):
     finally:
         cursor.close()
 
-def insert_data_batch(connexion, df, batch_size=100):
-    """Insère les données par lots en optimisant avec executemany."""
+# Colonnes source dans l'ordre des paramètres de l'INSERT, avec leur conversion
+COLONNES_INSERT = [
+    ('LATITUDE', float), ('LONGITUDE', float), ('code_etablissement', str), ('libelle_type_milieu', str),
+    ('region', str), ('prefecture', str), ('canton_village_autonome', str), ('ville_village_quartier', str),
+    ('nom_etablissement', str), ('libelle_type_statut_etab', str), ('libelle_type_systeme', str),
+    ('existe_elect', str), ('existe_latrine', str), ('existe_latrine_fonct', str), ('acces_toute_saison', str),
+    ('eau', str), ('sommedenb_eff_g', float), ('sommedenb_eff_f', float), ('Tot', float),
+    ('sommedenb_ens_h', float), ('sommedenb_ens_f', float), ('Total ense', float),
+    ('sommedenb_salles_classes_dur', float), ('sommedenb_salles_classes_banco', float), ('sommedenb_salles_classes_autre', float),
+    ('libelle_type_annee', str), ('commune_etab', str)
+]
+
+def build_values_list(batch):
+    """Construit les tuples de paramètres du lot colonne par colonne (sans iterrows)"""
+    missing_cols = [col for col, _ in COLONNES_INSERT if col not in batch.columns]
+    if missing_cols:
+        logging.error(f"Colonnes manquantes, lot ignoré: {missing_cols}")
+        return []
+    
+    valid = pd.Series(True, index=batch.index)
+    columns = []
+    for col, conversion in COLONNES_INSERT:
+        if conversion is float:
+            values = pd.to_numeric(batch[col], errors='coerce')
+            valid &= values.notna() | batch[col].isna()
+            columns.append(values.astype('float64'))
+        else:
+            columns.append(batch[col].astype(str))
+    
+    invalid = int((~valid).sum())
+    if invalid:
+        logging.error(f"{invalid} lignes avec des valeurs numériques invalides ignorées: {list(batch.index[~valid][:10])}")
+    
+    return list(zip(*(values[valid].tolist() for values in columns)))
+
+def insert_data_batch(connexion, df, batch_size=100, adaptive=True, keep='premier', fuzzy=False):
+    """
+    Insère les données par lots en optimisant avec executemany.
+    
+    `batch_size` est la taille du premier lot : elle est ensuite ajustée d'après
+    la latence des commits et plafonnée par max_allowed_packet. Un lot en
+    erreur est coupé en deux jusqu'à isoler les lignes fautives. Les doublons
+    du fichier (code, et nom + localisation si `fuzzy`) sont retirés avant
+    l'insertion selon la politique `keep` (deduplicate_dataframe).
+    """
     try:
         with connexion.cursor() as cursor:
+            # Lignes sans code (vides après clean_data) insérées telles quelles, sans comparaison
+            has_code = df['code_etablissement'].astype(str).str.strip().ne('')
+            df, duplicates = deduplicate_dataframe(df, keep, fuzzy, candidates=has_code)
             total_rows = len(df)
-            batches = (total_rows // batch_size) + (1 if total_rows % batch_size > 0 else 0)
+            batcher = AdaptiveBatcher(batch_size, adaptive=adaptive)
+            batcher.limit_to_packet(
+                fetch_max_allowed_packet(cursor),
+                estimate_row_bytes(df.head(1000).reindex(columns=[col for col, _ in COLONNES_INSERT]).itertuples(index=False))
+            )
             
-            logging.info(f"Début de l'insertion des données ({total_rows} lignes, {batches} lots)")
+            logging.info(f"Début de l'insertion des données ({total_rows} lignes, premier lot de {batcher.size})")
             start_time = time.time()
-            successful_inserts = 0
             
             # Même SQL que votre script original
             sql = """
@@ -243,48 +295,20 @@ def insert_data_batch(connexion, df, batch_size=100):
                 libelle_type_annee, commune_etab
             ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """
-
-            for i in range(batches):
-                start_idx = i * batch_size
-                end_idx = min((i + 1) * batch_size, total_rows)
-                batch = df.iloc[start_idx:end_idx]
-                
-                try:
-                    values_list = []
-                    for idx, row in batch.iterrows():
-                        try:
-                            values = (
-                                float(row['LATITUDE']), float(row['LONGITUDE']), str(row['code_etablissement']), str(row['libelle_type_milieu']),
-                                str(row['region']), str(row['prefecture']), str(row['canton_village_autonome']), str(row['ville_village_quartier']),
-                                str(row['nom_etablissement']), str(row['libelle_type_statut_etab']), str(row['libelle_type_systeme']),
-                                str(row['existe_elect']), str(row['existe_latrine']), str(row['existe_latrine_fonct']), str(row['acces_toute_saison']),
-                                str(row['eau']), float(row['sommedenb_eff_g']), float(row['sommedenb_eff_f']), float(row['Tot']),
-                                float(row['sommedenb_ens_h']), float(row['sommedenb_ens_f']), float(row['Total ense']),
-                                float(row['sommedenb_salles_classes_dur']), float(row['sommedenb_salles_classes_banco']), float(row['sommedenb_salles_classes_autre']),
-                                str(row['libelle_type_annee']), str(row['commune_etab'])
-                            )
-                            values_list.append(values)
-                        except Exception as e:
-                            logging.error(f"Erreur avec la ligne {idx}: {e}")
-                            # Continuer avec les autres lignes du lot
-                
-                    # Démarrer une transaction pour ce lot uniquement
-                    connexion.start_transaction()
-                    if values_list:  # S'assurer qu'il y a des valeurs à insérer
-                        cursor.executemany(sql, values_list)
-                        connexion.commit()
-                        successful_inserts += len(values_list)
-                        logging.info(f"Lot {i+1}/{batches} inséré en {time.time() - start_time:.2f} sec (Réussis: {len(values_list)}/{len(batch)})")
-                    else:
-                        connexion.rollback()
-                        logging.warning(f"Lot {i+1}/{batches} n'a pas de données valides à insérer")
-                
-                except Error as e:
-                    connexion.rollback()
-                    logging.error(f"Erreur lors de l'insertion du lot {i+1}/{batches}: {e}")
-
+            
+            def write_batch(batch):
+                values_list = build_values_list(batch)
+                if values_list:  # S'assurer qu'il y a des valeurs à insérer
+                    cursor.executemany(sql, values_list)
+                return {'inseres': len(values_list)}
+            
+            stats = write_adaptive_batches(connexion, df, write_batch, batcher)
+            successful_inserts = stats.get('inseres', 0)
+            
             logging.info(f"Insertion terminée en {time.time() - start_time:.2f} secondes.")
             logging.info(f"Lignes insérées avec succès: {successful_inserts}/{total_rows}")
+            logging.info(f"Doublons écartés: {len(duplicates)}")
+            logging.info(f"Lignes rejetées: {len(stats['rejetees'])}")
             
             return successful_inserts > 0
     
@@ -0,0 +1,279 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from backends import BACKENDS
+from etl_loader import load_etl_module
+
+try:
+    import resource
+except ImportError:  # Windows : pas de pic RSS via getrusage
+    resource = None
+
+# Cardinalités proches de la carte scolaire du Togo
+REGIONS = ['MARITIME', 'GOLFE-LOME', 'PLATEAUX', 'CENTRALE', 'KARA', 'SAVANES']
+PREFECTURES_PAR_REGION = 7
+CANTONS_PAR_PREFECTURE = 10
+VILLAGES_PAR_CANTON = 12
+COMMUNES_PAR_PREFECTURE = 3
+
+# Tables vidées avant chaque mesure de chargement (dépendantes d'abord)
+BENCHMARK_TABLES = [
+    'recherche_etablissements', 'equipements_etablissement', 'effectifs', 'infrastructures',
+    'etablissements', 'localisations', 'milieux', 'statuts', 'systemes', 'annees',
+]
+
+def peak_rss_mb():
+    """
+    Pic de mémoire résidente du processus depuis son démarrage (Mo), None si indisponible
+
+    La valeur ne redescend jamais : relevée après une étape, elle vaut le
+    maximum de toutes les étapes précédentes, pas celui de l'étape seule.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sur macOS, en kilo-octets sous Linux
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def generate_synthetic_dataframe(rows, seed=42):
+    """
+    Génère un DataFrame au format du fichier Excel source (noms de colonnes en majuscules)
+
+    La hiérarchie région > préfecture > canton > village est respectée, avec des
+    cardinalités réalistes (6 régions, ~40 préfectures, ~400 cantons, ~5000
+    villages, 2 milieux, 4 statuts).
+    """
+    rng = np.random.default_rng(seed)
+
+    region = rng.integers(0, len(REGIONS), rows)
+    prefecture = region * PREFECTURES_PAR_REGION + rng.integers(0, PREFECTURES_PAR_REGION, rows)
+    canton = prefecture * CANTONS_PAR_PREFECTURE + rng.integers(0, CANTONS_PAR_PREFECTURE, rows)
+    village = canton * VILLAGES_PAR_CANTON + rng.integers(0, VILLAGES_PAR_CANTON, rows)
+    commune = prefecture * COMMUNES_PAR_PREFECTURE + rng.integers(0, COMMUNES_PAR_PREFECTURE, rows)
+    commune_etab = np.char.add('COMMUNE ', commune.astype(str)).astype(object)
+    commune_etab[rng.random(rows) < 0.3] = None
+
+    latitude = rng.uniform(6.0, 11.2, rows).round(6).astype(object)
+    latitude[rng.random(rows) < 0.02] = ''
+    longitude = np.char.replace(rng.uniform(-0.2, 1.8, rows).round(6).astype(str), '.', ',').astype(object)
+
+    garcons = rng.integers(0, 500, rows)
+    filles = rng.integers(0, 500, rows)
+    hommes = rng.integers(0, 25, rows)
+    femmes = rng.integers(0, 25, rows)
+
+    return pd.DataFrame({
+        'LATITUDE': latitude,
+        'LONGITUDE': longitude,
+        'CODE_ETABLISSEMENT': np.char.add('ETAB', np.arange(rows).astype(str)),
+        'NOM_ETABLISSEMENT': np.char.add('EPP ', rng.integers(0, rows, rows).astype(str)),
+        'REGION': np.array(REGIONS)[region],
+        'PREFECTURE': np.char.add('PREFECTURE ', prefecture.astype(str)),
+        'CANTON_VILLAGE_AUTONOME': np.char.add('CANTON ', canton.astype(str)),
+        'VILLE_VILLAGE_QUARTIER': np.char.add('VILLAGE ', village.astype(str)),
+        'COMMUNE_ETAB': commune_etab,
+        'LIBELLE_TYPE_MILIEU': rng.choice(['Urbain', 'Rural'], rows, p=[0.3, 0.7]),
+        'LIBELLE_TYPE_STATUT_ETAB': rng.choice(['Public', 'Privé laïc', 'Privé confessionnel', 'EDIL'], rows),
+        'LIBELLE_TYPE_SYSTEME': rng.choice(['Préscolaire', 'Primaire', 'Secondaire I', 'Secondaire II'], rows),
+        'LIBELLE_TYPE_ANNEE': '2023-2024',
+        'EXISTE_ELECT': rng.choice(['Oui', 'Non'], rows),
+        'EXISTE_LATRINE': rng.choice(['Oui', 'Non'], rows),
+        'EXISTE_LATRINE_FONCT': rng.integers(0, 2, rows),
+        'ACCES_TOUTE_SAISON': rng.choice(['Oui', 'Non'], rows),
+        'EAU': rng.integers(0, 2, rows),
+        'SOMMEDENB_EFF_G': garcons,
+        'SOMMEDENB_EFF_F': filles,
+        'TOT': garcons + filles,
+        'SOMMEDENB_ENS_H': hommes,
+        'SOMMEDENB_ENS_F': femmes,
+        'TOTAL_ENSE': hommes + femmes,
+        'SOMMEDENB_SALLES_CLASSES_DUR': rng.integers(0, 15, rows),
+        'SOMMEDENB_SALLES_CLASSES_BANCO': rng.integers(0, 6, rows),
+        'SOMMEDENB_SALLES_CLASSES_AUTRE': rng.integers(0, 4, rows).astype(float),
+    })
+
+def iterrows_transform(etl, df):
+    """Reproduit la préparation des tuples ligne par ligne (iterrows) d'avant la vectorisation"""
+    rows = []
+    for idx, row in df.iterrows():
+        try:
+            latitude, longitude = etl.validate_coordinates(row.get('latitude'), row.get('longitude'))
+            rows.append((
+                (str(row.get('code_etablissement', '')), str(row.get('nom_etablissement', '')), latitude, longitude),
+                tuple(etl.convert_to_boolean(row.get(col, False)) for col in etl.EQUIPEMENT_COLUMNS),
+                tuple(int(float(row.get(col, 0))) for col in etl.EFFECTIF_COLUMNS),
+                tuple(int(float(row.get(col, 0))) for col in etl.INFRASTRUCTURE_COLUMNS)
+            ))
+        except Exception:
+            continue
+    return rows
+
+def vectorized_transform(etl, df):
+    """Préparation des mêmes tuples via transform_dataframe"""
+    prepared = etl.transform_dataframe(df)
+    return list(zip(
+        etl.iter_parameter_tuples(prepared, ['code_etablissement', 'nom_etablissement', 'latitude', 'longitude']),
+        etl.iter_parameter_tuples(prepared, etl.EQUIPEMENT_COLUMNS),
+        etl.iter_parameter_tuples(prepared, etl.EFFECTIF_COLUMNS),
+        etl.iter_parameter_tuples(prepared, etl.INFRASTRUCTURE_COLUMNS)
+    ))
+
+def measure(stage, rows, function, *args, **kwargs):
+    """Exécute une étape et renvoie (résultat, mesures)"""
+    start_time = time.perf_counter()
+    result = function(*args, **kwargs)
+    elapsed = time.perf_counter() - start_time
+    return result, {
+        'etape': stage,
+        'lignes': rows,
+        'secondes': round(elapsed, 4),
+        'lignes_par_seconde': round(rows / elapsed) if elapsed else None,
+        'pic_rss_cumule_mo': peak_rss_mb(),
+    }
+
+def sqlite_database(backend, mode):
+    """Fichier SQLite neuf pour chaque mode (partagé par les workers du mode parallele)"""
+    if backend != 'sqlite':
+        return None
+    handle, path = tempfile.mkstemp(prefix=f'etl_benchmark_{mode}_', suffix='.sqlite')
+    os.close(handle)
+    return path
+
+def empty_tables(connexion):
+    """Vide les tables chargées par l'ETL : chaque mesure part d'une base vide"""
+    cursor = connexion.cursor()
+    try:
+        for table in BENCHMARK_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+        connexion.commit()
+    finally:
+        cursor.close()
+
+def run_benchmark(etl, rows, modes, backend='sqlite', compare_iterrows=False):
+    """Mesure chaque étape (map_columns, validation, clean_data, transformation, chargement) pour `rows` lignes"""
+    source = generate_synthetic_dataframe(rows)
+    stages = []
+
+    mapped, stats = measure('map_columns', rows, etl.map_columns, source)
+    stages.append(stats)
+    (validated, _), stats = measure('validation', rows, etl.validate_dataframe, mapped)
+    stages.append(stats)
+    cleaned, stats = measure('clean_data', rows, etl.clean_data, validated)
+    stages.append(stats)
+    _, stats = measure('transformation', rows, vectorized_transform, etl, cleaned)
+    stages.append(stats)
+    if compare_iterrows:
+        _, stats = measure('transformation_iterrows', rows, iterrows_transform, etl, cleaned)
+        stages.append(stats)
+
+    for mode in modes:
+        database = sqlite_database(backend, mode)
+        if database:
+            etl.sqlite_config['database'] = database
+        connection_factory = lambda: etl.open_connection(backend, mode)
+        connexion = connection_factory()
+        # SQLite part déjà d'un fichier neuf ; MySQL et PostgreSQL gardent les lignes de la mesure précédente
+        empty_tables(connexion)
+        etl.reset_metrics()
+        try:
+            _, stats = measure(f"chargement_{mode}", rows, etl.load_dataframe, connexion, cleaned, mode,
+                               connection_factory=connection_factory)
+            report = etl.metrics_report()
+            stats['requetes'] = report['requetes_total']
+            stats['requetes_par_type'] = report['requetes']
+            stats['latence_lots'] = report['lots']['histogramme_secondes']
+            stages.append(stats)
+        finally:
+            connexion.close()
+            if database:
+                os.remove(database)
+
+    return {'lignes': rows, 'backend': backend, 'etapes': stages}
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Signale les étapes dont le débit a baissé de plus de `tolerance` par rapport à la référence"""
+    reference = {
+        (run['lignes'], stage['etape']): stage
+        for run in baseline.get('executions', [])
+        for stage in run['etapes']
+    }
+    regressions = []
+    for run in results['executions']:
+        for stage in run['etapes']:
+            previous = reference.get((run['lignes'], stage['etape']))
+            if not previous or not previous.get('lignes_par_seconde') or not stage['lignes_par_seconde']:
+                continue
+            ratio = stage['lignes_par_seconde'] / previous['lignes_par_seconde']
+            if ratio < 1 - tolerance:
+                regressions.append(
+                    f"{stage['etape']} ({run['lignes']} lignes): {stage['lignes_par_seconde']} lignes/s "
+                    f"contre {previous['lignes_par_seconde']} ({(1 - ratio) * 100:.0f}% plus lent)"
+                )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reproductible des étapes de l'ETL")
+    parser.add_argument('--tailles', type=int, nargs='+', default=[10000, 100000],
+                        help="Nombres de lignes synthétiques (ex: 10000 100000 1000000)")
+    parser.add_argument('--modes', nargs='+', default=['bulk'],
+                        help="Modes de chargement mesurés (ligne, bulk, sync, staging...)")
+    parser.add_argument('--backend', choices=BACKENDS, default='sqlite',
+                        help="Base de chargement : SQLite (fichier temporaire) ou MySQL / PostgreSQL "
+                             "(config de l'ETL, tables vidées avant chaque mode et chaque taille : "
+                             "exige --vider-tables)")
+    parser.add_argument('--vider-tables', action='store_true',
+                        help="Confirme l'effacement des établissements et tables de référence de la base "
+                             "MySQL / PostgreSQL configurée avant chaque mesure")
+    parser.add_argument('--comparer-iterrows', action='store_true',
+                        help="Mesure aussi l'ancienne transformation ligne par ligne")
+    parser.add_argument('--sortie', default='etl_benchmark.json', help="Fichier JSON des résultats")
+    parser.add_argument('--reference', default=None, help="Fichier JSON de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Baisse de débit tolérée avant de signaler une régression (0.2 = 20%%)")
+    args = parser.parse_args()
+    if args.backend != 'sqlite' and not args.vider_tables:
+        parser.error(f"--backend {args.backend} efface les données de la base configurée avant chaque mesure : "
+                     "confirmer avec --vider-tables")
+
+    etl = load_etl_module()
+    # Les messages par lot et par ligne fausseraient les mesures
+    logging.getLogger().setLevel(logging.ERROR)
+
+    results = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'executions': [],
+    }
+    for rows in sorted(args.tailles):
+        run = run_benchmark(etl, rows, args.modes, args.backend, args.comparer_iterrows)
+        results['executions'].append(run)
+        for stage in run['etapes']:
+            queries = f", {stage['requetes']} requêtes" if 'requetes' in stage else ''
+            print(f"{rows:>8} lignes | {stage['etape']:<24} {stage['secondes']:>9.3f}s "
+                  f"{stage['lignes_par_seconde'] or 0:>10} lignes/s | pic RSS cumulé {stage['pic_rss_cumule_mo']} Mo{queries}")
+
+    with open(args.sortie, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Résultats écrits dans {args.sortie}")
+
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"RÉGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
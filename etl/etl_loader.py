@@ -0,0 +1,12 @@
+import importlib.util
+import os
+
+# Le script d'import porte un tiret dans son nom : chargement par chemin
+ETL_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'edumap-api_v01_data_extract.py')
+
+def load_etl_module():
+    """Charge le script d'import normalisé comme module"""
+    spec = importlib.util.spec_from_file_location('edumap_etl', ETL_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,389 @@
+import argparse
+import gzip
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import struct
+import time
+import unicodedata
+
+from mysql.connector import Error
+
+from backends import BACKENDS
+from etl_loader import load_etl_module
+
+# Nom de la couche des tuiles vectorielles et résolution d'une tuile (spécification MVT 2.1)
+LAYER_NAME = 'etablissements'
+TILE_EXTENT = 4096
+
+# Propriétés exportées : (nom dans GeoJSON / MVT, expression SQL)
+FEATURE_PROPERTIES = [
+    ('id', 'e.id'),
+    ('code', 'e.code_etablissement'),
+    ('nom', 'e.nom_etablissement'),
+    ('region', 'l.region'),
+    ('prefecture', 'l.prefecture'),
+    ('milieu', 'm.libelle_type_milieu'),
+    ('statut', 'st.libelle_type_statut_etab'),
+    ('systeme', 'sy.libelle_type_systeme'),
+    ('annee', 'a.libelle_type_annee'),
+    ('effectif_total', 'ef.tot'),
+    ('effectif_filles', 'ef.sommedenb_eff_f'),
+    ('effectif_garcons', 'ef.sommedenb_eff_g'),
+    ('enseignants', 'ef.total_ense'),
+]
+
+# Sous-ensemble gardé dans les tuiles (le détail complet est servi par /etablissements/{id})
+TILE_PROPERTIES = ['id', 'code', 'nom', 'milieu', 'statut', 'effectif_total']
+
+def features_query(order_by):
+    """SELECT des établissements géolocalisés avec leurs libellés, trié par `order_by`"""
+    columns = ', '.join(expression for _, expression in FEATURE_PROPERTIES)
+    return f"""
+        SELECT {order_by}, e.lat, e.lng, {columns}
+        FROM etablissements e
+        JOIN localisations l ON l.id = e.localisation_id
+        JOIN milieux m ON m.id = e.milieu_id
+        JOIN statuts st ON st.id = e.statut_id
+        JOIN systemes sy ON sy.id = e.systeme_id
+        LEFT JOIN annees a ON a.id = e.annee_id
+        LEFT JOIN effectifs ef ON ef.etablissement_id = e.id
+        WHERE e.lat IS NOT NULL AND e.lng IS NOT NULL
+        ORDER BY {order_by}, e.id
+    """
+
+def iter_features(cursor, order_by, chunk_size=5000):
+    """
+    Produit les établissements un par un, lus par blocs de `chunk_size` lignes
+
+    Seul le bloc courant est en mémoire (curseur non bufferisé avec MySQL,
+    lecture au fil de l'eau avec SQLite).
+
+    Yields:
+        tuple: (valeur de `order_by`, latitude, longitude, dict des propriétés)
+    """
+    names = [name for name, _ in FEATURE_PROPERTIES]
+    cursor.execute(features_query(order_by))
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        for row in rows:
+            yield row[0], float(row[1]), float(row[2]), dict(zip(names, row[3:]))
+
+def slugify(value):
+    """Nom de fichier ASCII d'un libellé de région"""
+    text = unicodedata.normalize('NFKD', str(value))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-') or 'sans-region'
+
+class RegionGeoJSONWriter:
+    """
+    FeatureCollection GeoJSON compressée en gzip, écrite un établissement à la fois
+
+    Le fichier est écrit sous <path>.tmp puis renommé par close() : un lecteur
+    ne voit jamais de fichier partiel.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.file = gzip.open(f"{path}.tmp", 'wt', encoding='utf-8')
+        self.file.write('{"type":"FeatureCollection","features":[')
+
+    def write(self, lat, lng, properties):
+        if self.count:
+            self.file.write(',')
+        json.dump({
+            'type': 'Feature',
+            'id': properties['id'],
+            'geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+            'properties': properties,
+        }, self.file, ensure_ascii=False, separators=(',', ':'), default=str)
+        self.count += 1
+
+    def close(self):
+        self.file.write(']}')
+        self.file.close()
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def abort(self):
+        """Ferme et supprime le fichier temporaire (export interrompu)"""
+        self.file.close()
+        os.remove(f"{self.path}.tmp")
+
+def export_geojson(connexion, directory, chunk_size=5000):
+    """
+    Exporte un fichier <region>.geojson.gz par région
+
+    Les établissements sont lus triés par région et écrits un à un dans le
+    fichier de leur région : la mémoire ne dépend pas de la taille des régions.
+    Les fichiers sont indexés par nom (slugify) et restent ouverts jusqu'à la
+    fin de l'export, si bien que des graphies d'une même région (casse,
+    accents) s'ajoutent au même fichier au lieu de l'écraser. Les fichiers
+    .geojson.gz d'une région disparue sont ensuite supprimés.
+
+    Returns:
+        dict: {fichier: nombre d'établissements}
+    """
+    cursor = connexion.cursor()
+    writers = {}
+    regions = {}
+    try:
+        for region, lat, lng, properties in iter_features(cursor, 'l.region', chunk_size):
+            slug = slugify(region)
+            if slug not in writers:
+                writers[slug] = RegionGeoJSONWriter(os.path.join(directory, f"{slug}.geojson.gz"))
+                regions[slug] = []
+            if region not in regions[slug]:
+                regions[slug].append(region)
+            writers[slug].write(lat, lng, properties)
+        for slug, writer in writers.items():
+            writer.close()
+            logging.info(f"GeoJSON {' / '.join(map(str, regions[slug]))}: {writer.count} établissements -> {writer.path}")
+    finally:
+        cursor.close()
+        for writer in writers.values():
+            if not writer.file.closed:
+                writer.abort()
+
+    written = {writer.path: writer.count for writer in writers.values()}
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.endswith('.geojson.gz') and path not in written:
+            os.remove(path)
+            logging.info(f"GeoJSON {name}: région disparue, fichier supprimé")
+    return written
+
+def protobuf_varint(value):
+    """Entier non signé encodé en varint protobuf"""
+    data = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return bytes(data)
+
+def protobuf_field(number, wire_type, payload):
+    """Champ protobuf : varint (wire type 0), 64 bits fixes (1) ou longueur puis contenu (2)"""
+    key = protobuf_varint((number << 3) | wire_type)
+    if wire_type == 0:
+        return key + protobuf_varint(payload)
+    if wire_type == 1:
+        return key + payload
+    return key + protobuf_varint(len(payload)) + payload
+
+def zigzag(value):
+    """Encodage zigzag des coordonnées signées de la géométrie MVT"""
+    return (value << 1) ^ (value >> 63)
+
+def mvt_value(value):
+    """Message Value de la spécification MVT (chaîne, entier ou réel)"""
+    if isinstance(value, bool):
+        return protobuf_field(7, 0, int(value))
+    if isinstance(value, int):
+        return protobuf_field(6, 0, zigzag(value))
+    if isinstance(value, float):
+        return protobuf_field(3, 1, struct.pack('<d', value))
+    return protobuf_field(1, 2, str(value).encode('utf-8'))
+
+class PointTileEncoder:
+    """
+    Encode une tuile vectorielle Mapbox (MVT 2.1) d'une couche de points, point par point
+
+    Les coordonnées sont projetées en Web Mercator dans la grille TILE_EXTENT
+    de la tuile (x, y) au niveau `zoom`. Chaque point est encodé dès son
+    ajout : seuls les octets de la tuile en cours et les clés et valeurs
+    mutualisées de la couche (spécification) restent en mémoire.
+    """
+
+    def __init__(self, zoom, x, y):
+        self.tiles = 2 ** zoom
+        self.x, self.y = x, y
+        self.keys, self.values = {}, {}
+        self.features = []
+
+    def add(self, lat, lng, properties):
+        lat = max(-85.05112878, min(85.05112878, lat))
+        tile_x = (lng + 180) / 360 * self.tiles
+        tile_y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * self.tiles
+        pixel_x = int(round((tile_x - self.x) * TILE_EXTENT))
+        pixel_y = int(round((tile_y - self.y) * TILE_EXTENT))
+
+        tags = []
+        for name in TILE_PROPERTIES:
+            value = properties.get(name)
+            if value is None:
+                continue
+            value = str(value) if not isinstance(value, (int, float)) else value
+            tags.append(self.keys.setdefault(name, len(self.keys)))
+            tags.append(self.values.setdefault((type(value), value), len(self.values)))
+
+        # MoveTo(1) d'un point : commande 9 puis dx, dy en zigzag
+        geometry = b''.join(protobuf_varint(v) for v in [9, zigzag(pixel_x), zigzag(pixel_y)])
+        self.features.append(protobuf_field(2, 2,
+            protobuf_field(1, 0, properties['id'])
+            + protobuf_field(2, 2, b''.join(protobuf_varint(tag) for tag in tags))
+            + protobuf_field(3, 0, 1)
+            + protobuf_field(4, 2, geometry)
+        ))
+
+    def finish(self):
+        """Octets de la tuile (message Tile à une couche)"""
+        layer = (
+            protobuf_field(15, 0, 2)
+            + protobuf_field(1, 2, LAYER_NAME.encode('utf-8'))
+            + b''.join(self.features)
+            + b''.join(protobuf_field(3, 2, key.encode('utf-8')) for key in self.keys)
+            + b''.join(protobuf_field(4, 2, mvt_value(value)) for _, value in self.values)
+            + protobuf_field(5, 0, TILE_EXTENT)
+        )
+        return protobuf_field(3, 2, layer)
+
+def create_mbtiles(path, zooms, bounds):
+    """Crée un fichier MBTiles vide (schéma et métadonnées de la spécification 1.3)"""
+    mbtiles = sqlite3.connect(path)
+    mbtiles.executescript("""
+        CREATE TABLE metadata (name TEXT, value TEXT);
+        CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+        CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row);
+    """)
+    vector_layers = [{
+        'id': LAYER_NAME,
+        'minzoom': min(zooms),
+        'maxzoom': max(zooms),
+        'fields': {name: 'String' if name not in ('id', 'effectif_total') else 'Number'
+                   for name in TILE_PROPERTIES},
+    }]
+    mbtiles.executemany("INSERT INTO metadata (name, value) VALUES (?, ?)", [
+        ('name', 'edumap-etablissements'),
+        ('format', 'pbf'),
+        ('type', 'overlay'),
+        ('version', '1'),
+        ('minzoom', str(min(zooms))),
+        ('maxzoom', str(max(zooms))),
+        ('bounds', ','.join(str(value) for value in bounds)),
+        ('json', json.dumps({'vector_layers': vector_layers})),
+    ])
+    mbtiles.commit()
+    return mbtiles
+
+def fetch_bounds(connexion):
+    """Emprise (lng_min, lat_min, lng_max, lat_max) des établissements géolocalisés"""
+    cursor = connexion.cursor()
+    try:
+        cursor.execute("SELECT MIN(lng), MIN(lat), MAX(lng), MAX(lat) FROM etablissements WHERE lat IS NOT NULL")
+        bounds = cursor.fetchone()
+    finally:
+        cursor.close()
+    if bounds is None or bounds[0] is None:
+        return (-180, -85.05112878, 180, 85.05112878)
+    return tuple(float(value) for value in bounds)
+
+def export_mbtiles(connexion, path, zooms, chunk_size=5000, batch_size=500):
+    """
+    Exporte les tuiles vectorielles de chaque niveau de `zooms` dans un fichier MBTiles
+
+    Pour chaque niveau, les établissements sont lus triés sur la clé de tuile
+    précalculée (tuile_z<zoom>) : chaque point est encodé dans sa tuile à la
+    lecture, la tuile est compressée au changement de clé et les tuiles sont
+    écrites par paquets de `batch_size`.
+
+    Returns:
+        dict: {zoom: nombre de tuiles}
+    """
+    # Écrit à côté puis renommé : un serveur qui lit l'ancien fichier n'en voit jamais un partiel
+    temporary_path = f"{path}.tmp"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+    mbtiles = create_mbtiles(temporary_path, zooms, fetch_bounds(connexion))
+    cursor = connexion.cursor()
+    counts = {}
+    try:
+        for zoom in zooms:
+            tiles = 2 ** zoom
+            pending = []
+            counts[zoom] = 0
+            encoder, current_key = None, None
+
+            def finish_tile():
+                # MBTiles numérote les lignes dans le schéma TMS (origine en bas)
+                pending.append((zoom, encoder.x, tiles - 1 - encoder.y, gzip.compress(encoder.finish())))
+
+            for key, lat, lng, properties in iter_features(cursor, f'e.tuile_z{zoom}', chunk_size):
+                if encoder is None or key != current_key:
+                    if encoder is not None:
+                        finish_tile()
+                    current_key = key
+                    encoder = PointTileEncoder(zoom, *divmod(key, tiles))
+                encoder.add(lat, lng, properties)
+                if len(pending) >= batch_size:
+                    mbtiles.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)", pending)
+                    counts[zoom] += len(pending)
+                    pending = []
+            if encoder is not None:
+                finish_tile()
+            mbtiles.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)", pending)
+            counts[zoom] += len(pending)
+            mbtiles.commit()
+            logging.info(f"MBTiles zoom {zoom}: {counts[zoom]} tuiles")
+    finally:
+        cursor.close()
+        mbtiles.close()
+    os.replace(temporary_path, path)
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Exporte la carte des établissements en GeoJSON par région et en tuiles MBTiles"
+    )
+    parser.add_argument('--backend', choices=BACKENDS, default='mysql',
+                        help="Base source (paramètres de connexion de l'ETL)")
+    parser.add_argument('--base-sqlite', metavar='FICHIER', default=None,
+                        help="Fichier de la base SQLite (par défaut sqlite_config['database'])")
+    parser.add_argument('--sortie', default='export_carte', help="Répertoire des fichiers exportés")
+    parser.add_argument('--zooms', type=int, nargs='+', default=None,
+                        help="Niveaux de zoom des tuiles (parmi TILE_ZOOMS de l'ETL, par défaut tous)")
+    parser.add_argument('--sans-geojson', action='store_true', help="N'écrit pas les fichiers GeoJSON")
+    parser.add_argument('--sans-tuiles', action='store_true', help="N'écrit pas le fichier MBTiles")
+    parser.add_argument('--taille-bloc', type=int, default=5000,
+                        help="Nombre de lignes lues à la fois (borne la mémoire)")
+    args = parser.parse_args(argv)
+
+    etl = load_etl_module()
+    zooms = sorted(args.zooms or etl.TILE_ZOOMS)
+    unknown = set(zooms) - set(etl.TILE_ZOOMS)
+    if unknown:
+        parser.error(f"zooms sans clé de tuile précalculée: {sorted(unknown)} (disponibles: {etl.TILE_ZOOMS})")
+    if args.base_sqlite:
+        etl.sqlite_config['database'] = args.base_sqlite
+
+    os.makedirs(args.sortie, exist_ok=True)
+    connexion = None
+    try:
+        connexion = etl.open_connection(args.backend, 'ligne')
+        # Les clés spatiales manquantes (lignes chargées avant la migration) sont complétées d'abord
+        etl.fill_spatial_keys(connexion)
+        start_time = time.time()
+        if not args.sans_geojson:
+            written = export_geojson(connexion, args.sortie, args.taille_bloc)
+            logging.info(f"{len(written)} fichiers GeoJSON, {sum(written.values())} établissements")
+        if not args.sans_tuiles:
+            path = os.path.join(args.sortie, 'etablissements.mbtiles')
+            counts = export_mbtiles(connexion, path, zooms, args.taille_bloc)
+            logging.info(f"{sum(counts.values())} tuiles écrites dans {path}")
+        logging.info(f"Export terminé en {time.time() - start_time:.2f} secondes")
+    except Error as e:
+        logging.error(f"Erreur lors de l'export: {e}")
+    finally:
+        if connexion is not None:
+            connexion.close()
+
+if __name__ == "__main__":
+    main()
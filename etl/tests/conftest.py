@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# Les modules de l'ETL sont des scripts du dossier etl/, sans paquet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl_loader import load_etl_module
+
+@pytest.fixture(scope='session')
+def etl(tmp_path_factory):
+    """Script d'import normalisé chargé comme module"""
+    # Le script ouvre son journal (import_excel_normalized.log) dans le dossier courant
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('journal'))
+    try:
+        return load_etl_module()
+    finally:
+        os.chdir(cwd)
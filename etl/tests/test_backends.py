@@ -0,0 +1,147 @@
+import types
+
+import pytest
+from mysql.connector import Error
+
+import backends
+
+UPSERT = (
+    "INSERT INTO etablissements (id, nom_etablissement, tot) VALUES (%s, %s, %s) "
+    "AS new ON DUPLICATE KEY UPDATE nom_etablissement = new.nom_etablissement, tot = new.tot"
+)
+
+class FakeCursor:
+    """Curseur de pilote qui enregistre les requêtes reçues"""
+    
+    def __init__(self, row=(42,)):
+        self.calls = []
+        self.row = row
+    
+    def execute(self, sql, params=()):
+        self.calls.append(('execute', sql, params))
+    
+    def executemany(self, sql, seq_params):
+        self.calls.append(('executemany', sql, seq_params))
+    
+    def fetchone(self):
+        return self.row
+    
+    def copy_expert(self, sql, f):
+        self.calls.append(('copy_expert', sql, f.read()))
+    
+    def close(self):
+        pass
+
+def test_translate_upsert_maps_row_alias_to_excluded():
+    assert backends.translate_upsert(UPSERT) == (
+        "INSERT INTO etablissements (id, nom_etablissement, tot) VALUES (%s, %s, %s) "
+        "ON CONFLICT (id) DO UPDATE SET nom_etablissement = EXCLUDED.nom_etablissement, tot = EXCLUDED.tot"
+    )
+
+def test_translate_upsert_leaves_plain_insert():
+    sql = "INSERT INTO milieux (libelle_type_milieu) VALUES (%s)"
+    assert backends.translate_upsert(sql) == sql
+
+def test_sqlite_translate():
+    cursor = backends.SQLiteCursor(FakeCursor())
+    assert cursor.translate("INSERT IGNORE INTO annees (libelle_type_annee) VALUES (%s)") == (
+        "INSERT OR IGNORE INTO annees (libelle_type_annee) VALUES (?)"
+    )
+    assert cursor.translate("DROP TEMPORARY TABLE IF EXISTS t") == "DROP TABLE IF EXISTS t"
+    assert cursor.translate(UPSERT).endswith("tot = EXCLUDED.tot")
+    assert '?' in cursor.translate(UPSERT) and '%s' not in cursor.translate(UPSERT)
+
+def test_postgresql_translate():
+    cursor = backends.PostgreSQLCursor(FakeCursor())
+    assert cursor.translate("INSERT IGNORE INTO annees (libelle_type_annee) VALUES (%s)") == (
+        "INSERT INTO annees (libelle_type_annee) VALUES (%s) ON CONFLICT DO NOTHING"
+    )
+    assert cursor.translate("DROP TEMPORARY TABLE IF EXISTS t") == "DROP TABLE IF EXISTS t"
+    assert "ON CONFLICT (id) DO UPDATE SET nom_etablissement = EXCLUDED.nom_etablissement" in cursor.translate(UPSERT)
+
+def test_postgresql_insert_returns_id_for_lastrowid():
+    driver = FakeCursor(row=(42,))
+    cursor = backends.PostgreSQLCursor(driver)
+    cursor.execute("INSERT INTO milieux (libelle_type_milieu) VALUES (%s)", ('Urbain',))
+    assert driver.calls == [('execute', "INSERT INTO milieux (libelle_type_milieu) VALUES (%s) RETURNING id", ('Urbain',))]
+    assert cursor.lastrowid == 42
+
+def test_postgresql_no_returning_on_conflict_or_other_tables():
+    driver = FakeCursor()
+    cursor = backends.PostgreSQLCursor(driver)
+    cursor.execute("INSERT IGNORE INTO milieux (libelle_type_milieu) VALUES (%s)", ('Urbain',))
+    cursor.execute("INSERT INTO statistiques_empreintes (region, empreinte) VALUES (%s, %s)", ('KARA', 'x'))
+    assert [call[1] for call in driver.calls] == [
+        "INSERT INTO milieux (libelle_type_milieu) VALUES (%s) ON CONFLICT DO NOTHING",
+        "INSERT INTO statistiques_empreintes (region, empreinte) VALUES (%s, %s)",
+    ]
+    assert cursor.lastrowid is None
+
+def test_postgresql_executemany_uses_execute_values(monkeypatch):
+    sent = []
+    extras = types.SimpleNamespace(execute_values=lambda cur, sql, rows, page_size: sent.append((sql, rows)))
+    monkeypatch.setattr(backends, 'psycopg2', types.SimpleNamespace(extras=extras))
+    cursor = backends.PostgreSQLCursor(FakeCursor())
+    cursor.executemany(UPSERT, [(1, 'A', 10), (2, 'B', 20)])
+    assert sent == [(
+        "INSERT INTO etablissements (id, nom_etablissement, tot) VALUES %s ON CONFLICT (id) DO UPDATE "
+        "SET nom_etablissement = EXCLUDED.nom_etablissement, tot = EXCLUDED.tot",
+        [(1, 'A', 10), (2, 'B', 20)],
+    )]
+
+def test_load_data_uses_copy_on_postgresql(tmp_path):
+    path = tmp_path / 'lot.tsv'
+    path.write_text('1\tA\\tB\n2\t\\N\n', encoding='utf-8')
+    driver = FakeCursor()
+    cursor = backends.PostgreSQLCursor(driver)
+    # Requête telle qu'émise par load_data_infile
+    cursor.execute("""
+        LOAD DATA LOCAL INFILE %s INTO TABLE effectifs
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+        (etablissement_id, tot)
+    """, (str(path),))
+    assert driver.calls == [('copy_expert', "COPY effectifs (etablissement_id, tot) FROM STDIN", '1\tA\\tB\n2\t\\N\n')]
+
+def test_load_data_replayed_on_sqlite(tmp_path):
+    path = tmp_path / 'lot.tsv'
+    path.write_text('1\tA\\tB\n2\t\\N\n', encoding='utf-8')
+    driver = FakeCursor()
+    backends.SQLiteCursor(driver).execute(
+        "LOAD DATA LOCAL INFILE %s INTO TABLE t (a, b)", (str(path),)
+    )
+    assert driver.calls == [('executemany', "INSERT INTO t (a, b) VALUES (?, ?)", [('1', 'A\tB'), ('2', None)])]
+
+def test_mysql_session_statements_are_skipped():
+    driver = FakeCursor()
+    cursor = backends.SQLiteCursor(driver)
+    cursor.execute("SET foreign_key_checks = 0")
+    cursor.execute("SET unique_checks = 1")
+    assert driver.calls == []
+
+def test_driver_errors_are_raised_as_mysql_errors():
+    connexion = backends.SQLiteConnection()
+    cursor = connexion.cursor()
+    with pytest.raises(Error):
+        cursor.execute("SELECT * FROM table_absente")
+    connexion.close()
+
+def test_sqlite_is_connected_reflects_driver_state():
+    connexion = backends.SQLiteConnection()
+    assert connexion.is_connected()
+    connexion.close()
+    assert not connexion.is_connected()
+
+def test_postgresql_is_connected_reads_closed_flag():
+    connexion = backends.PostgreSQLConnection.__new__(backends.PostgreSQLConnection)
+    connexion._connexion = types.SimpleNamespace(closed=0)
+    assert connexion.is_connected()
+    connexion._connexion.closed = 2
+    assert not connexion.is_connected()
+
+def test_adapters_are_abstract():
+    with pytest.raises(TypeError):
+        backends.AdaptedCursor(FakeCursor())
+    with pytest.raises(TypeError):
+        backends.AdaptedConnection(None)
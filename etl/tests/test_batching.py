@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+from mysql.connector import errors
+
+import backends
+import batching
+
+class FakeConnection:
+    """Connexion qui compte les transactions"""
+    
+    def __init__(self):
+        self.transactions = 0
+        self.commits = 0
+    
+    def start_transaction(self):
+        self.transactions += 1
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        pass
+
+BATCH = pd.DataFrame({'code': [f'E{number}' for number in range(16)]})
+
+def test_data_error_rejects_only_the_bad_row():
+    def write(batch):
+        if 'E5' in batch['code'].tolist():
+            raise errors.DataError(msg="Out of range value")
+        return {'inseres': len(batch)}
+    
+    counts, rejected = batching.commit_or_bisect(FakeConnection(), BATCH, write, "Lot")
+    assert counts == {'inseres': 15}
+    assert [index for index, _ in rejected] == [5]
+
+def test_row_errno_without_sqlstate_is_bisected():
+    def write(batch):
+        if 'E5' in batch['code'].tolist():
+            raise errors.DatabaseError(msg="Incorrect integer value", errno=1366)
+        return {'inseres': len(batch)}
+    
+    counts, rejected = batching.commit_or_bisect(FakeConnection(), BATCH, write, "Lot")
+    assert counts == {'inseres': 15} and len(rejected) == 1
+
+@pytest.mark.parametrize('error', [
+    errors.OperationalError(msg="Lost connection to MySQL server during query", errno=2013),
+    errors.DatabaseError(msg="MySQL server has gone away", errno=2006),
+    errors.DatabaseError(msg="Table 'etablissements' doesn't exist", errno=1146),
+])
+def test_non_data_error_is_raised_without_bisection(error):
+    connexion = FakeConnection()
+    def write(batch):
+        raise error
+    
+    with pytest.raises(type(error)):
+        batching.commit_or_bisect(connexion, BATCH, write, "Lot")
+    assert connexion.transactions == 1
+
+def test_lock_errors_are_retried_on_the_same_batch(monkeypatch):
+    monkeypatch.setattr(batching.time, 'sleep', lambda seconds: None)
+    connexion = FakeConnection()
+    failures = [errors.DatabaseError(msg="Deadlock found", errno=1213)] * 2
+    def write(batch):
+        if failures:
+            raise failures.pop()
+        return {'inseres': len(batch)}
+    
+    counts, rejected = batching.commit_or_bisect(connexion, BATCH, write, "Lot")
+    assert counts == {'inseres': 16} and rejected == []
+    assert connexion.transactions == 3
+
+def test_persistent_lock_timeout_is_raised(monkeypatch):
+    monkeypatch.setattr(batching.time, 'sleep', lambda seconds: None)
+    connexion = FakeConnection()
+    def write(batch):
+        raise errors.DatabaseError(msg="Lock wait timeout exceeded", errno=1205)
+    
+    with pytest.raises(errors.DatabaseError):
+        batching.commit_or_bisect(connexion, BATCH, write, "Lot")
+    assert connexion.transactions == batching.LOCK_RETRIES + 1
+
+def test_sqlite_constraint_violations_are_integrity_errors():
+    connexion = backends.SQLiteConnection()
+    cursor = connexion.cursor()
+    cursor.execute("INSERT INTO milieux (libelle_type_milieu) VALUES (%s)", ('Urbain',))
+    with pytest.raises(errors.IntegrityError):
+        cursor.execute("INSERT INTO milieux (libelle_type_milieu) VALUES (%s)", ('Urbain',))
+    with pytest.raises(errors.IntegrityError):
+        cursor.executemany("INSERT INTO milieux (libelle_type_milieu) VALUES (%s)", [(None,)])
+    connexion.close()
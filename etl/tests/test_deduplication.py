@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from deduplication import deduplicate_dataframe, find_duplicates, fold_text_series, fuzzy_keys
+
+def schools(rows):
+    return pd.DataFrame(rows, columns=['code_etablissement', 'nom_etablissement', 'region', 'tot'])
+
+DUPLICATES = schools([
+    ['A1', 'EPP Lomé', 'MARITIME', None],
+    ['B1', 'EPP Kara', 'KARA', 10],
+    ['A1', 'EPP Lomé', 'MARITIME', 25],
+    ['A1', 'EPP Lomé', 'MARITIME', None],
+])
+
+def test_fold_text_series():
+    folded = fold_text_series(pd.Series(['Lomé-Golfe', '  CEG  Kara ', None]))
+    assert folded.tolist() == ['lome golfe', 'ceg kara', '']
+
+@pytest.mark.parametrize('keep, kept_index', [('premier', 0), ('dernier', 3), ('complet', 2)])
+def test_keep_policies(keep, kept_index):
+    kept, duplicates = deduplicate_dataframe(DUPLICATES, keep=keep)
+    assert sorted(kept.index) == sorted([1, kept_index])
+    assert set(duplicates['motif']) == {'code_duplique'}
+    assert (duplicates['ligne_conservee'] == kept_index).all()
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        find_duplicates(DUPLICATES, keep='aleatoire')
+
+def test_conflict_report():
+    _, _, report = find_duplicates(DUPLICATES)
+    assert report['code_duplique'] == {
+        'groupes': 1, 'en_conflit': 1, 'lignes_ecartees': 2, 'blocs_precedents': 0,
+    }
+
+def test_identical_duplicates_are_not_conflicts():
+    df = schools([['A1', 'EPP Lomé', 'MARITIME', 5]] * 3)
+    _, _, report = find_duplicates(df)
+    assert report['code_duplique']['en_conflit'] == 0
+    assert report['code_duplique']['lignes_ecartees'] == 2
+
+def test_rows_outside_candidates_are_kept():
+    df = schools([
+        ['', 'EPP Lomé', 'MARITIME', 1],
+        ['', 'EPP Kara', 'KARA', 2],
+        ['C1', 'EPP Sokodé', 'CENTRALE', 3],
+    ])
+    kept, duplicates = deduplicate_dataframe(df, candidates=df['code_etablissement'].ne(''))
+    assert len(kept) == 3 and duplicates.empty
+
+def test_fuzzy_duplicates():
+    df = schools([
+        ['A1', 'EPP Lomé', 'MARITIME', 1],
+        ['A2', 'epp  lome', 'Maritime', 2],
+        ['A3', 'EPP Lomé', 'KARA', 3],
+        ['A4', '', 'MARITIME', 4],
+        ['A5', '', 'MARITIME', 5],
+    ])
+    kept, duplicates = deduplicate_dataframe(df, fuzzy=True)
+    assert kept['code_etablissement'].tolist() == ['A1', 'A3', 'A4', 'A5']
+    assert duplicates['motif'].tolist() == ['doublon_approchant']
+    assert duplicates['ligne_conservee'].tolist() == [0]
+
+def test_fuzzy_keys_skip_rows_without_name():
+    keys = fuzzy_keys(schools([['A1', '', 'KARA', 1], ['A2', 'EPP', 'KARA', 1]]))
+    assert keys.isna().tolist() == [True, False]
+
+def test_seen_keys_span_chunks():
+    seen = {}
+    first = DUPLICATES.iloc[:2]
+    second = DUPLICATES.iloc[2:]
+    masks, _, _ = find_duplicates(first, seen=seen)
+    assert not masks['code_duplique'].any()
+    masks, kept, report = find_duplicates(second, keep='dernier', seen=seen)
+    # Déjà vues dans le bloc précédent : écartées quelle que soit la politique
+    assert masks['code_duplique'].tolist() == [True, True]
+    assert report['code_duplique']['blocs_precedents'] == 2
+    assert kept.isna().all()
@@ -0,0 +1,46 @@
+import gzip
+import json
+
+import pytest
+
+import backends
+from map_export import export_geojson
+
+@pytest.fixture
+def connexion():
+    connexion = backends.SQLiteConnection()
+    db = connexion._connexion
+    db.execute("INSERT INTO milieux (libelle_type_milieu) VALUES ('Urbain')")
+    db.execute("INSERT INTO statuts (libelle_type_statut_etab) VALUES ('Public')")
+    db.execute("INSERT INTO systemes (libelle_type_systeme) VALUES ('Formel')")
+    for number, region in enumerate(['Golfe-Lomé', 'KARA', 'GOLFE LOME', 'Golfe-Lomé'], start=1):
+        db.execute(
+            "INSERT INTO localisations (region, prefecture, canton_village_autonome, ville_village_quartier) "
+            "VALUES (?, 'P', 'C', 'V')", (region,)
+        )
+        db.execute(
+            "INSERT INTO etablissements (code_etablissement, nom_etablissement, localisation_id, milieu_id, "
+            "statut_id, systeme_id, lat, lng) VALUES (?, ?, ?, 1, 1, 1, 6.1, 1.2)",
+            (f'E{number}', f'EPP {number}', number)
+        )
+    yield connexion
+    connexion.close()
+
+def read_codes(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return sorted(feature['properties']['code'] for feature in json.load(f)['features'])
+
+def test_region_spellings_share_one_file(connexion, tmp_path):
+    written = export_geojson(connexion, str(tmp_path), chunk_size=2)
+    golfe = str(tmp_path / 'golfe-lome.geojson.gz')
+    assert written == {golfe: 3, str(tmp_path / 'kara.geojson.gz'): 1}
+    assert read_codes(golfe) == ['E1', 'E3', 'E4']
+
+def test_files_of_vanished_regions_are_removed(connexion, tmp_path):
+    stale = tmp_path / 'maritime.geojson.gz'
+    stale.write_bytes(b'')
+    (tmp_path / 'etablissements.mbtiles').write_bytes(b'')
+    export_geojson(connexion, str(tmp_path))
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'etablissements.mbtiles', 'golfe-lome.geojson.gz', 'kara.geojson.gz',
+    ]
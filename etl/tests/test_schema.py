@@ -0,0 +1,83 @@
+import glob
+import os
+import re
+
+import backends
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'database', 'migrations')
+
+# Appels de Blueprint qui ne déclarent pas de colonne
+NON_COLUMN_CALLS = {'index', 'fullText', 'unique', 'primary', 'dropIndex', 'dropColumn', 'foreign'}
+
+# Appels sans nom de colonne : colonnes créées -> (nullable, unique, table référencée)
+IMPLICIT_COLUMNS = {
+    'id': {'id': (False, False, None)},
+    'timestamps': {'created_at': (True, False, None), 'updated_at': (True, False, None)},
+    'rememberToken': {'remember_token': (True, False, None)},
+}
+
+def migration_schema():
+    """
+    Relit les méthodes up() des migrations Laravel
+    
+    Returns:
+        dict: {table: {colonne: (nullable, unique, table référencée ou None)}}
+    """
+    tables = {}
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS, '*.php'))):
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        up = source[source.index('function up()'):source.index('function down()')]
+        blocks = re.split(r"Schema::(?:create|table)\('(\w+)'", up)
+        for table, body in zip(blocks[1::2], blocks[2::2]):
+            columns = tables.setdefault(table, {})
+            for call, statement in re.findall(r'\$table->(\w+)\(([^;]*);', body):
+                if call in NON_COLUMN_CALLS:
+                    continue
+                if call in IMPLICIT_COLUMNS:
+                    columns.update(IMPLICIT_COLUMNS[call])
+                else:
+                    name = re.match(r"\s*'(\w+)'", statement).group(1)
+                    reference = re.search(r"->constrained\('(\w+)'\)", statement)
+                    columns[name] = (
+                        '->nullable()' in statement, '->unique()' in statement,
+                        reference.group(1) if reference else None,
+                    )
+    return tables
+
+def sqlite_schema():
+    """Même description pour SQLITE_SCHEMA, créé dans une base en mémoire"""
+    connexion = backends.SQLiteConnection()
+    db = connexion._connexion
+    tables = {}
+    try:
+        names = [row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        for table in names:
+            if table.startswith('sqlite_'):
+                continue
+            references = {row[3]: row[2] for row in db.execute(f"PRAGMA foreign_key_list({table})")}
+            unique = set()
+            for index in db.execute(f"PRAGMA index_list({table})").fetchall():
+                if index[2] and index[3] == 'u':
+                    indexed = db.execute(f"PRAGMA index_info({index[1]})").fetchall()
+                    if len(indexed) == 1:
+                        unique.add(indexed[0][2])
+            tables[table] = {
+                name: (not notnull and not pk, name in unique, references.get(name))
+                for _, name, _, notnull, _, pk in db.execute(f"PRAGMA table_info({table})")
+            }
+    finally:
+        connexion.close()
+    return tables
+
+def test_sqlite_schema_matches_migrations():
+    migrations = migration_schema()
+    sqlite = sqlite_schema()
+    assert set(sqlite) <= set(migrations), "tables SQLite absentes des migrations"
+    for table, columns in sqlite.items():
+        assert columns == migrations[table], f"{table}: SQLITE_SCHEMA diffère des migrations"
+
+def test_etl_tables_are_in_sqlite_schema():
+    sqlite = sqlite_schema()
+    assert backends.ID_TABLES <= set(sqlite)
+    assert {'recherche_etablissements', 'statistiques_etablissements', 'statistiques_empreintes'} <= set(sqlite)
@@ -0,0 +1,122 @@
+import types
+
+import pandas as pd
+import pytest
+
+import backends
+from etl_benchmark import generate_synthetic_dataframe
+
+@pytest.fixture(scope='module')
+def schools(etl):
+    mapped = etl.map_columns(generate_synthetic_dataframe(60))
+    return etl.clean_data(etl.validate_dataframe(mapped)[0]).reset_index(drop=True)
+
+@pytest.fixture
+def connexion(tmp_path):
+    connexion = backends.SQLiteConnection(str(tmp_path / 'edumap.sqlite'))
+    yield connexion
+    connexion.close()
+
+@pytest.mark.parametrize('server_info, expected', [
+    ('8.0.19', True),
+    ('8.4.3', True),
+    ('8.0.18', False),
+    ('5.7.44-log', False),
+    ('10.4.32-MariaDB', False),
+    ('5.5.5-10.11.6-MariaDB-0+deb12u1', False),
+])
+def test_supports_row_alias(etl, server_info, expected):
+    mysql = types.SimpleNamespace(server_info=server_info, get_server_info=lambda: server_info)
+    assert etl.supports_row_alias(mysql) is expected
+
+def test_adapted_backends_use_row_alias(etl, connexion):
+    assert etl.supports_row_alias(etl.InstrumentedConnection(connexion))
+
+def test_build_upsert_sql_without_row_alias(etl):
+    assert etl.build_upsert_sql('effectifs', ['etablissement_id', 'tot'], row_alias=False) == (
+        "INSERT INTO effectifs (id, etablissement_id, tot) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE etablissement_id = VALUES(etablissement_id), tot = VALUES(tot)"
+    )
+
+def test_values_upsert_is_translated():
+    sql = "INSERT INTO effectifs (id, tot) VALUES (%s, %s) ON DUPLICATE KEY UPDATE tot = VALUES(tot)"
+    assert backends.translate_upsert(sql) == (
+        "INSERT INTO effectifs (id, tot) VALUES (%s, %s) ON CONFLICT (id) DO UPDATE SET tot = EXCLUDED.tot"
+    )
+
+@pytest.mark.parametrize('row_alias', [True, False])
+def test_sync_updates_changed_rows(etl, schools, connexion, monkeypatch, row_alias):
+    monkeypatch.setattr(etl, 'supports_row_alias', lambda connexion: row_alias)
+    assert etl.load_dataframe(connexion, schools.copy(), 'bulk')
+    
+    changed = schools.copy()
+    changed.loc[:4, 'tot'] = 9999
+    changed.loc[5:6, 'nom_etablissement'] = 'Nouveau nom'
+    summary = etl.sync_etablissement_data(connexion, changed)
+    assert summary == {'inseres': 0, 'mis_a_jour': 7, 'supprimes': 0, 'inchanges': 53, 'erreurs': 0}
+    
+    cursor = connexion.cursor()
+    cursor.execute("SELECT COUNT(*) FROM effectifs WHERE tot = 9999")
+    assert cursor.fetchone() == (5,)
+    cursor.execute("SELECT COUNT(*) FROM etablissements WHERE nom_etablissement = 'Nouveau nom'")
+    assert cursor.fetchone() == (2,)
+    cursor.close()
+    assert etl.sync_etablissement_data(connexion, changed)['mis_a_jour'] == 0
+
+def test_missing_child_rows_are_inserted_without_id(etl, monkeypatch):
+    sent = []
+    extras = types.SimpleNamespace(execute_values=lambda cur, sql, rows, page_size: sent.append((sql, rows)))
+    monkeypatch.setattr(backends, 'psycopg2', types.SimpleNamespace(extras=extras))
+    columns = ['id'] + etl.ETABLISSEMENT_COLUMNS + ['equipement_id', 'effectif_id', 'infrastructure_id']
+    columns += [col for child_columns in etl.CHILD_TABLES.values() for col in child_columns]
+    rows = pd.DataFrame([{col: 1 for col in columns}, {col: 2 for col in columns}], dtype=object)
+    rows.loc[1, 'effectif_id'] = None
+    
+    etl.upsert_changed_rows(backends.PostgreSQLCursor(None), rows)
+    
+    effectifs = [(sql, params) for sql, params in sent if sql.startswith('INSERT INTO effectifs')]
+    assert [sql.split(' VALUES')[0] for sql, _ in effectifs] == [
+        "INSERT INTO effectifs (id, etablissement_id, " + ', '.join(etl.EFFECTIF_COLUMNS) + ")",
+        "INSERT INTO effectifs (etablissement_id, " + ', '.join(etl.EFFECTIF_COLUMNS) + ")",
+    ]
+    assert 'ON CONFLICT (id) DO UPDATE' in effectifs[0][0] and 'ON CONFLICT' not in effectifs[1][0]
+    assert [params[0] for params in effectifs[0][1]] == [1]
+    assert [params[0] for params in effectifs[1][1]] == [2]
+    assert all(None not in params for _, batch in sent for params in batch)
+
+def test_sync_recreates_missing_child_rows(etl, schools, connexion):
+    assert etl.load_dataframe(connexion, schools.copy(), 'bulk')
+    cursor = connexion.cursor()
+    cursor.execute("DELETE FROM effectifs WHERE etablissement_id IN (1, 2)")
+    
+    summary = etl.sync_etablissement_data(connexion, schools.copy())
+    assert summary['mis_a_jour'] == 2 and not summary['erreurs']
+    cursor.execute("SELECT COUNT(DISTINCT etablissement_id) FROM effectifs")
+    assert cursor.fetchone() == (60,)
+    cursor.close()
+
+def test_stored_rows_are_read_for_given_codes_only(etl, schools, connexion):
+    assert etl.load_dataframe(connexion, schools.copy(), 'bulk')
+    codes = schools['code_etablissement'].iloc[[3, 0, 7, 3, 12]].tolist()
+    cursor = connexion.cursor()
+    stored = etl.fetch_stored_etablissements(cursor, codes, batch_size=2)
+    assert sorted(stored.index) == sorted(set(codes))
+    assert len(etl.fetch_stored_etablissements(cursor)) == 60
+    cursor.close()
+
+def test_sync_of_a_chunk_leaves_other_rows_alone(etl, schools, connexion):
+    assert etl.load_dataframe(connexion, schools.copy(), 'bulk')
+    chunk = schools.iloc[10:20].copy()
+    chunk.loc[10, 'tot'] = 9999
+    summary = etl.sync_etablissement_data(connexion, chunk)
+    assert summary == {'inseres': 0, 'mis_a_jour': 1, 'supprimes': 0, 'inchanges': 9, 'erreurs': 0}
+
+def test_etablissement_ids_are_fetched_by_slices(etl, schools, connexion):
+    assert etl.load_dataframe(connexion, schools.copy(), 'bulk')
+    codes = schools['code_etablissement'].tolist()
+    cursor = connexion.cursor()
+    ids = etl.fetch_etablissement_ids(cursor, codes + ['INCONNU'] + codes[:5], batch_size=7)
+    cursor.execute("SELECT code_etablissement, id FROM etablissements")
+    assert ids == dict(cursor.fetchall())
+    assert etl.fetch_etablissement_ids(cursor, []) == {}
+    cursor.close()
@@ -0,0 +1,110 @@
+import openpyxl
+import pandas as pd
+import pytest
+
+from etl_benchmark import generate_synthetic_dataframe
+
+def school(code, **values):
+    row = {
+        'code_etablissement': code, 'nom_etablissement': f'EPP {code}', 'region': 'KARA',
+        'prefecture': 'KOZAH', 'libelle_type_milieu': 'Urbain', 'libelle_type_statut_etab': 'Public',
+        'libelle_type_systeme': 'Formel', 'latitude': '9.55', 'longitude': '1.18',
+        'sommedenb_eff_g': 10, 'sommedenb_eff_f': 12, 'tot': 22,
+    }
+    row.update(values)
+    return row
+
+def anomalies_by_code(anomalies):
+    return dict(zip(anomalies['code_etablissement'], anomalies['motifs']))
+
+def test_valid_rows_have_no_anomaly(etl):
+    df = pd.DataFrame([school('A1'), school('A2')])
+    valid, anomalies = etl.validate_dataframe(df)
+    assert len(valid) == 2 and anomalies.empty
+
+def test_reject_reason_codes(etl):
+    df = pd.DataFrame([
+        school(None),
+        school('A2', tot='beaucoup'),
+        school('A3', sommedenb_eff_g=-1, tot=11),
+        school('A4', libelle_type_milieu=' '),
+        school('A5'),
+        school('A5', nom_etablissement='Autre nom'),
+    ])
+    valid, anomalies = etl.validate_dataframe(df)
+    assert valid.index.tolist() == [4]
+    assert anomalies_by_code(anomalies.iloc[1:]) == {
+        'A2': 'valeur_non_numerique:tot',
+        'A3': 'valeur_hors_limites:sommedenb_eff_g',
+        'A4': 'reference_manquante:libelle_type_milieu',
+        'A5': 'code_duplique',
+    }
+    assert anomalies['motifs'].iloc[0] == 'code_manquant'
+    assert set(anomalies['statut']) == {'rejet'}
+
+def test_warnings_keep_the_row(etl):
+    df = pd.DataFrame([
+        school('A1', latitude='nord'),
+        school('A2', longitude='500'),
+        school('A3', tot=30),
+    ])
+    valid, anomalies = etl.validate_dataframe(df)
+    assert len(valid) == 3
+    assert anomalies_by_code(anomalies) == {
+        'A1': 'coordonnees_non_numeriques:latitude',
+        'A2': 'coordonnees_hors_limites:longitude',
+        'A3': 'total_incoherent',
+    }
+    assert set(anomalies['statut']) == {'avertissement'}
+
+def test_anomaly_columns_point_to_source_lines(etl):
+    df = pd.DataFrame([school('A1'), school('A1', tot=30)])
+    _, anomalies = etl.validate_dataframe(df, keep='dernier')
+    assert anomalies.columns[:len(etl.ANOMALY_COLUMNS)].tolist() == etl.ANOMALY_COLUMNS
+    # Ligne 2 du fichier écartée au profit de la ligne 3 ; la ligne 3 garde son avertissement
+    assert anomalies['ligne_source'].tolist() == [2, 3]
+    assert anomalies['statut'].tolist() == ['rejet', 'avertissement']
+    assert anomalies['ligne_conservee'].iloc[0] == 3
+
+def test_rejected_rows_are_not_duplicate_keepers(etl):
+    df = pd.DataFrame([school('A1', tot='?'), school('A1')])
+    valid, anomalies = etl.validate_dataframe(df)
+    assert valid.index.tolist() == [1]
+    assert anomalies['motifs'].tolist() == ['valeur_non_numerique:tot']
+
+def test_fuzzy_duplicates_are_rejected(etl):
+    df = pd.DataFrame([school('A1'), school('A2', nom_etablissement='epp a1')])
+    valid, anomalies = etl.validate_dataframe(df, fuzzy=True)
+    assert valid.index.tolist() == [0]
+    assert anomalies['motifs'].tolist() == ['doublon_approchant']
+
+def write_source(path, df, blank_after):
+    """Écrit `df` en Excel ou CSV avec une ligne vide après la ligne de données `blank_after`"""
+    if path.suffix == '.csv':
+        lines = df.to_csv(index=False).splitlines()
+        lines.insert(blank_after + 2, '')
+        path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        return
+    rows = [list(df.columns)] + df.astype(object).where(df.notna(), None).values.tolist()
+    rows.insert(blank_after + 2, [None] * len(df.columns))
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    workbook.save(path)
+
+@pytest.mark.parametrize('suffix', ['.xlsx', '.csv'])
+def test_reject_lines_skip_blank_rows(etl, tmp_path, suffix):
+    source = generate_synthetic_dataframe(6)
+    source.loc[3, 'CODE_ETABLISSEMENT'] = None
+    path = tmp_path / f'source{suffix}'
+    write_source(path, source, blank_after=1)
+    
+    anomalies = []
+    for _ in etl.iter_cleaned_chunks(str(path), chunk_size=2, anomalies=anomalies):
+        pass
+    # En-tête ligne 1, données lignes 2-3, ligne vide 4 : la 4e ligne de données est en ligne 6
+    assert pd.concat(anomalies)['ligne_source'].tolist() == [6]
+    
+    rejects = tmp_path / 'rejets.csv'
+    etl.load_cleaned_dataframe(str(path), rejects_path=str(rejects))
+    assert pd.read_csv(rejects)['ligne_source'].tolist() == [6]
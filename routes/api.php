@@ -13,6 +13,7 @@
 // Routes établissements
 Route::get('/etablissements/search', [EtablissementController::class, 'search']);
 Route::get('/etablissements/map', [EtablissementController::class, 'map']);
+Route::get('/etablissements/statistiques', [EtablissementController::class, 'statistiques']);
 Route::get('/etablissements/{id}', [EtablissementController::class, 'show']);
 Route::get('/etablissements', [EtablissementController::class, 'index']);
 